@@ -8,6 +8,9 @@ from collections import defaultdict, Counter
 from typing import Dict, List
 import statistics
 
+from corpus_enem import carregar_arquivos
+from questao_enem import Questao
+
 def analisar_provas_enem(pasta_provas: str = "provas"):
     """Analisa todos os arquivos JSONL das provas do ENEM."""
     
@@ -48,67 +51,56 @@ def analisar_provas_enem(pasta_provas: str = "provas"):
     print("=" * 80)
     print()
     
-    for arquivo in arquivos:
-        questoes_arquivo = []
+    for dados_arquivo in carregar_arquivos(pasta_provas):
+        nome_arquivo = dados_arquivo["arquivo"]
+        questoes_arquivo = dados_arquivo["questoes"]
         areas_arquivo = Counter()
         anos_arquivo = Counter()
         
-        try:
-            with open(arquivo, 'r', encoding='utf-8') as f:
-                for linha_num, linha in enumerate(f, 1):
-                    linha = linha.strip()
-                    if linha:
-                        try:
-                            questao = json.loads(linha)
-                            questoes_arquivo.append(questao)
-                            
-                            # Coletar estatísticas
-                            ano = questao.get('ano') or questao.get('year') or questao.get('edicao', 'N/A')
-                            area = questao.get('area') or questao.get('subject') or questao.get('disciplina', 'N/A')
-                            tema = questao.get('tema') or questao.get('topic') or questao.get('assunto', 'N/A')
-                            dificuldade = questao.get('dificuldade') or questao.get('difficulty', 'N/A')
-                            
-                            anos_arquivo[ano] += 1
-                            areas_arquivo[area] += 1
-                            areas_counter[area] += 1
-                            anos_counter[ano] += 1
-                            temas_counter[tema] += 1
-                            dificuldades_counter[dificuldade] += 1
-                            
-                            # Campos presentes
-                            campos_todos.update(questao.keys())
-                            
-                        except json.JSONDecodeError as e:
-                            print(f"   ⚠️  Erro na linha {linha_num} de {arquivo.name}: {e}")
-                            continue
-            
-            todas_questoes.extend(questoes_arquivo)
-            
-            # Tamanho do arquivo
-            tamanho_mb = arquivo.stat().st_size / (1024 * 1024)
-            
-            stats_arquivo = {
-                "arquivo": arquivo.name,
-                "questoes": len(questoes_arquivo),
-                "tamanho_mb": tamanho_mb,
-                "anos": dict(anos_arquivo),
-                "areas": dict(areas_arquivo)
-            }
-            stats_por_arquivo.append(stats_arquivo)
+        for linha_num, erro in dados_arquivo["erros"]:
+            print(f"   ⚠️  Erro na linha {linha_num} de {nome_arquivo}: {erro}")
+        
+        for questao in questoes_arquivo:
+            # Coletar estatísticas
+            normalizada = Questao.de_dict(questao)
+            ano = normalizada.ano or 'N/A'
+            area = normalizada.area or 'N/A'
+            tema = normalizada.tema or 'N/A'
+            dificuldade = normalizada.dificuldade or 'N/A'
             
-            # Mostrar resumo do arquivo
-            print(f"📄 {arquivo.name}")
-            print(f"   Questões: {len(questoes_arquivo)}")
-            print(f"   Tamanho: {tamanho_mb:.2f} MB")
-            if anos_arquivo:
-                print(f"   Anos: {', '.join(map(str, sorted(anos_arquivo.keys())))}")
-            if areas_arquivo:
-                print(f"   Áreas: {', '.join(areas_arquivo.keys())}")
-            print()
+            anos_arquivo[ano] += 1
+            areas_arquivo[area] += 1
+            areas_counter[area] += 1
+            anos_counter[ano] += 1
+            temas_counter[tema] += 1
+            dificuldades_counter[dificuldade] += 1
             
-        except Exception as e:
-            print(f"❌ Erro ao processar {arquivo.name}: {e}")
-            print()
+            # Campos presentes (arquivo_origem é adicionado no carregamento)
+            campos_todos.update(campo for campo in questao if campo != 'arquivo_origem')
+        
+        todas_questoes.extend(questoes_arquivo)
+        
+        # Tamanho do arquivo
+        tamanho_mb = dados_arquivo["tamanho"] / (1024 * 1024)
+        
+        stats_arquivo = {
+            "arquivo": nome_arquivo,
+            "questoes": len(questoes_arquivo),
+            "tamanho_mb": tamanho_mb,
+            "anos": dict(anos_arquivo),
+            "areas": dict(areas_arquivo)
+        }
+        stats_por_arquivo.append(stats_arquivo)
+        
+        # Mostrar resumo do arquivo
+        print(f"📄 {nome_arquivo}")
+        print(f"   Questões: {len(questoes_arquivo)}")
+        print(f"   Tamanho: {tamanho_mb:.2f} MB")
+        if anos_arquivo:
+            print(f"   Anos: {', '.join(map(str, sorted(anos_arquivo.keys())))}")
+        if areas_arquivo:
+            print(f"   Áreas: {', '.join(areas_arquivo.keys())}")
+        print()
     
     # Estatísticas gerais
     print("=" * 80)
@@ -204,7 +196,23 @@ def analisar_provas_enem(pasta_provas: str = "provas"):
     print("=" * 80)
 
 
+def main():
+    """Função principal."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Analisa os arquivos JSONL das provas do ENEM')
+    parser.add_argument(
+        'pasta',
+        nargs='?',
+        default='provas',
+        help='Pasta com os arquivos JSONL das provas (padrão: provas)'
+    )
+    
+    args = parser.parse_args()
+    analisar_provas_enem(args.pasta)
+
+
 if __name__ == "__main__":
-    analisar_provas_enem("provas")
+    main()
 
 
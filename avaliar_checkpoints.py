@@ -0,0 +1,235 @@
+"""
+Avaliação comparativa dos checkpoints do adapter LoRA
+
+Carrega o modelo base uma única vez, anexa todos os checkpoints
+(`checkpoint-100`, `checkpoint-200`, ...) como adapters nomeados do PEFT e
+alterna o adapter ativo a cada lote de questões. O resultado é uma tabela de
+acurácia por passo de treinamento (geral e por área), em um único processo.
+
+Uso:
+    python avaliar_checkpoints.py --limite 500
+    python avaliar_checkpoints.py --checkpoints checkpoint-300 checkpoint-367 --incluir-base
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+
+# Nome usado para o modelo base (sem adapter) na tabela
+NOME_BASE = "base"
+
+
+def encontrar_checkpoints(pasta: str = ".") -> List[str]:
+    """Retorna as pastas checkpoint-N com adapter, ordenadas pelo passo."""
+    checkpoints = [
+        caminho for caminho in Path(pasta).glob("checkpoint-*")
+        if (caminho / "adapter_config.json").exists()
+    ]
+    return [str(caminho) for caminho in sorted(checkpoints, key=lambda c: passo_checkpoint(c.name))]
+
+
+def passo_checkpoint(nome: str) -> int:
+    """Passo de treinamento de um checkpoint ("checkpoint-367" -> 367; base -> 0)."""
+    encontrado = re.search(r"(\d+)$", str(nome).rstrip("/"))
+    return int(encontrado.group(1)) if encontrado else 0
+
+
+def carregar_adapters(model, checkpoints: List[str]):
+    """
+    Anexa cada checkpoint ao modelo base como um adapter nomeado.
+    
+    Args:
+        model: Modelo base (`test_model.load_base_model`)
+        checkpoints: Pastas dos checkpoints
+    
+    Returns:
+        (PeftModel com todos os adapters, nomes dos adapters na mesma ordem)
+    """
+    from peft import PeftModel
+    
+    nomes = [Path(checkpoint).name for checkpoint in checkpoints]
+    print(f"📥 Anexando adapter {nomes[0]}")
+    model = PeftModel.from_pretrained(model, checkpoints[0], adapter_name=nomes[0])
+    for checkpoint, nome in zip(checkpoints[1:], nomes[1:]):
+        print(f"📥 Anexando adapter {nome}")
+        model.load_adapter(checkpoint, adapter_name=nome)
+    model.eval()
+    return model, nomes
+
+
+def resumir_resultados(resultados: List[Dict]) -> Dict:
+    """Acertos e taxa de acerto gerais e por área."""
+    por_area = defaultdict(lambda: [0, 0])
+    for resultado in resultados:
+        contagem = por_area[resultado.get('area', 'OUTRAS')]
+        contagem[0] += bool(resultado.get('acertou'))
+        contagem[1] += 1
+    
+    acertos = sum(a for a, _ in por_area.values())
+    total = sum(t for _, t in por_area.values())
+    return {
+        "total": total,
+        "acertos": acertos,
+        "taxa_acerto": round(acertos / total * 100, 2) if total else 0.0,
+        "por_area": {
+            area: round(a / t * 100, 2) if t else 0.0
+            for area, (a, t) in sorted(por_area.items())
+        }
+    }
+
+
+def avaliar_checkpoints(model, tokenizer, nomes: List[str], questoes: List,
+                        metodo: str = "verossimilhanca", tamanho_bloco: int = 64,
+                        incluir_base: bool = False, **kwargs) -> Dict[str, List[Dict]]:
+    """
+    Avalia todos os adapters sobre as mesmas questões.
+    
+    As questões são percorridas em blocos; em cada bloco o adapter ativo é
+    trocado (`set_adapter`) e o bloco é avaliado por cada um, sem recarregar
+    o modelo base.
+    
+    Args:
+        model: PeftModel com os adapters (`carregar_adapters`)
+        tokenizer: Tokenizer do modelo
+        nomes: Nomes dos adapters
+        questoes: Questões (dicionários ou `Questao`)
+        metodo: "verossimilhanca" (`test_model.score_questions`) ou
+            "geracao" (`test_model.evaluate_questions`)
+        tamanho_bloco: Questões avaliadas por adapter antes de trocá-lo
+        incluir_base: Avalia também o modelo base, com os adapters desativados
+        **kwargs: Repassados para a função de avaliação (lote, memória, ...)
+    
+    Returns:
+        Resultados por adapter ({nome: [resultado, ...]})
+    """
+    from test_model import evaluate_questions, score_questions
+    
+    avaliar = score_questions if metodo == "verossimilhanca" else evaluate_questions
+    participantes = ([NOME_BASE] if incluir_base else []) + list(nomes)
+    resultados = {nome: [] for nome in participantes}
+    
+    for inicio in range(0, len(questoes), tamanho_bloco):
+        bloco = questoes[inicio:inicio + tamanho_bloco]
+        for nome in participantes:
+            if nome == NOME_BASE:
+                with model.disable_adapter():
+                    resultados[nome].extend(avaliar(model, tokenizer, bloco, **kwargs))
+            else:
+                model.set_adapter(nome)
+                resultados[nome].extend(avaliar(model, tokenizer, bloco, **kwargs))
+        
+        feitas = min(inicio + tamanho_bloco, len(questoes))
+        parciais = ", ".join(
+            f"{nome}: {resumir_resultados(resultados[nome])['taxa_acerto']:.1f}%" for nome in participantes
+        )
+        print(f"[{feitas}/{len(questoes)}] {parciais}")
+    
+    return resultados
+
+
+def tabela_markdown(resumos: Dict[str, Dict]) -> str:
+    """Tabela de acurácia por passo (linhas) e área (colunas)."""
+    areas = sorted({area for resumo in resumos.values() for area in resumo["por_area"]})
+    linhas = [
+        "| Checkpoint | Passo | Geral | " + " | ".join(areas) + " |",
+        "|------------|-------|-------|" + "|".join("-" * (len(area) + 2) for area in areas) + "|"
+    ]
+    for nome, resumo in sorted(resumos.items(), key=lambda item: passo_checkpoint(item[0])):
+        colunas = [f"{resumo['por_area'].get(area, 0.0):.2f}%" for area in areas]
+        linhas.append(
+            f"| {nome} | {passo_checkpoint(nome)} | {resumo['taxa_acerto']:.2f}% | " + " | ".join(colunas) + " |"
+        )
+    return "\n".join(linhas)
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(
+        description='Compara os checkpoints do adapter LoRA carregando o modelo base uma única vez'
+    )
+    parser.add_argument('--base', default=None, help='Modelo base (padrão: procurado como em test_model.py)')
+    parser.add_argument('--checkpoints', nargs='+', default=None, help='Checkpoints a comparar (padrão: todos os checkpoint-*)')
+    parser.add_argument('--incluir-base', action='store_true', help='Avaliar também o modelo base sem adapter')
+    parser.add_argument('--provas', default='provas', help='Pasta com os arquivos JSONL das provas (padrão: provas)')
+    parser.add_argument('--limite', type=int, default=None, help='Número máximo de questões')
+    parser.add_argument('--metodo', choices=['verossimilhanca', 'geracao'], default='verossimilhanca',
+                        help='Forma de responder (padrão: verossimilhanca)')
+    parser.add_argument('--bloco', type=int, default=64, help='Questões por adapter antes de trocá-lo (padrão: 64)')
+    parser.add_argument('--lote', type=int, default=16, help='Máximo de questões por lote do modelo (padrão: 16)')
+    parser.add_argument('--saida', default='avaliacao_checkpoints', help='Pasta dos resultados (padrão: avaliacao_checkpoints)')
+    
+    args = parser.parse_args()
+    
+    try:
+        import peft  # noqa: F401
+        from test_model import find_base_model, load_base_model
+    except ImportError as e:
+        print(f"❌ Erro ao importar dependências: {e}")
+        print("Instale as dependências com: pip install -r requirements.txt")
+        sys.exit(1)
+    
+    from corpus_enem import carregar_corpus
+    
+    checkpoints = args.checkpoints or encontrar_checkpoints()
+    checkpoints = [c for c in checkpoints if (Path(c) / "adapter_config.json").exists()]
+    if not checkpoints:
+        print("❌ Nenhum checkpoint encontrado!")
+        return
+    
+    print("=" * 80)
+    print("📈 AVALIAÇÃO DOS CHECKPOINTS")
+    print("=" * 80)
+    print(f"\nCheckpoints: {', '.join(Path(c).name for c in checkpoints)}\n")
+    
+    questoes = carregar_corpus(args.provas)[:args.limite]
+    
+    base = args.base or find_base_model() or "sabia-7b"
+    model, tokenizer = load_base_model(base)
+    model, nomes = carregar_adapters(model, checkpoints)
+    print(f"✅ Modelo base carregado uma vez, {len(nomes)} adapters anexados\n")
+    
+    inicio = time.perf_counter()
+    resultados = avaliar_checkpoints(
+        model,
+        tokenizer,
+        nomes,
+        questoes,
+        metodo=args.metodo,
+        tamanho_bloco=args.bloco,
+        incluir_base=args.incluir_base,
+        max_batch_size=args.lote
+    )
+    duracao = time.perf_counter() - inicio
+    
+    resumos = {nome: resumir_resultados(lista) for nome, lista in resultados.items()}
+    tabela = tabela_markdown(resumos)
+    
+    pasta = Path(args.saida)
+    pasta.mkdir(parents=True, exist_ok=True)
+    with open(pasta / "resumo.json", 'w', encoding='utf-8') as f:
+        json.dump({
+            "metodo": args.metodo,
+            "questoes": len(questoes),
+            "duracao_s": round(duracao, 1),
+            "checkpoints": {
+                nome: {"passo": passo_checkpoint(nome), **resumo} for nome, resumo in resumos.items()
+            }
+        }, f, ensure_ascii=False, indent=2)
+    with open(pasta / "ACURACIA_POR_CHECKPOINT.md", 'w', encoding='utf-8') as f:
+        f.write("# 📈 Acurácia por Checkpoint\n\n")
+        f.write(f"**Questões**: {len(questoes)} | **Método**: {args.metodo}\n\n")
+        f.write(tabela + "\n")
+    
+    print(f"\n{tabela}\n")
+    print(f"⏱️  {duracao:.1f}s para {len(questoes)} questões x {len(resultados)} modelos")
+    print(f"💾 Resultados salvos em: {pasta}/")
+
+
+if __name__ == "__main__":
+    main()
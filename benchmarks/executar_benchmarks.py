@@ -0,0 +1,388 @@
+"""
+Benchmarks do pipeline de resolução de questões do ENEM
+
+Mede cada etapa do pipeline noturno de forma reproduzível, sem chave de API
+nem rede (as requisições vão para o servidor local de servidor_mock_maritaca.py):
+
+- carregamento: `carregar_todas_questoes` (com o cache do corpus frio e quente)
+- prompts: `formatar_questao_para_prompt` para cada questão
+- requisicoes: envio concorrente das requisições ao servidor local
+- resolucao: `resolver_questao` (prompt + requisição + correção da resposta)
+- relatorios: `gerar_relatorios_por_area`
+
+Cada etapa roda em um subprocesso próprio, para que o pico de memória (RSS)
+seja o da etapa. O resultado (p50/p95/p99, questões/s e RSS) é gravado em
+benchmarks/resultados/<etiqueta>.json e pode ser comparado com uma execução
+anterior usando --comparar.
+
+Uso:
+    python benchmarks/executar_benchmarks.py --provas provas
+    python benchmarks/executar_benchmarks.py --comparar benchmarks/resultados/abc1234.json
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+PASTA_RESULTADOS = Path(__file__).resolve().parent / "resultados"
+ETAPAS = ("carregamento", "prompts", "requisicoes", "resolucao", "relatorios")
+
+
+def _percentis(latencias: List[float]) -> Dict:
+    """Resume uma lista de latências (segundos) em milissegundos."""
+    if not latencias:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "media_ms": 0.0}
+    if len(latencias) == 1:
+        valor = round(latencias[0] * 1000, 3)
+        return {"p50_ms": valor, "p95_ms": valor, "p99_ms": valor, "media_ms": valor}
+    
+    cortes = statistics.quantiles(latencias, n=100, method='inclusive')
+    return {
+        "p50_ms": round(cortes[49] * 1000, 3),
+        "p95_ms": round(cortes[94] * 1000, 3),
+        "p99_ms": round(cortes[98] * 1000, 3),
+        "media_ms": round(statistics.mean(latencias) * 1000, 3)
+    }
+
+
+def _pico_rss_mb() -> float:
+    """Pico de memória residente do processo atual, em MB."""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    if sys.platform == "darwin":
+        return round(pico / (1024 * 1024), 2)
+    return round(pico / 1024, 2)
+
+
+def _resumo(latencias: List[float], itens: int, duracao: float, **extras) -> Dict:
+    resumo = {
+        "itens": itens,
+        "duracao_s": round(duracao, 4),
+        "questoes_por_s": round(itens / duracao, 2) if duracao > 0 else 0.0,
+        **_percentis(latencias)
+    }
+    resumo.update(extras)
+    return resumo
+
+
+def _carregar(pasta_provas: str, limite: Optional[int]):
+    from resolver_todas_questoes import carregar_todas_questoes
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        questoes = carregar_todas_questoes(pasta_provas)
+    return questoes[:limite] if limite else questoes
+
+
+def _cliente(servidor, workers: int):
+    from maritaca_api import MaritacaAPI, TokenBucket
+    from servidor_mock_maritaca import CHAVE_TESTE
+    
+    return MaritacaAPI(
+        api_key=CHAVE_TESTE,
+        base_url=servidor.base_url,
+        pool_size=max(workers, 1),
+        limitador=TokenBucket(taxa=None),
+        backoff_base=0.01
+    )
+
+
+def etapa_carregamento(args) -> Dict:
+    """Carrega o corpus sem cache (parse dos JSONL), com cache e normalizado."""
+    from corpus_enem import carregar_corpus
+    from resolver_todas_questoes import carregar_todas_questoes
+    
+    def medir(funcao) -> Dict:
+        latencias = []
+        for _ in range(args.repeticoes):
+            inicio = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                questoes = funcao()
+            latencias.append(time.perf_counter() - inicio)
+        return _resumo(latencias, len(questoes) * args.repeticoes, sum(latencias))
+    
+    sem_cache = medir(lambda: carregar_corpus(args.provas, usar_cache=False))
+    carregar_corpus(args.provas)  # garante que o cache existe
+    return {
+        "sem_cache": sem_cache,
+        "com_cache": medir(lambda: carregar_corpus(args.provas)),
+        "carregar_todas_questoes": medir(lambda: carregar_todas_questoes(args.provas))
+    }
+
+
+def etapa_prompts(args) -> Dict:
+    """Monta o prompt de cada questão."""
+    from questao_enem import formatar_questao_para_prompt
+    
+    questoes = _carregar(args.provas, args.questoes)
+    latencias = []
+    inicio_total = time.perf_counter()
+    for _ in range(args.repeticoes):
+        for questao in questoes:
+            inicio = time.perf_counter()
+            formatar_questao_para_prompt(questao)
+            latencias.append(time.perf_counter() - inicio)
+    duracao = time.perf_counter() - inicio_total
+    
+    return _resumo(latencias, len(latencias), duracao)
+
+
+def etapa_requisicoes(args) -> Dict:
+    """Envia um prompt por questão ao servidor local, com `workers` em paralelo."""
+    from questao_enem import formatar_questao_para_prompt
+    from servidor_mock_maritaca import ServidorMockMaritaca
+    
+    questoes = _carregar(args.provas, args.questoes)
+    prompts = [formatar_questao_para_prompt(questao)[0] for questao in questoes]
+    
+    with ServidorMockMaritaca(latencia=args.latencia, dispersao=args.dispersao, seed=args.seed) as servidor:
+        with _cliente(servidor, args.workers) as client:
+            
+            def enviar(prompt):
+                inicio = time.perf_counter()
+                client.generate_enem_response(prompt=prompt, temperature=0.7, max_tokens=500)
+                return time.perf_counter() - inicio
+            
+            inicio_total = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.workers) as executor:
+                latencias = list(executor.map(enviar, prompts))
+            duracao = time.perf_counter() - inicio_total
+        
+        return _resumo(latencias, len(latencias), duracao, workers=args.workers, latencia_servidor_s=args.latencia)
+
+
+def etapa_resolucao(args) -> Dict:
+    """Executa `resolver_questao` (inclui a correção) com o servidor sem latência."""
+    from resolver_todas_questoes import resolver_questao
+    from servidor_mock_maritaca import ServidorMockMaritaca
+    
+    questoes = _carregar(args.provas, args.questoes)
+    
+    with ServidorMockMaritaca(latencia=0.0, dispersao=0.0, seed=args.seed) as servidor:
+        with _cliente(servidor, 1) as client:
+            latencias = []
+            erros = 0
+            inicio_total = time.perf_counter()
+            for questao in questoes:
+                inicio = time.perf_counter()
+                resultado = resolver_questao(client, questao)
+                latencias.append(time.perf_counter() - inicio)
+                erros += 'erro' in resultado
+            duracao = time.perf_counter() - inicio_total
+    
+    return _resumo(latencias, len(latencias), duracao, erros=erros)
+
+
+def etapa_relatorios(args) -> Dict:
+    """Gera os relatórios por área a partir de resultados simulados."""
+    from relatorios_resolucao import gerar_relatorios_por_area
+    from resolver_todas_questoes import resolver_questao
+    from servidor_mock_maritaca import ServidorMockMaritaca
+    
+    questoes = _carregar(args.provas, args.questoes)
+    with ServidorMockMaritaca(latencia=0.0, dispersao=0.0, seed=args.seed) as servidor:
+        with _cliente(servidor, 1) as client:
+            resultados = [resolver_questao(client, questao) for questao in questoes]
+    
+    latencias = []
+    with tempfile.TemporaryDirectory() as pasta:
+        for _ in range(args.repeticoes):
+            inicio = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                gerar_relatorios_por_area(resultados, pasta_saida=pasta)
+            latencias.append(time.perf_counter() - inicio)
+    
+    total = len(resultados) * args.repeticoes
+    return _resumo(latencias, total, sum(latencias))
+
+
+def _executar_etapa(nome: str, args) -> Dict:
+    """Roda uma etapa no processo atual e acrescenta o pico de RSS."""
+    resultado = globals()[f"etapa_{nome}"](args)
+    resultado["pico_rss_mb"] = _pico_rss_mb()
+    return resultado
+
+
+def _executar_em_subprocesso(nome: str, argv: List[str]) -> Dict:
+    comando = [sys.executable, str(Path(__file__).resolve()), "--etapa-interna", nome] + argv
+    processo = subprocess.run(comando, capture_output=True, text=True, cwd=str(RAIZ))
+    if processo.returncode != 0:
+        return {"erro": processo.stderr.strip().splitlines()[-1] if processo.stderr.strip() else "falhou"}
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def _etiqueta_padrao() -> str:
+    """Hash curto do commit atual (ou data/hora, fora de um repositório git)."""
+    try:
+        processo = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=str(RAIZ), timeout=10
+        )
+        if processo.returncode == 0 and processo.stdout.strip():
+            return processo.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return time.strftime("%Y%m%d-%H%M%S")
+
+
+def _metricas_comparaveis(resultado: Dict, prefixo: str = ""):
+    """Percorre as métricas numéricas de uma etapa (inclusive sub-etapas)."""
+    for chave, valor in resultado.items():
+        if isinstance(valor, dict):
+            yield from _metricas_comparaveis(valor, f"{prefixo}{chave}.")
+        elif chave.endswith("_ms") or chave in ("questoes_por_s", "pico_rss_mb"):
+            yield f"{prefixo}{chave}", valor
+
+
+def comparar(atual: Dict, anterior: Dict, tolerancia: float) -> List[str]:
+    """
+    Compara duas execuções e lista as métricas que pioraram além da tolerância.
+    
+    Args:
+        atual: Resultado da execução atual
+        anterior: Resultado salvo de uma execução anterior
+        tolerancia: Piora relativa aceita (0.1 = 10%)
+    
+    Returns:
+        Descrição das regressões encontradas
+    """
+    regressoes = []
+    for etapa, resultado in atual["etapas"].items():
+        base = dict(_metricas_comparaveis(anterior.get("etapas", {}).get(etapa, {})))
+        for metrica, valor in _metricas_comparaveis(resultado):
+            referencia = base.get(metrica)
+            if not referencia:
+                continue
+            # Para questões/s, maior é melhor; para o resto, menor é melhor
+            if metrica.endswith("questoes_por_s"):
+                variacao = (referencia - valor) / referencia
+            else:
+                variacao = (valor - referencia) / referencia
+            # Diferenças abaixo de 0,01 ms são ruído de medição
+            if metrica.endswith("_ms") and abs(valor - referencia) < 0.01:
+                continue
+            if variacao > tolerancia:
+                regressoes.append(f"{etapa}.{metrica}: {referencia} → {valor} ({variacao * 100:+.1f}%)")
+    return regressoes
+
+
+def main():
+    """Função principal."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Benchmarks do pipeline de resolução')
+    parser.add_argument('--provas', default='provas', help='Pasta com os arquivos .jsonl (padrão: provas)')
+    parser.add_argument('--questoes', type=int, default=500, help='Questões usadas nas etapas por questão (padrão: 500; 0 = todas)')
+    parser.add_argument('--repeticoes', type=int, default=5, help='Repetições das etapas rápidas (padrão: 5)')
+    parser.add_argument('--workers', type=int, default=16, help='Requisições simultâneas na etapa de requisições (padrão: 16)')
+    parser.add_argument('--latencia', type=float, default=0.05, help='Latência mediana do servidor local, em segundos (padrão: 0.05)')
+    parser.add_argument('--dispersao', type=float, default=0.3, help='Dispersão log-normal da latência (padrão: 0.3)')
+    parser.add_argument('--seed', type=int, default=42, help='Semente do servidor local (padrão: 42)')
+    parser.add_argument('--etapas', nargs='+', choices=ETAPAS, default=list(ETAPAS), help='Etapas a executar')
+    parser.add_argument('--etiqueta', default=None, help='Nome do arquivo de resultado (padrão: hash do commit)')
+    parser.add_argument('--comparar', default=None, help='Resultado anterior (JSON) para detectar regressões')
+    parser.add_argument('--tolerancia', type=float, default=0.10, help='Piora relativa aceita na comparação (padrão: 0.10)')
+    parser.add_argument('--etapa-interna', default=None, help=argparse.SUPPRESS)
+    
+    args = parser.parse_args()
+    
+    if args.etapa_interna:
+        print(json.dumps(_executar_etapa(args.etapa_interna, args)))
+        return
+    
+    if not list(Path(args.provas).glob("*.jsonl")):
+        print(f"❌ Nenhum arquivo .jsonl encontrado em '{args.provas}'")
+        sys.exit(1)
+    
+    # Repassa as opções para os subprocessos das etapas
+    argv = [
+        "--provas", str(Path(args.provas).resolve()),
+        "--questoes", str(args.questoes),
+        "--repeticoes", str(args.repeticoes),
+        "--workers", str(args.workers),
+        "--latencia", str(args.latencia),
+        "--dispersao", str(args.dispersao),
+        "--seed", str(args.seed)
+    ]
+    
+    print("=" * 80)
+    print("⏱️  BENCHMARKS DO PIPELINE")
+    print("=" * 80)
+    print()
+    
+    etapas = {}
+    for nome in args.etapas:
+        print(f"▶️  {nome}...", end=' ', flush=True)
+        etapas[nome] = _executar_em_subprocesso(nome, argv)
+        if "erro" in etapas[nome]:
+            print(f"❌ {etapas[nome]['erro']}")
+        else:
+            print("✅")
+    
+    print()
+    print(f"{'Etapa':<40} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10} {'questões/s':>12} {'RSS (MB)':>10}")
+    print("-" * 96)
+    for nome, resultado in etapas.items():
+        if "erro" in resultado:
+            continue
+        linhas = [(nome, resultado)]
+        if nome == "carregamento":
+            linhas = [(f"{nome} ({sub})", dados) for sub, dados in resultado.items() if isinstance(dados, dict)]
+        for rotulo, dados in linhas:
+            print(
+                f"{rotulo:<40} {dados['p50_ms']:>10.3f} {dados['p95_ms']:>10.3f} {dados['p99_ms']:>10.3f} "
+                f"{dados['questoes_por_s']:>12,.1f} {resultado['pico_rss_mb']:>10.1f}"
+            )
+    print()
+    
+    resultado_final = {
+        "etiqueta": args.etiqueta or _etiqueta_padrao(),
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "parametros": {
+            "questoes": args.questoes,
+            "repeticoes": args.repeticoes,
+            "workers": args.workers,
+            "latencia": args.latencia,
+            "dispersao": args.dispersao,
+            "seed": args.seed
+        },
+        "etapas": etapas
+    }
+    
+    PASTA_RESULTADOS.mkdir(exist_ok=True)
+    arquivo = PASTA_RESULTADOS / f"{resultado_final['etiqueta']}.json"
+    with open(arquivo, 'w', encoding='utf-8') as f:
+        json.dump(resultado_final, f, ensure_ascii=False, indent=2)
+    print(f"💾 Resultado salvo em: {arquivo}")
+    
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            anterior = json.load(f)
+        regressoes = comparar(resultado_final, anterior, args.tolerancia)
+        print()
+        if regressoes:
+            print(f"⚠️  {len(regressoes)} regressões em relação a {anterior.get('etiqueta', args.comparar)}:")
+            for regressao in regressoes:
+                print(f"   - {regressao}")
+            sys.exit(1)
+        print(f"✅ Sem regressões acima de {args.tolerancia * 100:.0f}% em relação a {anterior.get('etiqueta', args.comparar)}")
+
+
+if __name__ == "__main__":
+    main()
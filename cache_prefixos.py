@@ -0,0 +1,124 @@
+"""
+Cache de prefixos para a inferência local (past_key_values)
+
+Os prompts das questões começam pelo mesmo cabeçalho ("Questão do ENEM -
+{area}") e, nas questões de um mesmo texto-base, pelo mesmo contexto. O
+estado de atenção (chaves/valores) desse prefixo é calculado uma vez e
+reaproveitado pelas questões e amostras seguintes, de modo que cada
+questão processa apenas o trecho que é só seu.
+
+Os estados ficam em um LRU limitado por memória. Requer torch e
+transformers (ver `test_model.py`).
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple
+
+
+class CachePrefixos:
+    """LRU de estados de atenção de prefixos de prompt, limitado por memória."""
+    
+    def __init__(self, bytes_por_token: int, max_mb: float = 1024):
+        """
+        Cria o cache vazio.
+        
+        Args:
+            bytes_por_token: Memória do estado de atenção por token (ver
+                `test_model._kv_bytes_per_token`)
+            max_mb: Memória máxima ocupada pelos estados guardados
+        """
+        self.bytes_por_token = bytes_por_token
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._estados = OrderedDict()  # prefixo (ids) -> estado
+        self._ocupado = 0
+        
+        self.hits = 0
+        self.misses = 0
+        self.tokens_reaproveitados = 0
+        self.tokens_calculados = 0
+    
+    def _tamanho(self, prefixo: Tuple[int, ...]) -> int:
+        return len(prefixo) * self.bytes_por_token
+    
+    def obter(self, model, prefixo: Tuple[int, ...], usos: int = 1):
+        """
+        Retorna o estado de atenção do prefixo, calculando-o se necessário.
+        
+        O estado retornado é um `DynamicCache` compartilhado: depois de usá-lo
+        (o modelo acrescenta nele os tokens seguintes), chame `restaurar`, ou
+        use uma cópia (ver `test_model._prefixed_batch`).
+        
+        Args:
+            model: Modelo (PEFT) carregado por `test_model.load_model_safe`
+            prefixo: Ids dos tokens do prefixo (incluindo o BOS)
+            usos: Prompts que vão usar o estado (ex.: as linhas de um lote);
+                os usos além do primeiro contam como reaproveitamento
+        
+        Returns:
+            Estado de atenção com exatamente `len(prefixo)` posições
+        """
+        estado = self._estados.get(prefixo)
+        if estado is not None:
+            self._estados.move_to_end(prefixo)
+            self.hits += usos
+            self.tokens_reaproveitados += len(prefixo) * usos
+            return estado
+        
+        import torch
+        from transformers import DynamicCache
+        
+        self.misses += 1
+        self.hits += usos - 1
+        self.tokens_calculados += len(prefixo)
+        self.tokens_reaproveitados += len(prefixo) * (usos - 1)
+        entrada = torch.tensor([prefixo], device=model.device)
+        with torch.no_grad():
+            estado = model(input_ids=entrada, past_key_values=DynamicCache(), use_cache=True).past_key_values
+        
+        tamanho = self._tamanho(prefixo)
+        if tamanho <= self.max_bytes:
+            self._estados[prefixo] = estado
+            self._ocupado += tamanho
+            while self._ocupado > self.max_bytes:
+                removido, _ = self._estados.popitem(last=False)
+                self._ocupado -= self._tamanho(removido)
+        return estado
+    
+    @staticmethod
+    def restaurar(estado, prefixo: Tuple[int, ...]):
+        """Descarta do estado as posições acrescentadas depois do prefixo."""
+        estado.crop(len(prefixo))
+    
+    def estatisticas(self) -> Dict:
+        """Retorna estatísticas de uso do cache."""
+        total = self.tokens_reaproveitados + self.tokens_calculados
+        return {
+            "prefixos": len(self._estados),
+            "ocupacao_mb": round(self._ocupado / (1024 * 1024), 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "tokens_reaproveitados": self.tokens_reaproveitados,
+            "taxa_reaproveitamento": round(self.tokens_reaproveitados / total * 100, 2) if total else 0.0
+        }
+
+
+def dividir_prefixo(ids_prompt: Sequence[int], ids_prefixo: Sequence[int]) -> Tuple[Tuple[int, ...], List[int]]:
+    """
+    Separa os ids de um prompt em prefixo compartilhado e sufixo.
+    
+    A tokenização do prompt inteiro pode diferir da do prefixo isolado na
+    fronteira entre os dois; vale o maior trecho inicial em comum. O sufixo
+    sempre mantém ao menos um token (a última posição produz os logits).
+    
+    Args:
+        ids_prompt: Ids do prompt completo
+        ids_prefixo: Ids do texto do prefixo tokenizado isoladamente
+    
+    Returns:
+        (ids do prefixo, ids do sufixo)
+    """
+    limite = min(len(ids_prefixo), len(ids_prompt) - 1)
+    comum = 0
+    while comum < limite and ids_prompt[comum] == ids_prefixo[comum]:
+        comum += 1
+    return tuple(ids_prompt[:comum]), list(ids_prompt[comum:])
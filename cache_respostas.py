@@ -0,0 +1,206 @@
+"""
+Cache em disco das respostas da API Maritaca
+
+Guarda cada resposta de chat completion em um arquivo SQLite, indexada pelo
+hash do conteúdo da requisição (modelo, mensagens, temperature, top_p,
+max_tokens e stop). Reexecuções com os mesmos prompts são atendidas do disco, sem
+custo de API.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+# Campos do payload que determinam a resposta
+CAMPOS_CHAVE = ("model", "messages", "temperature", "top_p", "max_tokens")
+
+# Campos que entram na chave apenas quando presentes (mantém as chaves
+# das entradas gravadas antes de eles existirem)
+CAMPOS_CHAVE_OPCIONAIS = ("stop", "amostra")
+
+
+class CacheRespostas:
+    """Cache SQLite de respostas, endereçado pelo conteúdo da requisição."""
+    
+    def __init__(
+        self,
+        caminho: str = "cache_respostas.sqlite",
+        max_mb: Optional[float] = None,
+        max_idade_dias: Optional[float] = None,
+        replay: bool = False
+    ):
+        """
+        Abre (ou cria) o cache.
+        
+        Args:
+            caminho: Arquivo SQLite do cache
+            max_mb: Tamanho máximo das respostas armazenadas; as menos usadas
+                recentemente são removidas quando o limite é ultrapassado
+            max_idade_dias: Idade máxima de uma entrada; entradas mais antigas
+                são ignoradas e removidas
+            replay: Modo somente leitura. Nada é gravado e uma requisição
+                ausente do cache gera erro em vez de chamar a API, garantindo
+                uma reavaliação determinística
+        """
+        self.caminho = Path(caminho)
+        self.max_bytes = int(max_mb * 1024 * 1024) if max_mb else None
+        self.max_idade = max_idade_dias * 86400 if max_idade_dias else None
+        self.replay = replay
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        if replay and not self.caminho.exists():
+            raise FileNotFoundError(f"Cache não encontrado para modo replay: {self.caminho}")
+        
+        if replay:
+            self._conn = sqlite3.connect(f"file:{self.caminho}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(str(self.caminho), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS respostas (
+                    chave TEXT PRIMARY KEY,
+                    resposta TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    criado_em REAL NOT NULL,
+                    acessado_em REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_acessado ON respostas (acessado_em)")
+            self._conn.commit()
+            self.remover_expirados()
+    
+    @staticmethod
+    def calcular_chave(payload: Dict) -> str:
+        """
+        Calcula a chave de cache de um payload de chat completion.
+        
+        Args:
+            payload: Corpo da requisição enviado à API
+        
+        Returns:
+            Hash SHA-256 (hex) dos campos relevantes do payload
+        """
+        conteudo = {campo: payload.get(campo) for campo in CAMPOS_CHAVE}
+        for campo in CAMPOS_CHAVE_OPCIONAIS:
+            if payload.get(campo) is not None:
+                conteudo[campo] = payload[campo]
+        serializado = json.dumps(conteudo, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(serializado.encode("utf-8")).hexdigest()
+    
+    def obter(self, chave: str) -> Optional[Dict]:
+        """
+        Busca uma resposta no cache.
+        
+        Args:
+            chave: Chave calculada por `calcular_chave`
+        
+        Returns:
+            Resposta armazenada ou None se ausente/expirada
+        """
+        agora = time.time()
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT resposta, criado_em FROM respostas WHERE chave = ?", (chave,)
+            ).fetchone()
+            
+            if linha is None or (self.max_idade and agora - linha[1] > self.max_idade):
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            if not self.replay:
+                self._conn.execute("UPDATE respostas SET acessado_em = ? WHERE chave = ?", (agora, chave))
+                self._conn.commit()
+        
+        return json.loads(linha[0])
+    
+    def salvar(self, chave: str, resposta: Dict):
+        """
+        Armazena uma resposta no cache (ignorado em modo replay).
+        
+        Args:
+            chave: Chave calculada por `calcular_chave`
+            resposta: Resposta da API em formato JSON
+        """
+        if self.replay:
+            return
+        
+        serializado = json.dumps(resposta, ensure_ascii=False)
+        agora = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO respostas VALUES (?, ?, ?, ?, ?)",
+                (chave, serializado, len(serializado.encode("utf-8")), agora, agora)
+            )
+            self._conn.commit()
+            self._aplicar_limite_tamanho()
+    
+    def remover_expirados(self) -> int:
+        """Remove entradas mais antigas que `max_idade_dias`. Retorna quantas foram removidas."""
+        if not self.max_idade or self.replay:
+            return 0
+        
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM respostas WHERE criado_em < ?", (time.time() - self.max_idade,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+    
+    def _aplicar_limite_tamanho(self):
+        """Remove as entradas menos usadas até respeitar `max_mb` (chamado com o lock)."""
+        if not self.max_bytes:
+            return
+        
+        total = self._conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        # Libera um pouco além do necessário para não repetir a limpeza a cada escrita
+        excesso = total - int(self.max_bytes * 0.9)
+        removidos = 0
+        chaves = []
+        for chave, tamanho in self._conn.execute("SELECT chave, tamanho FROM respostas ORDER BY acessado_em"):
+            if removidos >= excesso:
+                break
+            chaves.append((chave,))
+            removidos += tamanho
+        
+        self._conn.executemany("DELETE FROM respostas WHERE chave = ?", chaves)
+        self._conn.commit()
+    
+    def estatisticas(self) -> Dict:
+        """Retorna contadores de uso do cache."""
+        with self._lock:
+            entradas, tamanho = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM respostas"
+            ).fetchone()
+        
+        consultas = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "taxa_acerto": round(self.hits / consultas * 100, 2) if consultas else 0.0,
+            "entradas": entradas,
+            "tamanho_mb": round(tamanho / (1024 * 1024), 2)
+        }
+    
+    def close(self):
+        """Fecha o arquivo do cache."""
+        with self._lock:
+            self._conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,293 @@
+"""
+Compilação do modelo local: LoRA mesclado, int8 opcional e artefato safetensors
+
+Carregar o SABIA-7B em fp32 e aplicar o adapter com `PeftModel` a cada
+execução leva minutos e ~28 GB de RAM. Este script faz isso uma única vez:
+mescla o LoRA nos pesos do modelo base (`merge_and_unload`), opcionalmente
+quantiza as camadas lineares em int8 (por canal, para CPU) e grava o
+resultado em um único `model.safetensors`. As cargas seguintes leem esse
+arquivo direto para os parâmetros, sem inicializar pesos nem mesclar nada,
+e terminam em segundos; em int8 o modelo ocupa cerca de 1/4 da memória.
+
+Uso:
+    python compilar_modelo.py --adapter ./checkpoint-367 --int8
+    python test_model.py --modelo-compilado modelo_compilado
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+
+ARQUIVO_PESOS = "model.safetensors"
+ARQUIVO_COMPILACAO = "compilacao.json"
+VERSAO_COMPILACAO = 1
+
+# Camadas lineares que permanecem em ponto flutuante no modo int8
+CAMADAS_NAO_QUANTIZADAS = ("lm_head",)
+
+
+def _assinatura_adapter(adapter_path: str) -> Dict:
+    """Identifica a versão dos pesos do adapter (tamanho e data dos arquivos)."""
+    assinatura = {}
+    for arquivo in sorted(Path(adapter_path).glob("adapter_*")):
+        info = arquivo.stat()
+        assinatura[arquivo.name] = [info.st_size, info.st_mtime_ns]
+    return assinatura
+
+
+def _descricao_compilacao(base_model_path: str, adapter_path: str, int8: bool, dtype: str) -> Dict:
+    return {
+        "versao": VERSAO_COMPILACAO,
+        "base": str(base_model_path),
+        "adapter": str(Path(adapter_path).resolve()),
+        "assinatura_adapter": _assinatura_adapter(adapter_path),
+        "int8": int8,
+        "dtype": dtype
+    }
+
+
+def artefato_atualizado(destino: str, base_model_path: str, adapter_path: str,
+                        int8: bool = False, dtype: str = "float32") -> bool:
+    """Indica se `destino` contém a compilação desses pesos com essas opções."""
+    destino = Path(destino)
+    try:
+        with open(destino / ARQUIVO_COMPILACAO, 'r', encoding='utf-8') as f:
+            gravada = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return False
+    
+    return (destino / ARQUIVO_PESOS).exists() and gravada == _descricao_compilacao(base_model_path, adapter_path, int8, dtype)
+
+
+def _quantizar_int8(peso):
+    """Quantiza um peso (saídas x entradas) em int8 simétrico por canal de saída."""
+    import torch
+    
+    escala = peso.abs().amax(dim=1).clamp(min=1e-8) / 127.0
+    quantizado = torch.round(peso / escala[:, None]).clamp(-127, 127).to(torch.int8)
+    return quantizado, escala.to(torch.float32)
+
+
+def compilar_modelo(base_model_path: str, adapter_path: str = "./checkpoint-367",
+                    destino: str = "modelo_compilado", int8: bool = False,
+                    dtype: str = "float32") -> Path:
+    """
+    Mescla o adapter LoRA no modelo base e grava o artefato compilado.
+    
+    Args:
+        base_model_path: Caminho (ou nome) do modelo base SABIA-7B
+        adapter_path: Checkpoint do adapter LoRA
+        destino: Pasta do artefato
+        int8: Quantiza as camadas lineares em int8 por canal (CPU)
+        dtype: Tipo dos demais pesos ("float32" ou "bfloat16"; int8 exige float32)
+    
+    Returns:
+        Pasta do artefato
+    """
+    if int8 and dtype != "float32":
+        raise ValueError("A quantização int8 (matmul dinâmico na CPU) exige dtype float32")
+    
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+    from peft import PeftModel
+    from safetensors.torch import save_file
+    
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    tipo = getattr(torch, dtype)
+    
+    print(f"📥 Carregando modelo base: {base_model_path}")
+    model = AutoModelForCausalLM.from_pretrained(
+        base_model_path,
+        torch_dtype=torch.float32,
+        trust_remote_code=True,
+        low_cpu_mem_usage=True
+    )
+    print(f"📥 Mesclando adapter LoRA de: {adapter_path}")
+    model = PeftModel.from_pretrained(model, adapter_path).merge_and_unload()
+    model.eval()
+    
+    lineares = set()
+    if int8:
+        lineares = {
+            nome for nome, modulo in model.named_modules()
+            if isinstance(modulo, torch.nn.Linear) and not nome.endswith(CAMADAS_NAO_QUANTIZADAS)
+        }
+    
+    print(f"💾 Gravando pesos ({'int8 por canal' if int8 else dtype})...")
+    tensores = {}
+    vistos = set()
+    with torch.no_grad():
+        for nome, tensor in model.state_dict().items():
+            # Pesos compartilhados (ex.: embeddings ligados) são gravados uma vez
+            # e religados por `tie_weights` na carga
+            if tensor.data_ptr() in vistos:
+                continue
+            vistos.add(tensor.data_ptr())
+            
+            modulo = nome.rsplit('.', 1)[0]
+            if nome.endswith('.weight') and modulo in lineares:
+                tensores[nome], tensores[nome + '_scale'] = _quantizar_int8(tensor.float())
+            else:
+                tensores[nome] = tensor.to(tipo).contiguous()
+    
+    save_file(tensores, str(destino / ARQUIVO_PESOS), metadata={"int8": str(int8)})
+    del tensores
+    
+    model.config.torch_dtype = dtype
+    model.config.save_pretrained(destino)
+    AutoTokenizer.from_pretrained(base_model_path, trust_remote_code=True).save_pretrained(destino)
+    
+    with open(destino / ARQUIVO_COMPILACAO, 'w', encoding='utf-8') as f:
+        json.dump(_descricao_compilacao(base_model_path, adapter_path, int8, dtype), f, ensure_ascii=False, indent=2)
+    
+    tamanho_gb = (destino / ARQUIVO_PESOS).stat().st_size / 1e9
+    print(f"✅ Artefato salvo em {destino} ({tamanho_gb:.2f} GB)")
+    return destino
+
+
+def carregar_modelo_compilado(destino: str = "modelo_compilado"):
+    """
+    Carrega um artefato gerado por `compilar_modelo`.
+    
+    O modelo é criado sem alocar pesos e os tensores lidos do safetensors são
+    atribuídos diretamente aos parâmetros (sem cópia extra nem inicialização
+    aleatória). No modo int8 as camadas lineares viram
+    `torch.ao.nn.quantized.dynamic.Linear` (matmul int8 na CPU).
+    
+    Raises:
+        RuntimeError: Se o artefato não tiver todos os pesos do modelo
+            (exceto os ligados, como `lm_head` com embeddings compartilhados)
+            ou tiver pesos que o modelo não conhece
+    
+    Args:
+        destino: Pasta do artefato
+    
+    Returns:
+        (model, tokenizer) prontos para inferência
+    """
+    import torch
+    from accelerate import init_empty_weights
+    from transformers import AutoConfig, AutoModelForCausalLM, AutoTokenizer
+    from safetensors.torch import load_file
+    
+    destino = Path(destino)
+    config = AutoConfig.from_pretrained(destino, trust_remote_code=True)
+    tipo = getattr(torch, str(config.torch_dtype).replace("torch.", "")) if config.torch_dtype else torch.float32
+    
+    # Só os parâmetros ficam sem memória; buffers calculados na criação
+    # (ex.: frequências do RoPE) continuam válidos
+    with init_empty_weights():
+        model = AutoModelForCausalLM.from_config(config, torch_dtype=tipo, trust_remote_code=True)
+    
+    estado = load_file(str(destino / ARQUIVO_PESOS))
+    
+    # Camadas int8: montar o Linear quantizado dinâmico que substituirá o Linear
+    quantizadas = {}
+    for nome in [n for n, t in estado.items() if t.dtype == torch.int8]:
+        modulo_nome = nome.rsplit('.', 1)[0]
+        linear = model.get_submodule(modulo_nome)
+        
+        quantizado = torch.ao.nn.quantized.dynamic.Linear(
+            linear.in_features, linear.out_features, bias_=linear.bias is not None, dtype=torch.qint8
+        )
+        escala = estado.pop(nome + '_scale')
+        # Os inteiros já estão na grade da escala: requantizar os reproduz exatamente
+        peso = torch.quantize_per_channel(
+            estado.pop(nome).float() * escala[:, None], escala.double(),
+            torch.zeros_like(escala, dtype=torch.long), 0, torch.qint8
+        )
+        bias = estado.pop(modulo_nome + '.bias', None)
+        quantizado.set_weight_bias(peso, bias.float() if bias is not None else None)
+        quantizadas[modulo_nome] = quantizado
+    
+    # strict=False só porque os pesos das camadas int8 já foram consumidos acima
+    # e os pesos ligados não são gravados; qualquer outra diferença é um erro
+    resultado = model.load_state_dict(estado, strict=False, assign=True)
+    ligados = set(getattr(model, '_tied_weights_keys', None) or ()) if config.tie_word_embeddings else set()
+    faltando = [
+        nome for nome in resultado.missing_keys
+        if nome not in ligados and nome.rsplit('.', 1)[0] not in quantizadas
+    ]
+    if faltando or resultado.unexpected_keys:
+        raise RuntimeError(
+            f"Artefato incompatível com o modelo em {destino}: "
+            f"pesos ausentes {faltando[:5]}, pesos desconhecidos {resultado.unexpected_keys[:5]} "
+            f"(recompile com --forcar)"
+        )
+    
+    for modulo_nome, quantizado in quantizadas.items():
+        pai_nome, _, filho = modulo_nome.rpartition('.')
+        setattr(model.get_submodule(pai_nome) if pai_nome else model, filho, quantizado)
+    model.tie_weights()
+    model.eval()
+    
+    tokenizer = AutoTokenizer.from_pretrained(destino, trust_remote_code=True)
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = "left"
+    
+    return model, tokenizer
+
+
+def carregar_ou_compilar(base_model_path: str, adapter_path: str = "./checkpoint-367",
+                         destino: str = "modelo_compilado", int8: bool = False,
+                         dtype: str = "float32"):
+    """
+    Carrega o artefato compilado, compilando-o antes se não existir ou estiver desatualizado.
+    
+    Returns:
+        (model, tokenizer)
+    """
+    if not artefato_atualizado(destino, base_model_path, adapter_path, int8, dtype):
+        print(f"🔧 Artefato ausente ou desatualizado em {destino}; compilando (apenas uma vez)...")
+        compilar_modelo(base_model_path, adapter_path, destino, int8, dtype)
+    
+    inicio = time.perf_counter()
+    model, tokenizer = carregar_modelo_compilado(destino)
+    print(f"✅ Modelo compilado carregado em {time.perf_counter() - inicio:.1f}s\n")
+    return model, tokenizer
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(
+        description='Mescla o adapter LoRA no modelo base e grava um artefato de carga rápida'
+    )
+    parser.add_argument('--base', default=None, help='Modelo base (padrão: procurado como em test_model.py)')
+    parser.add_argument('--adapter', default='./checkpoint-367', help='Checkpoint do adapter LoRA (padrão: ./checkpoint-367)')
+    parser.add_argument('--saida', default='modelo_compilado', help='Pasta do artefato (padrão: modelo_compilado)')
+    parser.add_argument('--int8', action='store_true', help='Quantizar as camadas lineares em int8 (CPU)')
+    parser.add_argument('--dtype', choices=['float32', 'bfloat16'], default='float32',
+                        help='Tipo dos pesos não quantizados (padrão: float32)')
+    parser.add_argument('--forcar', action='store_true', help='Recompilar mesmo com artefato atualizado')
+    
+    args = parser.parse_args()
+    
+    try:
+        import torch  # noqa: F401
+        import peft  # noqa: F401
+        import safetensors  # noqa: F401
+    except ImportError as e:
+        print(f"❌ Erro ao importar dependências: {e}")
+        print("Instale as dependências com: pip install -r requirements.txt")
+        sys.exit(1)
+    
+    base = args.base
+    if base is None:
+        from test_model import find_base_model
+        base = find_base_model() or "sabia-7b"
+    
+    if not args.forcar and artefato_atualizado(args.saida, base, args.adapter, args.int8, args.dtype):
+        print(f"✅ Artefato já atualizado em {args.saida} (use --forcar para recompilar)")
+        return
+    
+    compilar_modelo(base, args.adapter, args.saida, args.int8, args.dtype)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Carregamento compartilhado das provas do ENEM (provas/*.jsonl)
+
+Na primeira leitura as questões são parseadas e gravadas em um cache binário
+(pickle protocolo 5) dentro da própria pasta das provas. Nas leituras seguintes,
+se nenhum arquivo .jsonl mudou (nome, tamanho e mtime), o cache é carregado
+diretamente, sem parsear JSON.
+
+Para amostragens pequenas há também um índice por arquivo (provas/.indice/)
+com a posição em bytes de cada linha e as colunas área, exame e id. Com ele,
+`amostrar_questoes` lê do disco apenas as linhas sorteadas.
+"""
+
+import bisect
+import json
+import os
+import pickle
+import random
+from array import array
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from questao_enem import area_questao
+
+
+ARQUIVO_CACHE = ".cache_corpus.pkl"
+VERSAO_CACHE = 1
+
+PASTA_INDICE = ".indice"
+VERSAO_INDICE = 2
+
+
+def _assinatura(arquivos: List[Path]) -> List[tuple]:
+    """Identifica o estado atual dos arquivos (nome, tamanho, mtime)."""
+    assinatura = []
+    for arquivo in arquivos:
+        stat = arquivo.stat()
+        assinatura.append((arquivo.name, stat.st_size, stat.st_mtime_ns))
+    return assinatura
+
+
+def _parsear_arquivo(arquivo: Path) -> Dict:
+    """Lê um arquivo JSONL e retorna suas questões e erros de parsing."""
+    questoes = []
+    erros = []
+    
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        for linha_num, linha in enumerate(f, 1):
+            linha = linha.strip()
+            if linha:
+                try:
+                    questao = json.loads(linha)
+                    # Adicionar nome do arquivo de origem
+                    questao['arquivo_origem'] = arquivo.name
+                    questoes.append(questao)
+                except json.JSONDecodeError as e:
+                    erros.append((linha_num, str(e)))
+    
+    return {
+        "arquivo": arquivo.name,
+        "tamanho": arquivo.stat().st_size,
+        "questoes": questoes,
+        "erros": erros
+    }
+
+
+def _ler_cache(caminho_cache: Path, assinatura: List[tuple]):
+    """Retorna os arquivos do cache se ele corresponder à assinatura atual."""
+    try:
+        with open(caminho_cache, 'rb') as f:
+            dados = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    
+    if dados.get("versao") != VERSAO_CACHE or dados.get("assinatura") != assinatura:
+        return None
+    return dados["arquivos"]
+
+
+def _gravar_pickle(caminho: Path, dados: Dict):
+    """Grava um pickle de forma atômica; falhas de escrita são ignoradas."""
+    temporario = caminho.with_name(caminho.name + '.tmp')
+    try:
+        with open(temporario, 'wb') as f:
+            pickle.dump(dados, f, protocol=5)
+        os.replace(temporario, caminho)
+    except OSError:
+        pass
+
+
+def carregar_arquivos(pasta_provas: str = "provas", usar_cache: bool = True) -> List[Dict]:
+    """
+    Carrega as provas agrupadas por arquivo.
+    
+    Args:
+        pasta_provas: Pasta com os arquivos .jsonl
+        usar_cache: Se False, ignora o cache binário e parseia os arquivos
+    
+    Returns:
+        Lista (ordenada por nome) de dicionários com as chaves `arquivo`,
+        `tamanho` (bytes), `questoes` e `erros` [(linha, mensagem)]. Cada
+        questão inclui o campo `arquivo_origem`.
+    """
+    pasta = Path(pasta_provas)
+    arquivos = sorted(pasta.glob("*.jsonl"))
+    if not arquivos:
+        return []
+    
+    assinatura = _assinatura(arquivos)
+    caminho_cache = pasta / ARQUIVO_CACHE
+    
+    if usar_cache:
+        dados = _ler_cache(caminho_cache, assinatura)
+        if dados is not None:
+            return dados
+    
+    dados = []
+    for arquivo in arquivos:
+        try:
+            dados.append(_parsear_arquivo(arquivo))
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"⚠️  Erro ao ler {arquivo.name}: {e}")
+    
+    if usar_cache and len(dados) == len(arquivos):
+        _gravar_pickle(caminho_cache, {"versao": VERSAO_CACHE, "assinatura": assinatura, "arquivos": dados})
+    
+    return dados
+
+
+def carregar_corpus(pasta_provas: str = "provas", usar_cache: bool = True) -> List[Dict]:
+    """
+    Carrega todas as questões das provas em uma única lista.
+    
+    Args:
+        pasta_provas: Pasta com os arquivos .jsonl
+        usar_cache: Se False, ignora o cache binário e parseia os arquivos
+    
+    Returns:
+        Lista de questões (com o campo `arquivo_origem`)
+    """
+    questoes = []
+    for dados_arquivo in carregar_arquivos(pasta_provas, usar_cache):
+        questoes.extend(dados_arquivo["questoes"])
+    return questoes
+
+
+def _construir_indice(arquivo: Path) -> Dict:
+    """Percorre um arquivo JSONL registrando a posição e as colunas de cada questão."""
+    offsets = array('q')
+    areas = []
+    exames = []
+    ids = []
+    
+    with open(arquivo, 'rb') as f:
+        posicao = 0
+        for linha in f:
+            if linha.strip():
+                try:
+                    questao = json.loads(linha)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    questao = None
+                
+                if questao is not None:
+                    offsets.append(posicao)
+                    areas.append(area_questao(questao) or 'N/A')
+                    exames.append(str(questao.get('exam') or questao.get('ano') or questao.get('year') or ''))
+                    ids.append(questao.get('id') or questao.get('number', ''))
+            posicao += len(linha)
+    
+    return {"offsets": offsets, "areas": areas, "exames": exames, "ids": ids}
+
+
+def carregar_indice(arquivo: Path) -> Dict:
+    """
+    Carrega (ou constrói) o índice de um arquivo JSONL das provas.
+    
+    O índice fica em `<pasta>/.indice/<arquivo>.idx` e é reconstruído quando o
+    tamanho ou o mtime do arquivo mudam.
+    
+    Args:
+        arquivo: Arquivo .jsonl
+    
+    Returns:
+        Dicionário com as colunas `offsets` (posição em bytes de cada linha),
+        `areas`, `exames` e `ids`, alinhadas por questão
+    """
+    arquivo = Path(arquivo)
+    stat = arquivo.stat()
+    assinatura = (stat.st_size, stat.st_mtime_ns)
+    caminho_indice = arquivo.parent / PASTA_INDICE / (arquivo.name + '.idx')
+    
+    try:
+        with open(caminho_indice, 'rb') as f:
+            dados = pickle.load(f)
+        if dados.get("versao") == VERSAO_INDICE and dados.get("assinatura") == assinatura:
+            return dados["indice"]
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        pass
+    
+    indice = _construir_indice(arquivo)
+    try:
+        caminho_indice.parent.mkdir(exist_ok=True)
+    except OSError:
+        return indice
+    _gravar_pickle(caminho_indice, {"versao": VERSAO_INDICE, "assinatura": assinatura, "indice": indice})
+    return indice
+
+
+def amostrar_questoes(
+    pasta_provas: str = "provas",
+    k: int = 5,
+    por_area: bool = False,
+    seed: Optional[int] = None
+) -> List[Dict]:
+    """
+    Sorteia k questões lendo do disco apenas as linhas sorteadas.
+    
+    Args:
+        pasta_provas: Pasta com os arquivos .jsonl
+        k: Número de questões
+        por_area: Distribui a amostra igualmente entre as áreas (as vagas
+            das áreas com poucas questões passam para as demais)
+        seed: Semente do sorteio (para amostras reproduzíveis)
+    
+    Returns:
+        Questões sorteadas (com o campo `arquivo_origem`)
+    """
+    arquivos = sorted(Path(pasta_provas).glob("*.jsonl"))
+    indices = [carregar_indice(arquivo) for arquivo in arquivos]
+    
+    # Posição global de cada questão = início do arquivo + posição no índice
+    inicios = []
+    total = 0
+    for indice in indices:
+        inicios.append(total)
+        total += len(indice["offsets"])
+    
+    if total == 0 or k <= 0:
+        return []
+    
+    rng = random.Random(seed)
+    
+    if por_area:
+        posicoes_por_area = defaultdict(list)
+        for inicio, indice in zip(inicios, indices):
+            for i, area in enumerate(indice["areas"]):
+                posicoes_por_area[area].append(inicio + i)
+        
+        # Reparte k entre as áreas; as primeiras recebem o resto da divisão
+        areas = sorted(posicoes_por_area)
+        rng.shuffle(areas)
+        sorteadas = []
+        for n, area in enumerate(areas):
+            quota = k // len(areas) + (1 if n < k % len(areas) else 0)
+            posicoes = posicoes_por_area[area]
+            escolhidas = rng.sample(posicoes, min(quota, len(posicoes)))
+            sorteadas.extend(escolhidas)
+            usadas = set(escolhidas)
+            posicoes_por_area[area] = [p for p in posicoes if p not in usadas]
+        
+        # Vagas não preenchidas vão para as áreas que ainda têm questões
+        faltam = min(k, total) - len(sorteadas)
+        if faltam > 0:
+            restantes = [p for area in areas for p in posicoes_por_area[area]]
+            sorteadas.extend(rng.sample(restantes, faltam))
+        rng.shuffle(sorteadas)
+    else:
+        sorteadas = rng.sample(range(total), min(k, total))
+    
+    # Agrupar por arquivo para abrir cada um uma única vez
+    por_arquivo = defaultdict(list)
+    for ordem, posicao in enumerate(sorteadas):
+        n_arquivo = bisect.bisect_right(inicios, posicao) - 1
+        por_arquivo[n_arquivo].append((ordem, posicao - inicios[n_arquivo]))
+    
+    questoes = [None] * len(sorteadas)
+    for n_arquivo, linhas in por_arquivo.items():
+        offsets = indices[n_arquivo]["offsets"]
+        with open(arquivos[n_arquivo], 'rb') as f:
+            for ordem, linha in sorted(linhas, key=lambda item: item[1]):
+                f.seek(offsets[linha])
+                questao = json.loads(f.readline())
+                questao['arquivo_origem'] = arquivos[n_arquivo].name
+                questoes[ordem] = questao
+    
+    return questoes
@@ -6,7 +6,7 @@ Mostra questões e prepara para resolução quando API key estiver configurada.
 
 import json
 import random
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 
 def get_questoes_exemplo() -> List[Dict]:
@@ -85,8 +85,16 @@ def get_questoes_exemplo() -> List[Dict]:
     ]
 
 
-def mostrar_questoes(questoes: List[Dict], resolver: bool = False):
-    """Mostra as questões e opcionalmente resolve com o modelo."""
+def mostrar_questoes(questoes: List[Dict], resolver: bool = False, cache_path: Optional[str] = None, replay: bool = False):
+    """
+    Mostra as questões e opcionalmente resolve com o modelo.
+    
+    Args:
+        questoes: Questões a mostrar
+        resolver: Se True, resolve as questões com o modelo
+        cache_path: Arquivo do cache de respostas da API (opcional)
+        replay: Usa apenas respostas do cache, sem chamar a API
+    """
     
     print("=" * 80)
     print("🎓 QUESTÕES DO ENEM")
@@ -120,7 +128,12 @@ def mostrar_questoes(questoes: List[Dict], resolver: bool = False):
             
             # Agora importar e usar
             from maritaca_api import MaritacaAPI
-            client = MaritacaAPI()  # Vai usar a env var que acabamos de definir
+            from cache_respostas import CacheRespostas
+            from extrator_respostas import corrigir
+            cache = None
+            if cache_path or replay:
+                cache = CacheRespostas(cache_path or 'cache_respostas.sqlite', replay=replay)
+            client = MaritacaAPI(cache=cache)  # Vai usar a env var que acabamos de definir
             print("✅ Modelo conectado - Resolvendo questões...\n")
         except ValueError as e:
             print(f"⚠️  {e}\n")
@@ -176,9 +189,7 @@ def mostrar_questoes(questoes: List[Dict], resolver: bool = False):
                 print(resposta)
                 
                 # Verificar acerto
-                resposta_upper = resposta.upper()
-                gabarito_upper = str(questao['gabarito']).upper()
-                acertou = gabarito_upper in resposta_upper or f"ALTERNATIVA {gabarito_upper}" in resposta_upper
+                acertou, _, _ = corrigir(resposta, questao['gabarito'])
                 
                 status = "✅ CORRETO" if acertou else "❌ INCORRETO"
                 print(f"\n{status}")
@@ -198,6 +209,9 @@ def mostrar_questoes(questoes: List[Dict], resolver: bool = False):
         
         print("\n")
     
+    if client:
+        client.close()
+    
     # Resumo se resolveu
     if client and resultados:
         print("=" * 80)
@@ -234,6 +248,18 @@ def main():
         default=5,
         help='Número de questões (padrão: 5)'
     )
+    parser.add_argument(
+        '--cache',
+        nargs='?',
+        const='cache_respostas.sqlite',
+        default=None,
+        help='Reutiliza respostas armazenadas em cache SQLite (padrão: cache_respostas.sqlite)'
+    )
+    parser.add_argument(
+        '--replay',
+        action='store_true',
+        help='Usa apenas respostas do cache, sem chamar a API (implica --cache)'
+    )
     
     args = parser.parse_args()
     
@@ -242,7 +268,7 @@ def main():
     questoes = random.sample(todas_questoes, min(args.num, len(todas_questoes)))
     
     # Mostrar e resolver
-    mostrar_questoes(questoes, resolver=args.resolver)
+    mostrar_questoes(questoes, resolver=args.resolver, cache_path=args.cache, replay=args.replay)
 
 
 if __name__ == "__main__":
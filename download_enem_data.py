@@ -14,6 +14,9 @@ from pathlib import Path
 from typing import List, Dict, Optional
 import requests
 
+from corpus_enem import carregar_arquivos
+from questao_enem import Questao
+
 
 class ENEMDataDownloader:
     """Classe para baixar e processar dados do ENEM."""
@@ -97,23 +100,12 @@ class ENEMDataDownloader:
         
         todas_questoes = []
         
-        for arquivo in arquivos:
-            try:
-                with open(arquivo, 'r', encoding='utf-8') as f:
-                    for linha in f:
-                        linha = linha.strip()
-                        if linha:
-                            try:
-                                questao = json.loads(linha)
-                                todas_questoes.append(questao)
-                            except json.JSONDecodeError as e:
-                                print(f"   ⚠️  Erro ao parsear linha em {arquivo.name}: {e}")
-                                continue
-                
-                print(f"   ✅ {arquivo.name}: {len([q for q in todas_questoes if q])} questões")
-                
-            except Exception as e:
-                print(f"   ❌ Erro ao ler {arquivo.name}: {e}")
+        for dados_arquivo in carregar_arquivos(str(self.data_dir)):
+            for linha_num, erro in dados_arquivo["erros"]:
+                print(f"   ⚠️  Erro ao parsear linha {linha_num} em {dados_arquivo['arquivo']}: {erro}")
+            
+            todas_questoes.extend(dados_arquivo["questoes"])
+            print(f"   ✅ {dados_arquivo['arquivo']}: {len(dados_arquivo['questoes'])} questões")
         
         print(f"\n🏆 Total de questões carregadas: {len(todas_questoes)}")
         return todas_questoes
@@ -198,12 +190,14 @@ class ENEMDataDownloader:
         }
         
         for questao in questoes:
+            normalizada = Questao.de_dict(questao)
+            
             # Por ano
-            ano = questao.get('ano') or questao.get('year') or 'desconhecido'
+            ano = normalizada.ano or 'desconhecido'
             stats["por_ano"][ano] = stats["por_ano"].get(ano, 0) + 1
             
             # Por área
-            area = questao.get('area') or questao.get('subject') or 'desconhecida'
+            area = normalizada.area or 'desconhecida'
             stats["por_area"][area] = stats["por_area"].get(area, 0) + 1
             
             # Campos presentes
@@ -0,0 +1,121 @@
+"""
+Linha de comando unificada do projeto sabia-7b-enem-finetuned
+
+Cada subcomando repassa os argumentos para o `main()` do script
+correspondente, importado apenas quando escolhido: os comandos que usam só
+a API (resolver, demo, analisar, ...) não carregam torch/transformers e
+iniciam em uma fração de segundo.
+
+Uso:
+    python enem.py resolver --workers 8 --continuar
+    python enem.py demo --resolver -n 3
+    python enem.py --offline testar --corpus --metodo verossimilhanca
+    python enem.py --profile-startup analisar
+"""
+
+import argparse
+import importlib
+import sys
+import time
+from pathlib import Path
+
+
+# Subcomando -> (módulo, nome em inglês, descrição, usa o modelo local)
+COMANDOS = {
+    "resolver": ("resolver_todas_questoes", "solve", "Resolve todas as questões via API", False),
+    "amostra": ("resolver_questoes_enem", "sample", "Resolve uma amostra de questões via API", False),
+    "demo": ("demo_questoes_enem", None, "Demonstração com poucas questões via API", False),
+    "analisar": ("analisar_provas_enem", "analyze", "Estatísticas dos arquivos das provas", False),
+    "recorrigir": ("extrator_respostas", "regrade", "Recorrige um journal de resultados sem chamar a API", False),
+    "exportar": ("exportar_treinamento", "export", "Exporta os journals como dados de fine-tuning (SFT)", False),
+    "baixar": ("download_enem_data", "download", "Baixa e processa os dados do ENEM", False),
+    "mock": ("servidor_mock_maritaca", None, "Servidor local que imita a API Maritaca", False),
+    "testar": ("test_model", "test", "Testa o modelo local (torch, transformers, peft)", True),
+    "compilar": ("compilar_modelo", "compile", "Mescla o LoRA e grava o artefato compilado", True),
+    "checkpoints": ("avaliar_checkpoints", None, "Compara todos os checkpoints do adapter", True),
+}
+
+ALIASES = {ingles: nome for nome, (_, ingles, _, _) in COMANDOS.items() if ingles}
+
+# Bibliotecas pesadas que os comandos da API não devem carregar
+BIBLIOTECAS_PESADAS = ("torch", "transformers", "peft", "accelerate", "safetensors", "numpy")
+
+
+def importar_comando(nome: str, perfil: bool = False):
+    """
+    Importa o módulo do subcomando.
+    
+    Args:
+        nome: Subcomando (ou o nome em inglês)
+        perfil: Imprime o tempo de importação, os módulos carregados e as
+            bibliotecas pesadas presentes
+    
+    Returns:
+        Módulo importado
+    """
+    modulo_nome = COMANDOS[ALIASES.get(nome, nome)][0]
+    
+    antes = set(sys.modules)
+    inicio = time.perf_counter()
+    modulo = importlib.import_module(modulo_nome)
+    duracao = time.perf_counter() - inicio
+    
+    if perfil:
+        novos = set(sys.modules) - antes
+        pesadas = [biblioteca for biblioteca in BIBLIOTECAS_PESADAS if biblioteca in sys.modules]
+        print(f"⏱️  Importação de {modulo_nome}: {duracao * 1000:.0f} ms ({len(novos)} módulos)", file=sys.stderr)
+        print(f"   Bibliotecas pesadas carregadas: {', '.join(pesadas) or 'nenhuma'}", file=sys.stderr)
+        print("   Detalhes por módulo: python -X importtime enem.py ...", file=sys.stderr)
+    
+    return modulo
+
+
+def main():
+    """Função principal."""
+    linhas = [
+        f"  {nome:<12} {descricao}" + (f" (alias: {ingles})" if ingles else "") + (" [modelo local]" if local else "")
+        for nome, (_, ingles, descricao, local) in COMANDOS.items()
+    ]
+    parser = argparse.ArgumentParser(
+        description='Linha de comando unificada do projeto sabia-7b-enem-finetuned',
+        epilog="Comandos:\n" + "\n".join(linhas) + "\n\nUse 'enem.py <comando> --help' para as opções de cada comando.",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Não acessar o Hugging Face Hub; os modelos são procurados apenas localmente'
+    )
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='Mostrar o tempo de importação do comando e as bibliotecas carregadas'
+    )
+    parser.add_argument(
+        'comando',
+        choices=sorted(set(COMANDOS) | set(ALIASES)),
+        metavar='comando',
+        help='Comando a executar (ver lista abaixo)'
+    )
+    parser.add_argument('argumentos', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    
+    args = parser.parse_args()
+    comando = ALIASES.get(args.comando, args.comando)
+    
+    modulo = importar_comando(comando, perfil=args.profile_startup)
+    
+    if args.offline:
+        # Os scripts só importam transformers/huggingface_hub dentro de main()
+        from test_model import enable_offline_mode
+        enable_offline_mode()
+    
+    # O script vê apenas os próprios argumentos, como se fosse chamado diretamente
+    sys.argv = [f"{Path(sys.argv[0]).name} {comando}", *args.argumentos]
+    modulo.main()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrompido pelo usuário")
@@ -93,6 +93,8 @@ Analise o desempenho deste estudante e forneça orientações:"""
     except Exception as e:
         print(f"❌ Erro: {e}")
     print("\n")
+    
+    client.close()
 
 
 def exemplo_questao_enem_local():
@@ -108,10 +110,19 @@ def exemplo_questao_enem_local():
     # Configurações
     BASE_MODEL = "sabia-7b"  # Ajuste para o caminho correto do modelo base
     ADAPTER_PATH = "./checkpoint-367"  # Ajuste para o checkpoint desejado
+    MODELO_COMPILADO = "modelo_compilado"  # Gerado por: python compilar_modelo.py
     
     print("⚠️  Usando modo local (requer modelo base SABIA-7B)")
     print("💡 Recomendado: Use a API com MARITACA_API_KEY configurada\n")
     
+    # Artefato de compilar_modelo.py (LoRA já mesclado): carga em segundos
+    if Path(MODELO_COMPILADO).exists():
+        from compilar_modelo import carregar_modelo_compilado
+        print(f"Carregando modelo compilado de {MODELO_COMPILADO}...")
+        model, tokenizer = carregar_modelo_compilado(MODELO_COMPILADO)
+        print("✅ Modelo carregado!\n")
+        return
+    
     try:
         # Carregar modelo
         print(f"Carregando tokenizer de {BASE_MODEL}...")
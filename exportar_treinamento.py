@@ -0,0 +1,316 @@
+"""
+Exportação dos resultados para fine-tuning (SFT) em JSONL conversacional
+
+Lê um ou mais journals de resultados em streaming e grava os exemplos no
+formato de conversa aceito por `trl.SFTTrainer` e `datasets`, em arquivos
+de tamanho fixo (`treino-00000.jsonl`, ...). Assim, o próximo fine-tune pode
+carregá-los com `load_dataset("json", data_files=...)`, em streaming ou
+pelo cache Arrow mapeado em memória, sem montar um único arquivo JSON:
+
+    {"messages": [{"role": "system", ...}, {"role": "user", ...},
+                  {"role": "assistant", ...}], "chave": ..., "area": ...}
+
+Uso:
+    python exportar_treinamento.py progresso_resolucao.jsonl --saida dados_sft
+    python exportar_treinamento.py journal_*.jsonl --areas MATEMATICA NATUREZA --por-questao 3
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from journal_resultados import chave_resultado, indice_chaves_legadas, ler_journal
+from maritaca_api import ENEM_SYSTEM_PROMPT
+from protocolo_resposta import preparar_prompt
+from questao_enem import formatar_questao_para_prompt
+
+
+FORMATOS = ("mensagens", "prompt_completion")
+FILTROS_CORRECAO = ("acertos", "erros", "todos")
+RESPOSTAS = ("modelo", "gabarito")
+
+ARQUIVO_MANIFESTO = "manifesto.json"
+
+# Exemplos por arquivo (shard) de saída
+EXEMPLOS_POR_ARQUIVO = 50000
+
+# Linhas acumuladas antes de cada escrita no Parquet
+LOTE_PARQUET = 1000
+
+
+def montar_exemplo(resultado: Dict, questao, formato: str = "mensagens",
+                   resposta: str = "modelo") -> Optional[Dict]:
+    """
+    Converte um resultado em um exemplo de treinamento.
+    
+    O prompt é reconstruído a partir da questão, no mesmo modo de resposta
+    usado na resolução (ver `protocolo_resposta.preparar_prompt`).
+    
+    Args:
+        resultado: Registro do journal
+        questao: `Questao` do resultado
+        formato: "mensagens" (`messages`) ou "prompt_completion"
+            (`prompt`/`completion` conversacionais)
+        resposta: "modelo" (texto gerado) ou "gabarito" (`RESPOSTA: X`
+            com a letra correta)
+    
+    Returns:
+        Exemplo, ou None se não houver resposta a usar
+    """
+    if resposta == "gabarito":
+        texto = f"RESPOSTA: {questao.gabarito}" if questao.gabarito else None
+    else:
+        texto = (resultado.get('resposta_modelo') or '').strip() or None
+    if texto is None:
+        return None
+    
+    prompt, _, area = formatar_questao_para_prompt(questao)
+    modo = resultado.get('modo') if resultado.get('modo') in ("raciocinio", "letra") else "raciocinio"
+    
+    entrada = [
+        {"role": "system", "content": ENEM_SYSTEM_PROMPT},
+        {"role": "user", "content": preparar_prompt(prompt, modo)}
+    ]
+    saida = [{"role": "assistant", "content": texto}]
+    
+    if formato == "prompt_completion":
+        exemplo = {"prompt": entrada, "completion": saida}
+    else:
+        exemplo = {"messages": entrada + saida}
+    exemplo.update({"chave": questao.chave, "area": area})
+    return exemplo
+
+
+def selecionar_exemplos(
+    journals: Iterable[str],
+    questoes: List,
+    areas: Optional[List[str]] = None,
+    correcao: str = "acertos",
+    por_questao: int = 1,
+    formato: str = "mensagens",
+    resposta: str = "modelo",
+    estatisticas: Optional[Dict] = None
+) -> Iterator[Dict]:
+    """
+    Percorre os journals e gera os exemplos que passam nos filtros.
+    
+    A deduplicação usa o hash do conteúdo da questão: a mesma questão em
+    outro arquivo, em outro journal ou repetida no mesmo journal conta para
+    o mesmo limite `por_questao`. Só a contagem por questão fica em memória.
+    Registros anteriores à chave canônica são associados pelo arquivo e id
+    (ver `journal_resultados.indice_chaves_legadas`).
+    
+    Args:
+        journals: Journals JSONL de resultados
+        questoes: Questões carregadas (`Questao`)
+        areas: Áreas incluídas (padrão: todas)
+        correcao: "acertos", "erros" ou "todos"
+        por_questao: Máximo de exemplos por questão
+        formato: Ver `montar_exemplo`
+        resposta: Ver `montar_exemplo`
+        estatisticas: Dicionário atualizado com as contagens de descarte
+    
+    Yields:
+        Exemplos de treinamento
+    """
+    if estatisticas is None:
+        estatisticas = {}
+    for campo in ("lidos", "sem_questao", "filtrados", "duplicados", "sem_resposta", "exportados"):
+        estatisticas.setdefault(campo, 0)
+    
+    questoes_por_chave = {questao.chave: questao for questao in questoes}
+    legado = None
+    
+    areas = {area.upper() for area in areas} if areas else None
+    usados = {}
+    for caminho in journals:
+        for resultado in ler_journal(caminho):
+            estatisticas["lidos"] += 1
+            
+            if resultado.get('chave'):
+                questao = questoes_por_chave.get(chave_resultado(resultado))
+            else:
+                if legado is None:
+                    legado = indice_chaves_legadas(questoes)
+                questao = legado.get((resultado.get('arquivo_origem', ''), str(resultado.get('questao_id', ''))))
+            if questao is None:
+                estatisticas["sem_questao"] += 1
+                continue
+            
+            acertou = resultado.get('acertou')
+            if (areas is not None and resultado.get('area') not in areas) \
+                    or (correcao == "acertos" and acertou is not True) \
+                    or (correcao == "erros" and acertou is not False):
+                estatisticas["filtrados"] += 1
+                continue
+            
+            if usados.get(questao.hash_conteudo, 0) >= por_questao:
+                estatisticas["duplicados"] += 1
+                continue
+            
+            exemplo = montar_exemplo(resultado, questao, formato, resposta)
+            if exemplo is None:
+                estatisticas["sem_resposta"] += 1
+                continue
+            
+            usados[questao.hash_conteudo] = usados.get(questao.hash_conteudo, 0) + 1
+            estatisticas["exportados"] += 1
+            yield exemplo
+
+
+class _ArquivoParquet:
+    """Escreve um shard Parquet em lotes (requer pyarrow, instalado com datasets)."""
+    
+    def __init__(self, caminho: Path):
+        import pyarrow  # noqa: F401
+        
+        self.caminho = caminho
+        self._escritor = None
+        self._linhas = []
+    
+    def escrever(self, exemplo: Dict):
+        self._linhas.append(exemplo)
+        if len(self._linhas) >= LOTE_PARQUET:
+            self._descarregar()
+    
+    def _descarregar(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        if not self._linhas:
+            return
+        tabela = pa.Table.from_pylist(self._linhas)
+        if self._escritor is None:
+            self._escritor = pq.ParquetWriter(str(self.caminho), tabela.schema)
+        self._escritor.write_table(tabela)
+        self._linhas = []
+    
+    def close(self):
+        self._descarregar()
+        if self._escritor is not None:
+            self._escritor.close()
+
+
+def exportar_treinamento(
+    exemplos: Iterable[Dict],
+    pasta_saida: str = "dados_sft",
+    por_arquivo: int = EXEMPLOS_POR_ARQUIVO,
+    parquet: bool = False
+) -> List[str]:
+    """
+    Grava os exemplos em shards de tamanho fixo.
+    
+    Args:
+        exemplos: Exemplos (ver `selecionar_exemplos`), percorridos uma vez
+        pasta_saida: Pasta de saída (shards anteriores são substituídos)
+        por_arquivo: Exemplos por shard
+        parquet: Grava Parquet em vez de JSONL (requer pyarrow)
+    
+    Returns:
+        Nomes dos shards gravados
+    """
+    pasta = Path(pasta_saida)
+    pasta.mkdir(parents=True, exist_ok=True)
+    extensao = "parquet" if parquet else "jsonl"
+    for antigo in pasta.glob(f"treino-*.{extensao}"):
+        antigo.unlink()
+    
+    shards = []
+    arquivo = None
+    no_arquivo = 0
+    try:
+        for exemplo in exemplos:
+            if arquivo is None or no_arquivo >= por_arquivo:
+                if arquivo is not None:
+                    arquivo.close()
+                caminho = pasta / f"treino-{len(shards):05d}.{extensao}"
+                arquivo = _ArquivoParquet(caminho) if parquet else open(caminho, 'w', encoding='utf-8')
+                shards.append(caminho.name)
+                no_arquivo = 0
+            
+            if parquet:
+                arquivo.escrever(exemplo)
+            else:
+                arquivo.write(json.dumps(exemplo, ensure_ascii=False) + '\n')
+            no_arquivo += 1
+    finally:
+        if arquivo is not None:
+            arquivo.close()
+    
+    return shards
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(
+        description='Exporta os resultados dos journals como dados de fine-tuning (JSONL conversacional)'
+    )
+    parser.add_argument(
+        'journals',
+        nargs='*',
+        default=['progresso_resolucao.jsonl'],
+        help='Journals JSONL de resultados (padrão: progresso_resolucao.jsonl)'
+    )
+    parser.add_argument('--provas', default='provas', help='Pasta com os arquivos JSONL das provas (padrão: provas)')
+    parser.add_argument('--saida', default='dados_sft', help='Pasta dos shards (padrão: dados_sft)')
+    parser.add_argument('--areas', nargs='+', default=None, help='Áreas incluídas, ex.: MATEMATICA NATUREZA (padrão: todas)')
+    parser.add_argument('--correcao', choices=FILTROS_CORRECAO, default='acertos',
+                        help='Resultados incluídos pela correção (padrão: acertos)')
+    parser.add_argument('--resposta', choices=RESPOSTAS, default='modelo',
+                        help="Texto do assistente: 'modelo' (resposta gerada) ou 'gabarito' (RESPOSTA: X correta) (padrão: modelo)")
+    parser.add_argument('--formato', choices=FORMATOS, default='mensagens',
+                        help="'mensagens' (messages) ou 'prompt_completion' (padrão: mensagens)")
+    parser.add_argument('--por-questao', type=int, default=1,
+                        help='Máximo de exemplos por questão (mesmo conteúdo), somando todos os journals (padrão: 1)')
+    parser.add_argument('--por-arquivo', type=int, default=EXEMPLOS_POR_ARQUIVO,
+                        help=f'Exemplos por shard (padrão: {EXEMPLOS_POR_ARQUIVO})')
+    parser.add_argument('--parquet', action='store_true', help='Gravar shards Parquet (requer pyarrow) em vez de JSONL')
+    
+    args = parser.parse_args()
+    
+    journals = [journal for journal in args.journals if Path(journal).exists()]
+    if not journals:
+        print(f"❌ Nenhum journal encontrado: {', '.join(args.journals)}")
+        return
+    
+    from questao_enem import normalizar_questoes
+    from corpus_enem import carregar_corpus
+    
+    questoes = normalizar_questoes(carregar_corpus(args.provas))
+    
+    print(f"📤 Exportando {len(journals)} journal(s) para {args.saida}/ ({args.formato}, {args.correcao})...")
+    estatisticas = {}
+    exemplos = selecionar_exemplos(
+        journals,
+        questoes,
+        areas=args.areas,
+        correcao=args.correcao,
+        por_questao=args.por_questao,
+        formato=args.formato,
+        resposta=args.resposta,
+        estatisticas=estatisticas
+    )
+    shards = exportar_treinamento(exemplos, args.saida, args.por_arquivo, parquet=args.parquet)
+    
+    with open(Path(args.saida) / ARQUIVO_MANIFESTO, 'w', encoding='utf-8') as f:
+        json.dump({
+            "journals": journals,
+            "formato": args.formato,
+            "resposta": args.resposta,
+            "correcao": args.correcao,
+            "areas": args.areas,
+            "por_questao": args.por_questao,
+            "shards": shards,
+            "estatisticas": estatisticas
+        }, f, ensure_ascii=False, indent=2)
+    
+    print(f"✅ {estatisticas['exportados']} exemplos em {len(shards)} shard(s)")
+    print(f"   Lidos: {estatisticas['lidos']} | Filtrados: {estatisticas['filtrados']} | "
+          f"Duplicados: {estatisticas['duplicados']} | Sem questão: {estatisticas['sem_questao']} | "
+          f"Sem resposta: {estatisticas['sem_resposta']}")
+    print(f"💾 Manifesto: {Path(args.saida) / ARQUIVO_MANIFESTO}")
+
+
+if __name__ == "__main__":
+    main()
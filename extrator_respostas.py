@@ -0,0 +1,255 @@
+"""
+Extração da alternativa escolhida e correção das respostas do modelo
+
+Antes, uma resposta era considerada correta quando a letra do gabarito
+aparecia em qualquer ponto do texto ("A" aparece em quase toda resposta).
+Aqui uma única expressão regular pré-compilada percorre o texto uma vez e
+reconhece, em ordem de confiança, a linha `RESPOSTA: X`, conclusões como
+"a alternativa correta é X" (também com a letra minúscula, "... é a letra e.")
+e menções como "alternativa X". A letra escolhida vem em maiúscula, com uma
+confiança e a posição no texto.
+
+O mesmo extrator recorrige um journal de resultados já gravado, sem chamar
+a API. O journal é percorrido em streaming, registro a registro; respostas
+idênticas (ex.: vindas do cache) são extraídas uma única vez:
+
+    python extrator_respostas.py progresso_resolucao.jsonl
+"""
+
+import argparse
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from journal_resultados import ler_journal
+
+
+# Início da linha sentinela do protocolo de resposta (`protocolo_resposta.py`)
+SENTINELA = r"(?i:RESPOSTA)\s*:\s*\(?\s*"
+
+# Letra seguida de palavra minúscula é artigo ("A alternativa..."), não resposta
+_FIM_LETRA = r"\)?(?!\w)(?![ \t]+[a-zà-ú])"
+
+# Letra minúscula só conta quando fecha a frase ("... é a letra e."), já que
+# "a" e "e" também são artigo e conjunção
+_LETRA = r"[A-E]|[a-e](?=\)?[ \t]*(?:[.,;:!?\n]|$))"
+
+_PREFIXO_CONCLUSAO = (
+    r"(?i:(?:alternativa|op[cç][aã]o|letra)\s+(?:correta|certa)"
+    r"|resposta(?:\s+(?:correta|certa|final))?|gabarito)"
+    r"\s*(?:(?i:[ée]|seria)\s*|:\s*)?"
+    r"(?:(?i:a|à|letra|alternativa|op[cç][aã]o)\s+){0,2}\(?"
+)
+
+PADRAO_RESPOSTA = re.compile(
+    "|".join((
+        SENTINELA + r"(?P<sentinela>[A-E])" + _FIM_LETRA,
+        _PREFIXO_CONCLUSAO + r"(?P<conclusao>" + _LETRA + ")" + _FIM_LETRA,
+        r"(?i:alternativa|letra|op[cç][aã]o)\s+\(?(?P<afirmacao>[A-Ea-e])\)?\s+"
+        r"(?i:é\s+a\s+(?:correta|certa|resposta)|está\s+correta)",
+        r"(?i:alternativa|letra|op[cç][aã]o)\s+\(?(?P<mencao>[A-E])\)?(?!\w)",
+    ))
+)
+
+# Resposta composta só da letra (modo "letra" do protocolo)
+PADRAO_RESPOSTA_CURTA = re.compile(r"\s*\(?([A-E])(?:[).:]|\s*$)")
+TAMANHO_RESPOSTA_CURTA = 20
+
+# Confiança de cada forma de indicar a alternativa
+CONFIANCA = {
+    "sentinela": 1.0,
+    "curta": 0.95,
+    "conclusao": 0.9,
+    "afirmacao": 0.85,
+    "mencao": 0.5,
+}
+
+# Fator aplicado quando o texto aponta letras diferentes com a mesma confiança
+FATOR_CONFLITO = 0.5
+
+
+def extrair_letra(resposta: Optional[str]) -> Tuple[Optional[str], float, Optional[Tuple[int, int]]]:
+    """
+    Identifica a alternativa escolhida em uma resposta do modelo.
+    
+    Entre as indicações encontradas vale a de maior confiança; em caso de
+    empate, a última (a conclusão costuma vir no final). Se houver letras
+    diferentes no mesmo nível, a confiança é reduzida por FATOR_CONFLITO.
+    
+    Args:
+        resposta: Texto gerado pelo modelo
+    
+    Returns:
+        (letra, confiança entre 0 e 1, (início, fim) da letra no texto), ou
+        (None, 0.0, None) se nenhuma alternativa for identificada
+    """
+    if not resposta:
+        return None, 0.0, None
+    
+    if len(resposta) <= TAMANHO_RESPOSTA_CURTA:
+        curta = PADRAO_RESPOSTA_CURTA.match(resposta)
+        if curta:
+            return curta.group(1), CONFIANCA["curta"], curta.span(1)
+    
+    melhor = None
+    melhor_confianca = 0.0
+    letras = set()
+    for encontrado in PADRAO_RESPOSTA.finditer(resposta):
+        tipo = encontrado.lastgroup
+        confianca = CONFIANCA[tipo]
+        if confianca > melhor_confianca:
+            letras = set()
+            melhor_confianca = confianca
+        if confianca == melhor_confianca:
+            melhor = encontrado
+            letras.add(encontrado.group(tipo).upper())
+    
+    if melhor is None:
+        return None, 0.0, None
+    
+    if len(letras) > 1:
+        melhor_confianca *= FATOR_CONFLITO
+    return melhor.group(melhor.lastgroup).upper(), melhor_confianca, melhor.span(melhor.lastgroup)
+
+
+def corrigir(resposta: Optional[str], gabarito: Optional[str]) -> Tuple[Optional[bool], Optional[str], float]:
+    """
+    Corrige uma resposta comparando a letra extraída com o gabarito.
+    
+    Args:
+        resposta: Texto gerado pelo modelo
+        gabarito: Letra correta (None ou vazio se desconhecida)
+    
+    Returns:
+        (acertou, letra extraída, confiança). `acertou` é None sem gabarito e
+        False quando nenhuma alternativa é identificada
+    """
+    letra, confianca, _ = extrair_letra(resposta)
+    if not gabarito:
+        return None, letra, confianca
+    return letra == str(gabarito).upper().strip(), letra, confianca
+
+
+# Respostas idênticas (ex.: vindas do cache) são extraídas uma única vez
+_extrair_letra_cache = lru_cache(maxsize=4096)(extrair_letra)
+
+
+def _atualizar_registro(registro: Dict) -> Dict:
+    """Recorrige um registro no lugar."""
+    resposta = registro.get('resposta_modelo')
+    if resposta is None:
+        return registro
+    
+    letra, confianca, _ = _extrair_letra_cache(resposta)
+    
+    gabarito = registro.get('gabarito')
+    registro['letra_resposta'] = letra
+    registro['confianca_extracao'] = confianca
+    registro['acertou'] = (letra == str(gabarito).upper().strip()) if gabarito else None
+    return registro
+
+
+def recorrigir_registros(registros: Iterable[Dict]) -> Iterator[Dict]:
+    """
+    Recalcula `letra_resposta`, `confianca_extracao` e `acertou` de resultados já gravados.
+    
+    Registros com erro (sem `resposta_modelo`) são repassados sem alteração.
+    Respostas repetidas (ex.: vindas do cache) são extraídas uma única vez.
+    
+    Args:
+        registros: Resultados no formato de `resolver_questao`
+    
+    Yields:
+        Os mesmos registros, atualizados
+    """
+    for registro in registros:
+        yield _atualizar_registro(registro)
+
+
+def recorrigir_journal(caminho: str, destino: Optional[str] = None) -> Dict[str, int]:
+    """
+    Recorrige todas as respostas de um journal de resultados, sem chamar a API.
+    
+    O arquivo é lido e reescrito em streaming; a saída é gravada em um
+    arquivo temporário que substitui o destino de forma atômica.
+    
+    Args:
+        caminho: Journal JSONL (ver `journal_resultados.py`)
+        destino: Arquivo de saída (padrão: o próprio journal)
+    
+    Returns:
+        Contagens: registros, respostas, sem_letra, acertos_antes,
+        acertos_depois e alterados (registros cujo `acertou` mudou)
+    """
+    caminho = Path(caminho)
+    destino = Path(destino) if destino else caminho
+    temporario = destino.with_name(destino.name + '.tmp')
+    
+    estatisticas = {
+        "registros": 0,
+        "respostas": 0,
+        "sem_letra": 0,
+        "acertos_antes": 0,
+        "acertos_depois": 0,
+        "alterados": 0,
+    }
+    
+    with open(temporario, 'w', encoding='utf-8') as f:
+        for registro in ler_journal(caminho):
+            antes = registro.get('acertou')
+            _atualizar_registro(registro)
+            estatisticas["registros"] += 1
+            if 'resposta_modelo' in registro:
+                estatisticas["respostas"] += 1
+                estatisticas["sem_letra"] += registro['letra_resposta'] is None
+            estatisticas["acertos_antes"] += antes is True
+            estatisticas["acertos_depois"] += registro.get('acertou') is True
+            estatisticas["alterados"] += antes != registro.get('acertou')
+            f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    
+    os.replace(temporario, destino)
+    return estatisticas
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(
+        description='Recorrige as respostas gravadas em um journal de resultados'
+    )
+    parser.add_argument(
+        'journal',
+        nargs='?',
+        default='progresso_resolucao.jsonl',
+        help='Journal JSONL com os resultados (padrão: progresso_resolucao.jsonl)'
+    )
+    parser.add_argument(
+        '--saida',
+        default=None,
+        help='Arquivo de saída (padrão: reescreve o próprio journal)'
+    )
+    
+    args = parser.parse_args()
+    
+    if not Path(args.journal).exists():
+        print(f"❌ Journal não encontrado: {args.journal}")
+        return
+    
+    print(f"🔎 Recorrigindo {args.journal}...")
+    estatisticas = recorrigir_journal(args.journal, args.saida)
+    
+    respostas = estatisticas["respostas"] or 1
+    print(f"✅ {estatisticas['registros']} registros ({estatisticas['respostas']} com resposta)")
+    print(f"   Acertos antes: {estatisticas['acertos_antes']} ({estatisticas['acertos_antes'] / respostas * 100:.1f}%)")
+    print(f"   Acertos agora: {estatisticas['acertos_depois']} ({estatisticas['acertos_depois'] / respostas * 100:.1f}%)")
+    print(f"   Correções alteradas: {estatisticas['alterados']}")
+    print(f"   Sem alternativa identificada: {estatisticas['sem_letra']}")
+    print(f"💾 Salvo em: {args.saida or args.journal}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Journal append-only dos resultados da resolução de questões
+
+Cada questão resolvida vira uma linha JSON acrescentada ao final do arquivo,
+então salvar o progresso custa O(1) por questão. As escritas são
+sincronizadas com o disco (fsync) em lotes, e uma linha incompleta deixada
+por uma interrupção é descartada ao reabrir o journal.
+"""
+
+import json
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+
+# Campos volumosos que não são gravados no journal (podem ser reconstruídos
+# a partir das provas)
+CAMPOS_NAO_PERSISTIDOS = ("prompt_usado", "questao_original")
+
+
+def chave_resultado(resultado: Dict) -> str:
+    """
+    Identifica a questão de um resultado para retomada e deduplicação.
+    
+    É a chave canônica da questão (`Questao.chave`). Registros gravados
+    antes dela recebem "arquivo:id", que não coincide com nenhuma chave
+    canônica (ver `resolver_todas_questoes.carregar_resultados_journal`).
+    """
+    chave = resultado.get('chave')
+    if chave:
+        return chave
+    return f"{resultado.get('arquivo_origem', '')}:{resultado.get('questao_id', '')}"
+
+
+def gravar_journal(caminho: str, registros: Iterable[Dict]) -> int:
+    """
+    Grava um journal completo de forma atômica.
+    
+    Os registros são escritos em um arquivo temporário que substitui
+    `caminho` só depois de sincronizado com o disco.
+    
+    Args:
+        caminho: Arquivo JSONL de destino
+        registros: Registros a gravar (campos não persistidos são omitidos)
+    
+    Returns:
+        Número de registros gravados
+    """
+    caminho = Path(caminho)
+    temporario = caminho.with_name(caminho.name + '.tmp')
+    total = 0
+    with open(temporario, 'w', encoding='utf-8') as f:
+        for registro in registros:
+            registro = {k: v for k, v in registro.items() if k not in CAMPOS_NAO_PERSISTIDOS}
+            f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+            total += 1
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporario, caminho)
+    return total
+
+
+def indice_chaves_legadas(questoes: Iterable) -> Dict[tuple, object]:
+    """
+    Questões (`Questao`) por (arquivo, id), para registros gravados antes
+    da chave canônica.
+    
+    Só entram os pares que identificam uma única questão.
+    """
+    questoes = list(questoes)
+    contagem = Counter((questao.arquivo_origem, str(questao.id)) for questao in questoes)
+    return {
+        (questao.arquivo_origem, str(questao.id)): questao for questao in questoes
+        if contagem[(questao.arquivo_origem, str(questao.id))] == 1
+    }
+
+
+def ler_journal(caminho: str) -> Iterator[Dict]:
+    """
+    Lê os registros de um journal, um por vez.
+    
+    Linhas corrompidas (por exemplo, a última linha de uma execução
+    interrompida no meio da escrita) são ignoradas.
+    
+    Args:
+        caminho: Arquivo JSONL do journal
+    
+    Yields:
+        Registros na ordem em que foram gravados
+    """
+    caminho = Path(caminho)
+    if not caminho.exists():
+        return
+    
+    with open(caminho, 'r', encoding='utf-8') as f:
+        for linha in f:
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                yield json.loads(linha)
+            except json.JSONDecodeError:
+                continue
+
+
+class JournalResultados:
+    """Journal JSONL append-only com fsync em lotes."""
+    
+    def __init__(self, caminho: str = "progresso_resolucao.jsonl", fsync_a_cada: int = 10):
+        """
+        Abre o journal para acrescentar registros.
+        
+        Args:
+            caminho: Arquivo JSONL do journal
+            fsync_a_cada: Número de registros entre sincronizações com o disco
+        """
+        self.caminho = Path(caminho)
+        self.fsync_a_cada = max(1, fsync_a_cada)
+        self._pendentes = 0
+        
+        self._descartar_linha_incompleta()
+        self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+    
+    def _descartar_linha_incompleta(self):
+        """Remove uma última linha sem '\\n' deixada por uma escrita interrompida."""
+        if not self.caminho.exists() or self.caminho.stat().st_size == 0:
+            return
+        
+        with open(self.caminho, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b'\n':
+                return
+            
+            # Procurar o último '\n' a partir do fim
+            posicao = f.seek(0, os.SEEK_END)
+            bloco = 4096
+            while posicao > 0:
+                inicio = max(0, posicao - bloco)
+                f.seek(inicio)
+                dados = f.read(posicao - inicio)
+                indice = dados.rfind(b'\n')
+                if indice != -1:
+                    f.truncate(inicio + indice + 1)
+                    return
+                posicao = inicio
+            f.truncate(0)
+    
+    def registrar(self, resultado: Dict):
+        """
+        Acrescenta o resultado de uma questão ao journal.
+        
+        Args:
+            resultado: Resultado retornado por `resolver_questao`
+        """
+        registro = {k: v for k, v in resultado.items() if k not in CAMPOS_NAO_PERSISTIDOS}
+        self._arquivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+        self._pendentes += 1
+        
+        if self._pendentes >= self.fsync_a_cada:
+            self.sincronizar()
+    
+    def sincronizar(self):
+        """Garante que os registros já escritos estão no disco."""
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+        self._pendentes = 0
+    
+    def ler(self) -> Iterator[Dict]:
+        """Lê os registros gravados até agora (veja `ler_journal`)."""
+        self._arquivo.flush()
+        return ler_journal(self.caminho)
+    
+    def compactar(self, destino: Optional[str] = None) -> int:
+        """
+        Reescreve o journal mantendo apenas o último registro de cada questão.
+        
+        A reescrita é feita em um arquivo temporário que substitui o original
+        de forma atômica.
+        
+        Args:
+            destino: Arquivo de saída (padrão: o próprio journal)
+        
+        Returns:
+            Número de registros após a compactação
+        """
+        self.sincronizar()
+        
+        registros = {}
+        for registro in ler_journal(self.caminho):
+            registros[chave_resultado(registro)] = registro
+        
+        destino = Path(destino) if destino else self.caminho
+        if destino == self.caminho:
+            self._arquivo.close()
+            gravar_journal(destino, registros.values())
+            self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+        else:
+            gravar_journal(destino, registros.values())
+        
+        return len(registros)
+    
+    def close(self):
+        """Sincroniza e fecha o journal."""
+        if not self._arquivo.closed:
+            self.sincronizar()
+            self._arquivo.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -5,10 +5,18 @@ Substitui o uso do modelo base SABIA-7B local pela API.
 """
 
 import os
+import asyncio
+import random
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 import json
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
+
+from cache_respostas import CacheRespostas
 
 # Função para carregar .env
 def _load_env_file():
@@ -31,66 +39,641 @@ def _load_env_file():
 _load_env_file()
 
 
+class MaritacaAPIError(Exception):
+    """
+    Erro em uma requisição à API.
+    
+    Attributes:
+        status_code: Status HTTP da resposta (None para erros de conexão)
+        retry_after: Segundos indicados pelo cabeçalho Retry-After, se houver
+    """
+    
+    def __init__(self, mensagem: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(mensagem)
+        self.status_code = status_code
+        self.retry_after = retry_after
+    
+    @property
+    def recuperavel(self) -> bool:
+        """Se vale a pena repetir a requisição (429, 5xx ou falha de conexão)."""
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+# Teto da taxa, em múltiplos da taxa inicial, quando `taxa_maxima` não é informada
+TETO_RELATIVO_PADRAO = 4.0
+
+
+class TokenBucket:
+    """
+    Limitador de taxa token-bucket com ajuste AIMD, seguro entre threads.
+    
+    A taxa cresce de forma aditiva a cada sucesso (até `taxa_maxima`) e é
+    reduzida de forma multiplicativa a cada 429 recebido, de modo que se
+    estabiliza logo abaixo do limite real do provedor. Um Retry-After
+    bloqueia novas requisições até o horário indicado.
+    
+    Sem `taxa` (padrão) não há limite de requisições/s: apenas o Retry-After
+    das respostas 429 é respeitado.
+    
+    `reservar()` consome um token e devolve quantos segundos o chamador deve
+    esperar antes de enviar a requisição, o que permite usar o mesmo limitador
+    com `time.sleep` ou `asyncio.sleep`.
+    """
+    
+    def __init__(
+        self,
+        taxa: Optional[float] = None,
+        taxa_maxima: Optional[float] = None,
+        taxa_minima: float = 0.1,
+        incremento: float = 1.0,
+        fator_reducao: float = 0.7,
+        capacidade: Optional[float] = None
+    ):
+        """
+        Args:
+            taxa: Requisições por segundo iniciais (None = sem limite, apenas Retry-After)
+            taxa_maxima: Teto da taxa no crescimento aditivo (padrão:
+                `TETO_RELATIVO_PADRAO` vezes a taxa inicial)
+            taxa_minima: Piso da taxa na redução multiplicativa
+            incremento: Requisições/s acrescentadas por segundo de sucessos
+            fator_reducao: Fator aplicado à taxa a cada 429
+            capacidade: Rajada máxima de requisições (padrão: max(1, taxa))
+        """
+        self.taxa = taxa
+        if taxa_maxima is None and taxa:
+            taxa_maxima = taxa * TETO_RELATIVO_PADRAO
+        self.taxa_maxima = max(taxa_maxima, taxa) if taxa else taxa_maxima
+        self.taxa_minima = taxa_minima
+        self.incremento = incremento
+        self.fator_reducao = fator_reducao
+        self.capacidade = capacidade if capacidade is not None else max(1.0, taxa or 1.0)
+        self.total_limitadas = 0
+        self._tokens = self.capacidade
+        self._atualizado = time.monotonic()
+        self._bloqueado_ate = 0.0
+        self._ultima_reducao = 0.0
+        self._lock = threading.Lock()
+    
+    def reservar(self) -> float:
+        """Consome um token e retorna o tempo de espera em segundos."""
+        with self._lock:
+            agora = time.monotonic()
+            espera = max(0.0, self._bloqueado_ate - agora)
+            if self.taxa:
+                self._tokens = min(self.capacidade, self._tokens + (agora - self._atualizado) * self.taxa)
+                self._atualizado = agora
+                self._tokens -= 1
+                if self._tokens < 0:
+                    espera = max(espera, -self._tokens / self.taxa)
+            return espera
+    
+    def registrar_sucesso(self):
+        """Aumento aditivo: +`incremento` req/s a cada segundo de sucessos."""
+        with self._lock:
+            if self.taxa and self.taxa < self.taxa_maxima:
+                self.taxa = min(self.taxa_maxima, self.taxa + self.incremento / self.taxa)
+    
+    def registrar_limite(self, retry_after: Optional[float] = None):
+        """Redução multiplicativa após um 429, respeitando Retry-After."""
+        with self._lock:
+            agora = time.monotonic()
+            self.total_limitadas += 1
+            if retry_after:
+                self._bloqueado_ate = max(self._bloqueado_ate, agora + retry_after)
+            # Vários 429 simultâneos contam como um único sinal de congestionamento
+            if self.taxa and agora - self._ultima_reducao >= 1.0 / self.taxa:
+                self.taxa = max(self.taxa_minima, self.taxa * self.fator_reducao)
+                self._ultima_reducao = agora
+
+
+# Limitador compartilhado pelos clientes criados sem `limitador`: sem limite
+# de requisições/s, apenas o Retry-After das respostas 429
+_limitador_padrao = TokenBucket()
+
+
+def configurar_limitador(**kwargs) -> TokenBucket:
+    """
+    Substitui o limitador compartilhado pelos clientes criados sem `limitador`.
+    
+    Afeta todos esses clientes do processo; para limitar apenas um cliente,
+    passe `MaritacaAPI(limitador=TokenBucket(...))`.
+    
+    Args:
+        **kwargs: Argumentos de `TokenBucket` (taxa, taxa_maxima, ...)
+    
+    Returns:
+        O novo limitador
+    """
+    global _limitador_padrao
+    _limitador_padrao = TokenBucket(**kwargs)
+    return _limitador_padrao
+
+
+def obter_limitador() -> TokenBucket:
+    """Retorna o limitador compartilhado atual."""
+    return _limitador_padrao
+
+
+def _consultar_cache(cache: Optional[CacheRespostas], payload: Dict, amostra: int = 0) -> tuple:
+    """
+    Consulta o cache de respostas para um payload.
+    
+    A amostra 0 usa a mesma chave de uma requisição comum; as demais
+    recebem chaves próprias.
+    
+    Returns:
+        (chave, resposta): `resposta` é a entrada armazenada ou None; `chave`
+        é usada para gravar a nova resposta (None se o cache não se aplica)
+    """
+    if cache is None:
+        return None, None
+    
+    chave = cache.calcular_chave({**payload, "amostra": amostra} if amostra else payload)
+    resposta = cache.obter(chave)
+    if resposta is None and cache.replay:
+        raise MaritacaAPIError("Resposta não encontrada no cache (modo replay)")
+    return chave, resposta
+
+
+def _ler_retry_after(valor: Optional[str]) -> Optional[float]:
+    """Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos."""
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _tempo_backoff(tentativa: int, retry_after: Optional[float], base: float, maximo: float) -> float:
+    """Backoff exponencial com jitter completo, nunca menor que o Retry-After."""
+    espera = random.uniform(0, min(maximo, base * (2 ** tentativa)))
+    if retry_after is not None:
+        espera = max(espera, retry_after)
+    return espera
+
+
+ENEM_SYSTEM_PROMPT = (
+    "Você é um assistente especializado em questões do ENEM (Exame Nacional do Ensino Médio) "
+    "e Teoria da Resposta ao Item (TRI). Forneça respostas precisas, didáticas e baseadas "
+    "em conhecimento educacional brasileiro."
+)
+
+CAMINHO_CHAT_COMPLETIONS = "/api/chat/completions"
+
+
+def _resolver_url(base_url: Optional[str], padrao: str) -> str:
+    """
+    Resolve o endpoint de chat completion.
+    
+    Args:
+        base_url: Endereço do servidor (ex.: http://127.0.0.1:8765). Se None,
+            usa a variável de ambiente MARITACA_BASE_URL
+        padrao: Endpoint usado quando nenhum endereço é informado
+    
+    Returns:
+        URL completa do endpoint /api/chat/completions
+    """
+    base_url = base_url or os.getenv("MARITACA_BASE_URL")
+    if not base_url:
+        return padrao
+    return base_url.rstrip("/") + CAMINHO_CHAT_COMPLETIONS
+
+
+def _resolver_api_key(api_key: Optional[str] = None, obrigatoria: bool = True) -> str:
+    """
+    Resolve e valida a chave da API.
+    
+    Args:
+        api_key: Chave da API. Se None, tenta ler de MARITACA_API_KEY env var ou .env file.
+        obrigatoria: Se False, retorna string vazia quando nenhuma chave é encontrada
+    
+    Returns:
+        Chave da API validada
+    """
+    # Primeiro tenta usar a chave fornecida
+    if api_key:
+        api_key = str(api_key).strip()
+    else:
+        # Tenta ler da variável de ambiente (já carregada do .env se existir)
+        api_key = os.getenv("MARITACA_API_KEY")
+        if api_key:
+            api_key = str(api_key).strip()
+        
+        # Se ainda não encontrou, tenta carregar .env manualmente
+        if not api_key:
+            env_path = Path(__file__).parent / '.env'
+            if env_path.exists():
+                with open(env_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if line and not line.startswith('#') and '=' in line:
+                            key, value = line.split('=', 1)
+                            if key.strip() == 'MARITACA_API_KEY':
+                                api_key = value.strip()
+                                # Remover aspas se houver
+                                if api_key.startswith('"') and api_key.endswith('"'):
+                                    api_key = api_key[1:-1]
+                                if api_key.startswith("'") and api_key.endswith("'"):
+                                    api_key = api_key[1:-1]
+                                api_key = api_key.strip()
+                                os.environ['MARITACA_API_KEY'] = api_key
+                                break
+    
+    # Validação final
+    if not api_key and not obrigatoria:
+        return ""
+    if not api_key:
+        raise ValueError(
+            "API key não fornecida. "
+            "Defina MARITACA_API_KEY no arquivo .env, como variável de ambiente ou passe como argumento."
+        )
+    
+    # Limpar espaços e caracteres invisíveis
+    api_key = api_key.strip()
+    
+    # Validar formato básico
+    if len(api_key) < 10:
+        raise ValueError(f"API key parece inválida (muito curta: {len(api_key)} caracteres)")
+    
+    return api_key
+
+
+def _montar_mensagens(prompt: str, system_prompt: Optional[str] = None) -> List[Dict[str, str]]:
+    """Monta a lista de mensagens no formato da API de chat."""
+    messages = []
+    
+    if system_prompt:
+        messages.append({
+            "role": "system",
+            "content": system_prompt
+        })
+    
+    messages.append({
+        "role": "user",
+        "content": prompt
+    })
+    
+    return messages
+
+
+def _montar_payload(
+    model: str,
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+    top_p: float,
+    stream: bool,
+    stop: Optional[List[str]] = None
+) -> Dict:
+    """Monta o corpo da requisição de chat completion."""
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "top_p": top_p,
+        "stream": stream
+    }
+    if stop:
+        payload["stop"] = stop
+    return payload
+
+
+def _extrair_conteudo(response: Dict) -> str:
+    """Extrai o texto gerado de uma resposta de chat completion."""
+    if "choices" in response and len(response["choices"]) > 0:
+        return response["choices"][0]["message"]["content"]
+    else:
+        raise Exception(f"Resposta inesperada da API: {response}")
+
+
+# Marca o evento "data: [DONE]" do streaming
+_FIM_STREAM = object()
+
+
+def _ler_evento_sse(linha: str):
+    """
+    Interpreta uma linha de um corpo Server-Sent Events.
+    
+    Returns:
+        None para linhas sem dados, `_FIM_STREAM` para [DONE] ou a tupla
+        (trecho de texto, finish_reason)
+    """
+    linha = linha.strip()
+    if not linha.startswith("data:"):
+        return None
+    
+    dados = linha[5:].strip()
+    if dados == "[DONE]":
+        return _FIM_STREAM
+    
+    try:
+        evento = json.loads(dados)
+    except json.JSONDecodeError:
+        return None
+    
+    if evento.get("choices"):
+        escolha = evento["choices"][0]
+        delta = escolha.get("delta") or {}
+        return delta.get("content") or "", escolha.get("finish_reason")
+    return evento.get("text") or "", None
+
+
+def _resposta_de_stream(texto: str, finish_reason: Optional[str]) -> Dict:
+    """Monta uma resposta no formato sem streaming (para o cache)."""
+    return {
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": texto},
+            "finish_reason": finish_reason
+        }]
+    }
+
+
+class _StreamBase:
+    """Estado comum das respostas em streaming (síncrona e assíncrona)."""
+    
+    def __init__(self, response=None, inicio: Optional[float] = None, ao_concluir=None, texto: Optional[str] = None):
+        self._response = response
+        self._ao_concluir = ao_concluir
+        # Resposta vinda do cache: entregue como um único trecho
+        self._pendentes = [texto] if texto else []
+        self._encerrado = False
+        
+        self.inicio = inicio if inicio is not None else time.monotonic()
+        self.ttft: Optional[float] = None
+        self.duracao: Optional[float] = None
+        self.finish_reason: Optional[str] = None
+        self.partes: List[str] = []
+        self.concluido = False
+        self.cancelado = False
+    
+    @property
+    def texto(self) -> str:
+        """Texto recebido até agora."""
+        return "".join(self.partes)
+    
+    def truncar(self, tamanho: int):
+        """
+        Mantém apenas os primeiros `tamanho` caracteres do texto recebido.
+        
+        Use antes de `cancelar(salvar=True)` para gravar no cache só a parte
+        da resposta que interessa (o que chegou depois dela é descartado).
+        """
+        texto = self.texto
+        if tamanho < len(texto):
+            self.partes = [texto[:tamanho]]
+    
+    def _registrar_trecho(self, trecho: str) -> str:
+        if self.ttft is None:
+            self.ttft = time.monotonic() - self.inicio
+        self.partes.append(trecho)
+        return trecho
+    
+    def _marcar_fim(self, concluido: bool, salvar: bool = False) -> bool:
+        """Registra o fim do stream; retorna False se ele já havia terminado."""
+        if self._encerrado:
+            return False
+        self._encerrado = True
+        self.concluido = concluido
+        self.duracao = time.monotonic() - self.inicio
+        if (concluido or salvar) and self._ao_concluir is not None:
+            self._ao_concluir(self.texto, self.finish_reason)
+        return True
+
+
+class StreamResposta(_StreamBase):
+    """
+    Resposta de `chat_completion(stream=True)`.
+    
+    Itera sobre os trechos de texto à medida que são gerados. Após o
+    primeiro trecho, `ttft` contém o tempo até o primeiro token (segundos
+    desde o início da chamada). `cancelar()` fecha a conexão e interrompe a
+    geração. Use como context manager para garantir que a conexão é fechada.
+    
+    Exemplo:
+        with client.generate_stream(prompt) as stream:
+            for trecho in stream:
+                print(trecho, end="")
+    """
+    
+    def __init__(self, response=None, inicio: Optional[float] = None, ao_concluir=None, texto: Optional[str] = None):
+        super().__init__(response, inicio, ao_concluir, texto)
+        self._linhas = response.iter_lines(chunk_size=None) if response is not None else iter(())
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self) -> str:
+        if self._pendentes:
+            return self._registrar_trecho(self._pendentes.pop())
+        if self._encerrado:
+            raise StopIteration
+        
+        try:
+            for linha in self._linhas:
+                evento = _ler_evento_sse(linha.decode("utf-8", errors="replace"))
+                if evento is None:
+                    continue
+                if evento is _FIM_STREAM:
+                    break
+                trecho, finish_reason = evento
+                if finish_reason:
+                    self.finish_reason = finish_reason
+                if trecho:
+                    return self._registrar_trecho(trecho)
+        except requests.exceptions.RequestException as e:
+            self._fechar(concluido=False)
+            raise MaritacaAPIError(f"Erro durante o streaming da resposta: {e}")
+        
+        self._fechar(concluido=True)
+        raise StopIteration
+    
+    def ler(self) -> str:
+        """Consome o restante do stream e retorna o texto completo."""
+        for _ in self:
+            pass
+        return self.texto
+    
+    def _fechar(self, concluido: bool, salvar: bool = False):
+        if self._marcar_fim(concluido, salvar) and self._response is not None:
+            self._response.close()
+    
+    def cancelar(self, salvar: bool = False):
+        """
+        Interrompe a geração fechando a conexão (o texto parcial é mantido).
+        
+        Args:
+            salvar: Grava o texto parcial no cache como se fosse a resposta
+                completa (quando ele já contém tudo o que é necessário)
+        """
+        if not self._encerrado:
+            self.cancelado = True
+            self._fechar(concluido=False, salvar=salvar)
+    
+    def close(self):
+        """Fecha o stream; se ainda não terminou, equivale a `cancelar()`."""
+        self.cancelar()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class StreamRespostaAsync(_StreamBase):
+    """
+    Resposta de `AsyncMaritacaAPI.chat_completion(stream=True)`.
+    
+    Equivalente a `StreamResposta`, iterada com `async for` e com
+    `cancelar()`/`aclose()` como corrotinas.
+    """
+    
+    def __init__(self, response=None, inicio: Optional[float] = None, ao_concluir=None, texto: Optional[str] = None):
+        super().__init__(response, inicio, ao_concluir, texto)
+        self._linhas = response.aiter_lines() if response is not None else None
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self) -> str:
+        if self._pendentes:
+            return self._registrar_trecho(self._pendentes.pop())
+        if self._encerrado or self._linhas is None:
+            await self._fechar(concluido=True)
+            raise StopAsyncIteration
+        
+        import httpx
+        try:
+            async for linha in self._linhas:
+                evento = _ler_evento_sse(linha)
+                if evento is None:
+                    continue
+                if evento is _FIM_STREAM:
+                    break
+                trecho, finish_reason = evento
+                if finish_reason:
+                    self.finish_reason = finish_reason
+                if trecho:
+                    return self._registrar_trecho(trecho)
+        except httpx.HTTPError as e:
+            await self._fechar(concluido=False)
+            raise MaritacaAPIError(f"Erro durante o streaming da resposta: {e}")
+        
+        await self._fechar(concluido=True)
+        raise StopAsyncIteration
+    
+    async def ler(self) -> str:
+        """Consome o restante do stream e retorna o texto completo."""
+        async for _ in self:
+            pass
+        return self.texto
+    
+    async def _fechar(self, concluido: bool, salvar: bool = False):
+        if self._marcar_fim(concluido, salvar) and self._response is not None:
+            await self._response.aclose()
+    
+    async def cancelar(self, salvar: bool = False):
+        """Interrompe a geração fechando a conexão (veja `StreamResposta.cancelar`)."""
+        if not self._encerrado:
+            self.cancelado = True
+            await self._fechar(concluido=False, salvar=salvar)
+    
+    async def aclose(self):
+        """Fecha o stream; se ainda não terminou, equivale a `cancelar()`."""
+        await self.cancelar()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+
 class MaritacaAPI:
     """Cliente para API do SABIA-3.1 da Maritaca."""
     
     BASE_URL = "https://chat.maritaca.ai/api/chat/completions"
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        pool_size: int = 10,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 60.0,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        limitador: Optional[TokenBucket] = None,
+        cache: Optional[CacheRespostas] = None,
+        base_url: Optional[str] = None
+    ):
         """
         Inicializa o cliente da API.
         
+        O cliente mantém uma `requests.Session` com conexões keep-alive, de modo
+        que requisições sucessivas reaproveitam a conexão TCP/TLS. Use como
+        context manager (`with MaritacaAPI() as client:`) ou chame `close()`
+        ao final para liberar as conexões.
+        
         Args:
             api_key: Chave da API. Se None, tenta ler de MARITACA_API_KEY env var ou .env file.
+            pool_size: Número máximo de conexões mantidas abertas (use >= número de threads)
+            connect_timeout: Timeout para estabelecer a conexão, em segundos
+            read_timeout: Timeout para receber a resposta, em segundos
+            max_retries: Tentativas extras em caso de 429, 5xx ou falha de conexão
+            backoff_base: Espera base do backoff exponencial, em segundos
+            backoff_max: Espera máxima entre tentativas, em segundos
+            limitador: Limitador de taxa (padrão: o limitador compartilhado do
+                módulo, que só respeita o Retry-After)
+            cache: Cache em disco das respostas (opcional). Em modo replay a
+                chave da API não é obrigatória
+            base_url: Endereço de um servidor compatível (ex.: o servidor
+                local de `servidor_mock_maritaca.py`). Padrão: variável de
+                ambiente MARITACA_BASE_URL ou a API da Maritaca
         """
-        # Primeiro tenta usar a chave fornecida
-        if api_key:
-            self.api_key = str(api_key).strip()
-        else:
-            # Tenta ler da variável de ambiente (já carregada do .env se existir)
-            self.api_key = os.getenv("MARITACA_API_KEY")
-            if self.api_key:
-                self.api_key = str(self.api_key).strip()
-            
-            # Se ainda não encontrou, tenta carregar .env manualmente
-            if not self.api_key:
-                env_path = Path(__file__).parent / '.env'
-                if env_path.exists():
-                    with open(env_path, 'r', encoding='utf-8') as f:
-                        for line in f:
-                            line = line.strip()
-                            if line and not line.startswith('#') and '=' in line:
-                                key, value = line.split('=', 1)
-                                if key.strip() == 'MARITACA_API_KEY':
-                                    self.api_key = value.strip()
-                                    # Remover aspas se houver
-                                    if self.api_key.startswith('"') and self.api_key.endswith('"'):
-                                        self.api_key = self.api_key[1:-1]
-                                    if self.api_key.startswith("'") and self.api_key.endswith("'"):
-                                        self.api_key = self.api_key[1:-1]
-                                    self.api_key = self.api_key.strip()
-                                    os.environ['MARITACA_API_KEY'] = self.api_key
-                                    break
-        
-        # Validação final
-        if not self.api_key:
-            raise ValueError(
-                "API key não fornecida. "
-                "Defina MARITACA_API_KEY no arquivo .env, como variável de ambiente ou passe como argumento."
-            )
-        
-        # Limpar espaços e caracteres invisíveis
-        self.api_key = self.api_key.strip()
-        
-        # Validar formato básico
-        if len(self.api_key) < 10:
-            raise ValueError(f"API key parece inválida (muito curta: {len(self.api_key)} caracteres)")
+        self.cache = cache
+        self.api_key = _resolver_api_key(api_key, obrigatoria=not (cache and cache.replay))
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._limitador = limitador
         
+        self.url = _resolver_url(base_url, self.BASE_URL)
         self.model = "sabia-3.1"
         self.headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}"
         }
+        self.timeout = (connect_timeout, read_timeout)
+        
+        # Sessão com pool de conexões persistentes
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    
+    @property
+    def limitador(self) -> TokenBucket:
+        """Limitador de taxa em uso."""
+        return self._limitador or _limitador_padrao
+    
+    def close(self):
+        """Fecha as conexões abertas da sessão."""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def chat_completion(
         self,
@@ -98,8 +681,10 @@ class MaritacaAPI:
         temperature: float = 0.7,
         max_tokens: int = 512,
         top_p: float = 0.9,
-        stream: bool = False
-    ) -> Dict:
+        stream: bool = False,
+        stop: Optional[List[str]] = None,
+        amostra: int = 0
+    ) -> Union[Dict, StreamResposta]:
         """
         Envia requisição para API de chat completion.
         
@@ -108,31 +693,76 @@ class MaritacaAPI:
             temperature: Temperatura para sampling (0.0-2.0)
             max_tokens: Número máximo de tokens a gerar
             top_p: Nucleus sampling parameter
-            stream: Se True, retorna stream de respostas
+            stream: Se True, retorna uma `StreamResposta` que itera sobre os
+                trechos de texto à medida que são gerados
+            stop: Sequências que encerram a geração (não incluídas no texto)
+            amostra: Índice da amostra, para votação com várias amostras do
+                mesmo prompt. Entra apenas na chave do cache (amostras
+                diferentes não reaproveitam a mesma resposta)
         
         Returns:
-            Resposta da API em formato JSON
-        """
-        payload = {
-            "model": self.model,
-            "messages": messages,
-            "temperature": temperature,
-            "max_tokens": max_tokens,
-            "top_p": top_p,
-            "stream": stream
-        }
+            Resposta da API em formato JSON (ou `StreamResposta` se stream=True)
+        
+        Raises:
+            MaritacaAPIError: Se a requisição falhar após todas as tentativas
+        """
+        inicio = time.monotonic()
+        payload = _montar_payload(self.model, messages, temperature, max_tokens, top_p, stream, stop)
+        
+        chave, resposta = _consultar_cache(self.cache, payload, amostra)
+        if resposta is not None:
+            if stream:
+                return StreamResposta(inicio=inicio, texto=_extrair_conteudo(resposta))
+            return resposta
+        
+        resposta = self._enviar_com_tentativas(payload)
+        if stream:
+            ao_concluir = None
+            if chave:
+                ao_concluir = lambda texto, finish: self.cache.salvar(chave, _resposta_de_stream(texto, finish))
+            return StreamResposta(resposta, inicio=inicio, ao_concluir=ao_concluir)
         
+        if chave:
+            self.cache.salvar(chave, resposta)
+        return resposta
+    
+    def _enviar_com_tentativas(self, payload: Dict) -> Dict:
+        """Envia a requisição respeitando o limitador e repetindo falhas recuperáveis."""
+        for tentativa in range(self.max_retries + 1):
+            espera = self.limitador.reservar()
+            if espera > 0:
+                time.sleep(espera)
+            
+            try:
+                return self._enviar(payload)
+            except MaritacaAPIError as e:
+                if not e.recuperavel or tentativa == self.max_retries:
+                    raise
+                time.sleep(_tempo_backoff(tentativa, e.retry_after, self.backoff_base, self.backoff_max))
+    
+    def _enviar(self, payload: Dict) -> Dict:
+        """Envia uma única requisição e atualiza o limitador com o resultado."""
         try:
-            response = requests.post(
-                self.BASE_URL,
-                headers=self.headers,
+            response = self.session.post(
+                self.url,
                 json=payload,
-                timeout=60
+                timeout=self.timeout,
+                stream=payload["stream"]
             )
             response.raise_for_status()
-            return response.json()
+        except requests.exceptions.HTTPError as e:
+            e.response.close()
+            retry_after = _ler_retry_after(e.response.headers.get("Retry-After"))
+            if e.response.status_code == 429:
+                self.limitador.registrar_limite(retry_after)
+            raise MaritacaAPIError(f"Erro na requisição à API: {e}", e.response.status_code, retry_after)
         except requests.exceptions.RequestException as e:
-            raise Exception(f"Erro na requisição à API: {e}")
+            raise MaritacaAPIError(f"Erro na requisição à API: {e}")
+        
+        self.limitador.registrar_sucesso()
+        if payload["stream"]:
+            return response
+        return response.json()
     
     def generate(
         self,
@@ -140,7 +770,9 @@ class MaritacaAPI:
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 512,
-        top_p: float = 0.9
+        top_p: float = 0.9,
+        stop: Optional[List[str]] = None,
+        amostra: int = 0
     ) -> str:
         """
         Gera resposta para um prompt usando a API.
@@ -151,41 +783,35 @@ class MaritacaAPI:
             temperature: Temperatura para sampling
             max_tokens: Número máximo de tokens
             top_p: Nucleus sampling parameter
+            stop: Sequências que encerram a geração (não incluídas no texto)
+            amostra: Índice da amostra, para votação com várias amostras do
+                mesmo prompt. Entra apenas na chave do cache (amostras
+                diferentes não reaproveitam a mesma resposta)
         
         Returns:
             Texto gerado pela API
         """
-        messages = []
-        
-        if system_prompt:
-            messages.append({
-                "role": "system",
-                "content": system_prompt
-            })
-        
-        messages.append({
-            "role": "user",
-            "content": prompt
-        })
+        messages = _montar_mensagens(prompt, system_prompt)
         
         response = self.chat_completion(
             messages=messages,
             temperature=temperature,
             max_tokens=max_tokens,
-            top_p=top_p
+            top_p=top_p,
+            stop=stop,
+            amostra=amostra
         )
         
         # Extrair texto da resposta
-        if "choices" in response and len(response["choices"]) > 0:
-            return response["choices"][0]["message"]["content"]
-        else:
-            raise Exception(f"Resposta inesperada da API: {response}")
+        return _extrair_conteudo(response)
     
     def generate_enem_response(
         self,
         prompt: str,
         temperature: float = 0.7,
-        max_tokens: int = 512
+        max_tokens: int = 512,
+        stop: Optional[List[str]] = None,
+        amostra: int = 0
     ) -> str:
         """
         Gera resposta especializada para questões ENEM.
@@ -194,21 +820,317 @@ class MaritacaAPI:
             prompt: Questão ou prompt relacionado ao ENEM
             temperature: Temperatura para sampling
             max_tokens: Número máximo de tokens
+            stop: Sequências que encerram a geração (não incluídas no texto)
+            amostra: Índice da amostra, para votação com várias amostras do
+                mesmo prompt. Entra apenas na chave do cache (amostras
+                diferentes não reaproveitam a mesma resposta)
         
         Returns:
             Resposta gerada
         """
-        system_prompt = (
-            "Você é um assistente especializado em questões do ENEM (Exame Nacional do Ensino Médio) "
-            "e Teoria da Resposta ao Item (TRI). Forneça respostas precisas, didáticas e baseadas "
-            "em conhecimento educacional brasileiro."
+        return self.generate(
+            prompt=prompt,
+            system_prompt=ENEM_SYSTEM_PROMPT,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stop=stop,
+            amostra=amostra
+        )
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 512,
+        top_p: float = 0.9,
+        stop: Optional[List[str]] = None,
+        amostra: int = 0
+    ) -> StreamResposta:
+        """
+        Gera resposta para um prompt em streaming.
+        
+        Mesmos argumentos de `generate`.
+        
+        Returns:
+            `StreamResposta` com os trechos de texto, `ttft` e `cancelar()`
+        """
+        return self.chat_completion(
+            messages=_montar_mensagens(prompt, system_prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            top_p=top_p,
+            stream=True,
+            stop=stop,
+            amostra=amostra
         )
+
+
+class AsyncMaritacaAPI:
+    """
+    Cliente assíncrono para API do SABIA-3.1 da Maritaca.
+    
+    Equivalente a `MaritacaAPI`, com `chat_completion`, `generate` e
+    `generate_enem_response` como corrotinas. Todas as requisições compartilham
+    um único `httpx.AsyncClient`, permitindo milhares de prompts concorrentes
+    em um só event loop.
+    
+    Requer httpx (pip install httpx).
+    """
+    
+    BASE_URL = MaritacaAPI.BASE_URL
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        pool_size: int = 100,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 60.0,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        limitador: Optional[TokenBucket] = None,
+        cache: Optional[CacheRespostas] = None,
+        base_url: Optional[str] = None
+    ):
+        """
+        Inicializa o cliente assíncrono da API.
         
-        return self.generate(
+        Args:
+            api_key: Chave da API. Se None, tenta ler de MARITACA_API_KEY env var ou .env file.
+            pool_size: Número máximo de conexões simultâneas abertas
+            connect_timeout: Timeout para estabelecer a conexão, em segundos
+            read_timeout: Timeout para receber a resposta, em segundos
+            max_retries: Tentativas extras em caso de 429, 5xx ou falha de conexão
+            backoff_base: Espera base do backoff exponencial, em segundos
+            backoff_max: Espera máxima entre tentativas, em segundos
+            limitador: Limitador de taxa (padrão: o limitador compartilhado do
+                módulo, que só respeita o Retry-After)
+            cache: Cache em disco das respostas (opcional). Em modo replay a
+                chave da API não é obrigatória
+            base_url: Endereço de um servidor compatível (ex.: o servidor
+                local de `servidor_mock_maritaca.py`). Padrão: variável de
+                ambiente MARITACA_BASE_URL ou a API da Maritaca
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("httpx não encontrado. Instale: pip install httpx")
+        
+        self._httpx = httpx
+        self.cache = cache
+        self.api_key = _resolver_api_key(api_key, obrigatoria=not (cache and cache.replay))
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._limitador = limitador
+        self.url = _resolver_url(base_url, self.BASE_URL)
+        self.model = "sabia-3.1"
+        self.headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+        )
+    
+    @property
+    def limitador(self) -> TokenBucket:
+        """Limitador de taxa em uso."""
+        return self._limitador or _limitador_padrao
+    
+    async def aclose(self):
+        """Fecha as conexões abertas do cliente."""
+        await self.client.aclose()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+    
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 512,
+        top_p: float = 0.9,
+        stream: bool = False,
+        stop: Optional[List[str]] = None,
+        amostra: int = 0
+    ) -> Union[Dict, StreamRespostaAsync]:
+        """
+        Envia requisição para API de chat completion.
+        
+        Mesmos argumentos e retorno de `MaritacaAPI.chat_completion`; com
+        stream=True retorna uma `StreamRespostaAsync`.
+        """
+        inicio = time.monotonic()
+        payload = _montar_payload(self.model, messages, temperature, max_tokens, top_p, stream, stop)
+        
+        chave, resposta = _consultar_cache(self.cache, payload, amostra)
+        if resposta is not None:
+            if stream:
+                return StreamRespostaAsync(inicio=inicio, texto=_extrair_conteudo(resposta))
+            return resposta
+        
+        resposta = await self._enviar_com_tentativas(payload)
+        if stream:
+            ao_concluir = None
+            if chave:
+                ao_concluir = lambda texto, finish: self.cache.salvar(chave, _resposta_de_stream(texto, finish))
+            return StreamRespostaAsync(resposta, inicio=inicio, ao_concluir=ao_concluir)
+        
+        if chave:
+            self.cache.salvar(chave, resposta)
+        return resposta
+    
+    async def _enviar_com_tentativas(self, payload: Dict) -> Dict:
+        """Envia a requisição respeitando o limitador e repetindo falhas recuperáveis."""
+        for tentativa in range(self.max_retries + 1):
+            espera = self.limitador.reservar()
+            if espera > 0:
+                await asyncio.sleep(espera)
+            
+            try:
+                return await self._enviar(payload)
+            except MaritacaAPIError as e:
+                if not e.recuperavel or tentativa == self.max_retries:
+                    raise
+                await asyncio.sleep(_tempo_backoff(tentativa, e.retry_after, self.backoff_base, self.backoff_max))
+    
+    async def _enviar(self, payload: Dict) -> Dict:
+        """Envia uma única requisição e atualiza o limitador com o resultado."""
+        try:
+            request = self.client.build_request("POST", self.url, json=payload)
+            response = await self.client.send(request, stream=payload["stream"])
+            if payload["stream"] and response.is_error:
+                await response.aclose()
+            response.raise_for_status()
+        except self._httpx.HTTPStatusError as e:
+            retry_after = _ler_retry_after(e.response.headers.get("Retry-After"))
+            if e.response.status_code == 429:
+                self.limitador.registrar_limite(retry_after)
+            raise MaritacaAPIError(f"Erro na requisição à API: {e}", e.response.status_code, retry_after)
+        except self._httpx.HTTPError as e:
+            raise MaritacaAPIError(f"Erro na requisição à API: {e}")
+        
+        self.limitador.registrar_sucesso()
+        if payload["stream"]:
+            return response
+        return response.json()
+    
+    async def generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 512,
+        top_p: float = 0.9,
+        stop: Optional[List[str]] = None,
+        amostra: int = 0
+    ) -> str:
+        """
+        Gera resposta para um prompt usando a API.
+        
+        Mesmos argumentos e retorno de `MaritacaAPI.generate`.
+        """
+        messages = _montar_mensagens(prompt, system_prompt)
+        
+        response = await self.chat_completion(
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            top_p=top_p,
+            stop=stop,
+            amostra=amostra
+        )
+        
+        return _extrair_conteudo(response)
+    
+    async def generate_enem_response(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 512,
+        stop: Optional[List[str]] = None,
+        amostra: int = 0
+    ) -> str:
+        """
+        Gera resposta especializada para questões ENEM.
+        
+        Mesmos argumentos e retorno de `MaritacaAPI.generate_enem_response`.
+        """
+        return await self.generate(
             prompt=prompt,
-            system_prompt=system_prompt,
+            system_prompt=ENEM_SYSTEM_PROMPT,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stop=stop,
+            amostra=amostra
+        )
+    
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 512,
+        top_p: float = 0.9,
+        stop: Optional[List[str]] = None,
+        amostra: int = 0
+    ) -> StreamRespostaAsync:
+        """
+        Gera resposta para um prompt em streaming.
+        
+        Mesmos argumentos de `MaritacaAPI.generate_stream`.
+        """
+        return await self.chat_completion(
+            messages=_montar_mensagens(prompt, system_prompt),
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            top_p=top_p,
+            stream=True,
+            stop=stop,
+            amostra=amostra
+        )
+    
+    async def gather_generate(
+        self,
+        prompts: List[str],
+        max_concurrency: int = 32,
+        return_exceptions: bool = False,
+        **kwargs
+    ) -> List:
+        """
+        Gera respostas para vários prompts de forma concorrente.
+        
+        No máximo `max_concurrency` requisições ficam em voo ao mesmo tempo.
+        
+        Args:
+            prompts: Lista de prompts
+            max_concurrency: Número máximo de requisições simultâneas
+            return_exceptions: Se True, exceções são devolvidas na posição do
+                prompt correspondente em vez de interromper o lote
+            **kwargs: Repassados para `generate` (system_prompt, temperature, ...)
+        
+        Returns:
+            Respostas na mesma ordem de `prompts`
+        """
+        semaforo = asyncio.Semaphore(max_concurrency)
+        
+        async def gerar(prompt: str) -> str:
+            async with semaforo:
+                return await self.generate(prompt, **kwargs)
+        
+        return await asyncio.gather(
+            *(gerar(prompt) for prompt in prompts),
+            return_exceptions=return_exceptions
         )
 
 
@@ -223,8 +1145,8 @@ def test_api_connection(api_key: Optional[str] = None) -> bool:
         True se conexão bem-sucedida, False caso contrário
     """
     try:
-        client = MaritacaAPI(api_key=api_key)
-        response = client.generate("Olá, você está funcionando?", max_tokens=50)
+        with MaritacaAPI(api_key=api_key) as client:
+            response = client.generate("Olá, você está funcionando?", max_tokens=50)
         return len(response) > 0
     except Exception as e:
         print(f"Erro ao testar API: {e}")
@@ -236,13 +1158,13 @@ if __name__ == "__main__":
     print("Testando conexão com API Maritaca...")
     
     try:
-        client = MaritacaAPI()
-        print("✅ Cliente inicializado com sucesso!")
-        
-        # Teste simples
-        response = client.generate("Explique o que é o ENEM em uma frase.", max_tokens=100)
-        print(f"\nResposta da API:\n{response}")
-        
+        with MaritacaAPI() as client:
+            print("✅ Cliente inicializado com sucesso!")
+            
+            # Teste simples
+            response = client.generate("Explique o que é o ENEM em uma frase.", max_tokens=100)
+            print(f"\nResposta da API:\n{response}")
+    
     except Exception as e:
         print(f"❌ Erro: {e}")
 
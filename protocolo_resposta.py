@@ -0,0 +1,149 @@
+"""
+Protocolo de resposta estruturada para as questões do ENEM
+
+O modelo é instruído a terminar com a linha `RESPOSTA: X`. Na resolução com
+raciocínio a resposta é recebida em streaming e a geração é interrompida
+assim que essa linha aparece. No modo "letra" o modelo responde apenas com a
+letra, com poucos tokens e parada na primeira quebra de linha, para
+reavaliações em larga escala em que o raciocínio não é necessário.
+"""
+
+import re
+import threading
+from typing import Optional, Tuple
+
+from extrator_respostas import SENTINELA, extrair_letra
+from maritaca_api import ENEM_SYSTEM_PROMPT
+
+
+MODOS_RESPOSTA = ("raciocinio", "letra")
+
+INSTRUCAO_RACIOCINIO = (
+    "\n\nResolva esta questão passo a passo. Ao final, escreva em uma linha "
+    "separada apenas 'RESPOSTA: X', onde X é a letra da alternativa correta."
+)
+
+INSTRUCAO_LETRA = (
+    "\n\nResponda apenas com a letra da alternativa correta (A, B, C, D ou E), "
+    "sem explicação."
+)
+
+# Tokens suficientes para a letra no modo "letra"
+MAX_TOKENS_LETRA = 4
+
+# Linha sentinela. Durante o streaming, a letra só é aceita quando seguida de
+# um caractere que não é letra nem espaço (evita "RESPOSTA: A" + "lternativa"
+# e "RESPOSTA: A" + " alternativa correta é...").
+# Só "RESPOSTA" ignora maiúsculas: em "Resposta: a alternativa" não há letra.
+PADRAO_SENTINELA = re.compile(SENTINELA + r"([A-E])(?=[^\w \t])")
+PADRAO_SENTINELA_FINAL = re.compile(SENTINELA + r"([A-E])(?!\w)(?![ \t]+[a-zà-ú])")
+
+
+def extrair_sentinela(texto: str, final: bool = True) -> Optional[str]:
+    """
+    Procura a linha `RESPOSTA: X` no texto.
+    
+    Args:
+        texto: Texto gerado pelo modelo
+        final: Se False (texto parcial, em streaming), exige um caractere após
+            a letra para confirmar que ela está completa
+    
+    Returns:
+        Letra maiúscula ou None
+    """
+    padrao = PADRAO_SENTINELA_FINAL if final else PADRAO_SENTINELA
+    encontrado = padrao.search(texto)
+    return encontrado.group(1) if encontrado else None
+
+
+def preparar_prompt(prompt: str, modo: str = "raciocinio") -> str:
+    """
+    Acrescenta ao prompt a instrução de formato do modo escolhido.
+    
+    A instrução genérica "Resolva esta questão passo a passo..." do final
+    do prompt é substituída pela do protocolo.
+    """
+    if modo not in MODOS_RESPOSTA:
+        raise ValueError(f"Modo de resposta inválido: {modo} (use um de {MODOS_RESPOSTA})")
+    
+    base = prompt.rsplit("\nResolva esta questão passo a passo", 1)[0].rstrip()
+    return base + (INSTRUCAO_LETRA if modo == "letra" else INSTRUCAO_RACIOCINIO)
+
+
+def gerar_resposta(
+    client,
+    prompt: str,
+    modo: str = "raciocinio",
+    temperature: float = 0.7,
+    max_tokens: int = 500,
+    amostra: int = 0,
+    interromper: Optional[threading.Event] = None
+) -> Tuple[str, Optional[str]]:
+    """
+    Gera a resposta de uma questão seguindo o protocolo estruturado.
+    
+    No modo "raciocinio" a resposta é recebida em streaming e a geração é
+    cancelada assim que a linha `RESPOSTA: X` é emitida. No modo "letra" a
+    requisição usa MAX_TOKENS_LETRA tokens e para na primeira quebra de linha.
+    
+    Args:
+        client: Instância de `MaritacaAPI`
+        prompt: Prompt da questão (ver `formatar_questao_para_prompt`)
+        modo: "raciocinio" ou "letra"
+        temperature: Temperatura para sampling
+        max_tokens: Limite de tokens no modo "raciocinio"
+        amostra: Índice da amostra (votação com várias amostras; ver
+            `MaritacaAPI.chat_completion`)
+        interromper: Evento que, quando sinalizado, cancela o streaming em
+            andamento (a resposta parcial não é gravada no cache)
+    
+    Returns:
+        (texto gerado, letra extraída ou None). Se interrompida, a letra é None
+    """
+    prompt = preparar_prompt(prompt, modo)
+    
+    if modo == "letra":
+        texto = client.generate(
+            prompt=prompt,
+            system_prompt=ENEM_SYSTEM_PROMPT,
+            temperature=temperature,
+            max_tokens=MAX_TOKENS_LETRA,
+            stop=["\n"],
+            amostra=amostra
+        )
+        letra, _, _ = extrair_letra(texto)
+        return texto, letra
+    
+    with client.generate_stream(
+        prompt=prompt,
+        system_prompt=ENEM_SYSTEM_PROMPT,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        amostra=amostra
+    ) as stream:
+        letra = None
+        cauda = ""
+        recebidos = 0
+        for token in stream:
+            if interromper is not None and interromper.is_set():
+                stream.cancelar()
+                return stream.texto, None
+            
+            # A sentinela tem ~12 caracteres; basta olhar o final do texto,
+            # mantido aqui sem remontar `stream.texto` a cada token
+            recebidos += len(token)
+            cauda = (cauda + token)[-64:]
+            encontrado = PADRAO_SENTINELA.search(cauda)
+            if encontrado:
+                letra = encontrado.group(1)
+                # O texto até a letra é a resposta completa do protocolo. O
+                # caractere que a confirmou (e o resto do trecho) fica de fora,
+                # para que o cache guarde o mesmo texto em qualquer execução
+                stream.truncar(recebidos - len(cauda) + encontrado.end(1))
+                stream.cancelar(salvar=True)
+                break
+    
+    texto = stream.texto
+    if letra is None:
+        letra = extrair_sentinela(texto)
+    return texto, letra
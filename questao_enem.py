@@ -0,0 +1,260 @@
+"""
+Registro normalizado de uma questão do ENEM
+
+As provas chegam em formatos variados (campos em inglês ou português,
+alternativas em dicionário ou lista, ~30 chaves por questão). `Questao`
+resolve essas variações uma única vez e guarda só os campos usados pelos
+scripts, em uma classe com __slots__ (sem __dict__ por instância).
+
+Cada questão recebe, na criação, uma chave canônica (arquivo + número +
+hash do conteúdo), única mesmo quando números se repetem entre as provas ou
+o id está ausente. Ela identifica a questão na retomada, no journal e nos
+shards. A chave de deduplicação reconhece a mesma questão em arquivos
+diferentes pelo hash do conteúdo, mas só quando o texto identifica a questão
+por completo (sem imagens e com contexto, enunciado e alternativas).
+"""
+
+import hashlib
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+
+LETRAS = ('A', 'B', 'C', 'D', 'E')
+
+# Nome das áreas nos prompts e relatórios
+MAPEAMENTO_AREAS = {
+    "languages": "LINGUAGENS",
+    "human-sciences": "HUMANAS",
+    "natural-sciences": "NATUREZA",
+    "mathematics": "MATEMATICA",
+    "N/A": "OUTRAS"
+}
+
+# Campos que indicam que a questão depende de imagens
+CAMPOS_IMAGEM = ('has_images', 'has_associated_images', 'figures', 'associated_images', 'context_images')
+
+
+def _primeiro(questao: Dict, *campos):
+    """Retorna o primeiro valor não vazio entre os campos, ou None."""
+    for campo in campos:
+        valor = questao.get(campo)
+        if valor:
+            return valor
+    return None
+
+
+def area_questao(questao: Dict) -> Optional[str]:
+    """Área da questão bruta (`area`, `subject` ou `disciplina`), ou None."""
+    return _primeiro(questao, 'area', 'subject', 'disciplina')
+
+
+def calcular_hash_conteudo(contexto: str, enunciado: str, alternativas: Tuple[Tuple[str, str], ...]) -> str:
+    """
+    Hash do conteúdo da questão (contexto, enunciado e alternativas).
+    
+    Espaços são normalizados antes do hash, então a mesma questão copiada
+    com outra formatação em outro arquivo tem o mesmo hash.
+    """
+    partes = [contexto or '', enunciado or ''] + [f"{letra}) {texto}" for letra, texto in alternativas]
+    normalizado = "\x1f".join(" ".join(parte.split()) for parte in partes)
+    return hashlib.sha1(normalizado.encode('utf-8')).hexdigest()[:16]
+
+
+def conteudo_deduplicavel(contexto: str, enunciado: str, alternativas: Tuple[Tuple[str, str], ...],
+                          tem_imagem: bool) -> bool:
+    """
+    Se o texto basta para reconhecer a questão em outro arquivo.
+    
+    Questões com imagens ou com contexto, enunciado ou alternativas vazios
+    podem ter o mesmo texto e ser questões diferentes.
+    """
+    return not tem_imagem and bool((contexto or '').strip() and (enunciado or '').strip() and alternativas)
+
+
+def chave_questao(arquivo_origem: str, numero, hash_conteudo: str) -> str:
+    """Chave canônica: "arquivo:número:hash" (ex.: "enem_2020.jsonl:45:3f2a...")."""
+    return f"{arquivo_origem}:{'' if numero is None else numero}:{hash_conteudo}"
+
+
+def _normalizar_alternativas(alternativas) -> Tuple[Tuple[str, str], ...]:
+    """Converte alternativas em dicionário ou lista para pares (letra, texto)."""
+    pares = []
+    if isinstance(alternativas, dict):
+        for letra in LETRAS:
+            alt = alternativas.get(letra) or alternativas.get(letra.lower())
+            if alt:
+                pares.append((letra, str(alt)))
+    elif isinstance(alternativas, list):
+        for i, alt in enumerate(alternativas):
+            if isinstance(alt, dict):
+                alt = alt.get('text') or alt.get('texto') or ''
+            if alt:
+                pares.append((chr(65 + i), str(alt)))  # A, B, C, D, E
+    return tuple(pares)
+
+
+class Questao:
+    """Questão do ENEM com os campos já normalizados."""
+    
+    __slots__ = (
+        'id', 'numero', 'exame', 'ano', 'area', 'tema', 'dificuldade',
+        'contexto', 'enunciado', 'alternativas', 'gabarito', 'tem_imagem',
+        'arquivo_origem', 'hash_conteudo', 'chave', 'chave_deduplicacao'
+    )
+    
+    def __init__(
+        self,
+        id='',
+        numero=None,
+        exame: Optional[str] = None,
+        ano=None,
+        area: Optional[str] = None,
+        tema: Optional[str] = None,
+        dificuldade: Optional[str] = None,
+        contexto: str = '',
+        enunciado: str = '',
+        alternativas: Tuple[Tuple[str, str], ...] = (),
+        gabarito: str = '',
+        tem_imagem: bool = False,
+        arquivo_origem: str = ''
+    ):
+        self.id = id
+        self.numero = numero
+        self.exame = exame
+        self.ano = ano
+        self.area = area
+        self.tema = tema
+        self.dificuldade = dificuldade
+        self.contexto = contexto
+        self.enunciado = enunciado
+        self.alternativas = alternativas
+        self.gabarito = gabarito
+        self.tem_imagem = tem_imagem
+        self.arquivo_origem = arquivo_origem
+        
+        # Calculadas uma única vez, na carga
+        self.hash_conteudo = calcular_hash_conteudo(contexto, enunciado, alternativas)
+        self.chave = chave_questao(arquivo_origem, numero if numero is not None else (id or None), self.hash_conteudo)
+        # Questões com a mesma chave de deduplicação são resolvidas uma única vez
+        if conteudo_deduplicavel(contexto, enunciado, alternativas, tem_imagem):
+            self.chave_deduplicacao = self.hash_conteudo
+        else:
+            self.chave_deduplicacao = self.chave
+    
+    @classmethod
+    def de_dict(cls, questao: Dict) -> "Questao":
+        """
+        Normaliza uma questão no formato bruto (JSONL das provas, API ou exemplos).
+        
+        Args:
+            questao: Dicionário com os dados da questão
+        
+        Returns:
+            Questão normalizada
+        """
+        gabarito = _primeiro(questao, 'answer', 'gabarito', 'correct_answer', 'resposta') or ''
+        
+        return cls(
+            id=questao.get('id') or questao.get('number', ''),
+            numero=questao.get('number'),
+            exame=_primeiro(questao, 'exam'),
+            ano=_primeiro(questao, 'ano', 'year', 'edicao'),
+            area=area_questao(questao),
+            tema=_primeiro(questao, 'tema', 'topic', 'assunto'),
+            dificuldade=_primeiro(questao, 'dificuldade', 'difficulty'),
+            contexto=_primeiro(questao, 'context', 'description') or '',
+            enunciado=_primeiro(questao, 'question', 'questao', 'original_question', 'texto') or '',
+            alternativas=_normalizar_alternativas(
+                _primeiro(questao, 'alternatives', 'alternativas', 'options') or {}
+            ),
+            gabarito=str(gabarito).upper().strip(),
+            tem_imagem=any(questao.get(campo) for campo in CAMPOS_IMAGEM),
+            arquivo_origem=questao.get('arquivo_origem', '')
+        )
+    
+    def formatar_alternativas(self) -> str:
+        """Retorna as alternativas no formato 'A) texto', uma por linha."""
+        return ''.join(f"{letra}) {texto}\n" for letra, texto in self.alternativas)
+    
+    def para_dict(self) -> Dict:
+        """Representação JSON da questão normalizada."""
+        return {
+            "id": self.id,
+            "number": self.numero,
+            "exam": self.exame,
+            "ano": self.ano,
+            "area": self.area,
+            "tema": self.tema,
+            "dificuldade": self.dificuldade,
+            "context": self.contexto,
+            "question": self.enunciado,
+            "alternatives": dict(self.alternativas),
+            "answer": self.gabarito,
+            "has_images": self.tem_imagem,
+            "arquivo_origem": self.arquivo_origem,
+            "chave": self.chave
+        }
+    
+    def __repr__(self):
+        return f"Questao(id={self.id!r}, arquivo_origem={self.arquivo_origem!r}, area={self.area!r})"
+
+
+def como_questao(questao: Union[Dict, Questao]) -> Questao:
+    """Retorna a questão normalizada (sem custo se já for uma `Questao`)."""
+    if isinstance(questao, Questao):
+        return questao
+    return Questao.de_dict(questao)
+
+
+def normalizar_questoes(questoes: Iterable[Dict]) -> List[Questao]:
+    """Normaliza uma coleção de questões em uma única passada."""
+    return [como_questao(questao) for questao in questoes]
+
+
+def area_prompt(questao: Questao) -> str:
+    """Nome da área usado nos prompts e relatórios."""
+    area_raw = questao.area or 'N/A'
+    return MAPEAMENTO_AREAS.get(area_raw, area_raw.upper())
+
+
+def formatar_prefixo_prompt(questao: Union[Dict, Questao]) -> str:
+    """
+    Início do prompt de `formatar_questao_para_prompt` (cabeçalho e contexto).
+    
+    É idêntico para questões da mesma área que compartilham o texto-base,
+    o que permite reaproveitar seu processamento na inferência local.
+    """
+    questao = como_questao(questao)
+    prefixo = f"Questão do ENEM - {area_prompt(questao)}\n\n"
+    if questao.contexto:
+        prefixo += f"Contexto: {questao.contexto}\n\n"
+    return prefixo
+
+
+def formatar_questao_para_prompt(questao: Union[Dict, Questao]) -> tuple:
+    """
+    Formata questão para prompt do modelo.
+    
+    Returns:
+        (prompt_formatado, gabarito, area)
+    """
+    questao = como_questao(questao)
+    area = area_prompt(questao)
+    
+    # Montar prompt
+    prompt = formatar_prefixo_prompt(questao)
+    
+    prompt += f"{questao.enunciado}\n\n"
+    
+    # Adicionar alternativas
+    prompt += questao.formatar_alternativas()
+    
+    prompt += "\nResolva esta questão passo a passo e indique a alternativa correta:"
+    
+    return prompt, questao.gabarito, area
+
+
+def serializar_json(obj):
+    """Função `default` para json.dump com resultados que contêm `Questao`."""
+    if isinstance(obj, Questao):
+        return obj.para_dict()
+    raise TypeError(f"Objeto do tipo {type(obj).__name__} não é serializável em JSON")
@@ -0,0 +1,265 @@
+"""
+Relatórios por área da resolução das questões, gerados em streaming
+
+`AgregadorRelatorios` recebe um resultado por vez: atualiza os contadores
+da área e acrescenta o resultado e o registro de treinamento aos arquivos
+JSONL da área. Nada além dos contadores (e das primeiras questões com erro,
+citadas no Markdown) fica em memória, então os relatórios de um journal com
+milhões de resultados são gerados em uma única passada:
+
+    relatorios_treinamento/
+    ├── resultados_{area}.jsonl         # um resultado por linha
+    ├── dados_treinamento_{area}.jsonl  # questão, alternativas, gabarito e resposta
+    ├── relatorio_{area}.json           # estatísticas da área
+    ├── relatorio_geral.json
+    └── RELATORIO_TREINAMENTO.md
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+from journal_resultados import CAMPOS_NAO_PERSISTIDOS, chave_resultado, ler_journal
+
+
+# Questões com erro listadas por área no relatório Markdown
+MAX_ERROS_MARKDOWN = 10
+
+
+class AgregadorRelatorios:
+    """Acumula os relatórios por área à medida que os resultados chegam."""
+    
+    def __init__(self, pasta_saida: str = "relatorios_treinamento"):
+        """
+        Prepara a pasta dos relatórios.
+        
+        Args:
+            pasta_saida: Pasta onde os relatórios são gravados
+        """
+        self.pasta = Path(pasta_saida)
+        self.pasta.mkdir(parents=True, exist_ok=True)
+        
+        self.total = 0
+        self._contagens = {}  # área -> [acertos, erros, sem_resposta]
+        self._erros = {}      # área -> primeiras questões com erro
+        self._arquivos = {}   # área -> (resultados, treinamento)
+    
+    def _arquivos_area(self, area: str):
+        arquivos = self._arquivos.get(area)
+        if arquivos is None:
+            arquivos = (
+                open(self.pasta / f"resultados_{area.lower()}.jsonl", 'w', encoding='utf-8'),
+                open(self.pasta / f"dados_treinamento_{area.lower()}.jsonl", 'w', encoding='utf-8')
+            )
+            self._arquivos[area] = arquivos
+            self._contagens[area] = [0, 0, 0]
+            self._erros[area] = []
+        return arquivos
+    
+    def adicionar(self, resultado: Dict):
+        """
+        Contabiliza um resultado e o acrescenta aos arquivos da sua área.
+        
+        Args:
+            resultado: Resultado no formato de `resolver_questao` (com ou sem
+                `questao_original`)
+        """
+        area = resultado.get('area', 'OUTRAS')
+        arquivo_resultados, arquivo_treinamento = self._arquivos_area(area)
+        
+        acertou = resultado.get('acertou')
+        contagem = self._contagens[area]
+        if acertou is True:
+            contagem[0] += 1
+        elif acertou is False:
+            contagem[1] += 1
+            if len(self._erros[area]) < MAX_ERROS_MARKDOWN:
+                self._erros[area].append({
+                    "questao_id": resultado.get('questao_id', 'N/A'),
+                    "gabarito": resultado.get('gabarito', 'N/A'),
+                    "resposta_modelo": (resultado.get('resposta_modelo') or '')[:100]
+                })
+        else:
+            contagem[2] += 1
+        self.total += 1
+        
+        registro = {k: v for k, v in resultado.items() if k not in CAMPOS_NAO_PERSISTIDOS}
+        arquivo_resultados.write(json.dumps(registro, ensure_ascii=False) + '\n')
+        
+        questao_original = resultado.get('questao_original')
+        arquivo_treinamento.write(json.dumps({
+            "chave": resultado.get('chave'),
+            "questao": questao_original.enunciado if questao_original else '',
+            "alternativas": dict(questao_original.alternativas) if questao_original else {},
+            "gabarito": resultado.get('gabarito', ''),
+            "resposta_modelo": resultado.get('resposta_modelo', ''),
+            "acertou": acertou,
+            "area": area
+        }, ensure_ascii=False) + '\n')
+    
+    def estatisticas(self) -> Dict:
+        """Estatísticas gerais e por área dos resultados recebidos até agora."""
+        por_area = {}
+        for area, (acertos, erros, sem_resposta) in self._contagens.items():
+            respondidas = acertos + erros
+            por_area[area] = {
+                "area": area,
+                "total_questoes": acertos + erros + sem_resposta,
+                "acertos": acertos,
+                "erros": erros,
+                "sem_resposta": sem_resposta,
+                "taxa_acerto": round(acertos / respondidas * 100, 2) if respondidas else 0
+            }
+        return {"total_questoes": self.total, "por_area": por_area}
+    
+    def finalizar(self) -> Dict:
+        """
+        Fecha os arquivos JSONL e grava os relatórios de estatísticas e o Markdown.
+        
+        Returns:
+            Estatísticas gerais e por área
+        """
+        for arquivos in self._arquivos.values():
+            for arquivo in arquivos:
+                arquivo.close()
+        
+        stats_geral = self.estatisticas()
+        for area, stats_area in sorted(stats_geral["por_area"].items()):
+            arquivo_relatorio = self.pasta / f"relatorio_{area.lower()}.json"
+            with open(arquivo_relatorio, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "estatisticas": stats_area,
+                    "resultados": f"resultados_{area.lower()}.jsonl",
+                    "dados_treinamento": f"dados_treinamento_{area.lower()}.jsonl"
+                }, f, ensure_ascii=False, indent=2)
+            
+            respondidas = stats_area['acertos'] + stats_area['erros']
+            print(f"📝 {area}: {stats_area['total_questoes']} questões")
+            print(f"   ✅ {arquivo_relatorio.name}, resultados_{area.lower()}.jsonl, dados_treinamento_{area.lower()}.jsonl")
+            print(f"   📊 Taxa de acerto: {stats_area['taxa_acerto']:.2f}% ({stats_area['acertos']}/{respondidas})")
+            print()
+        
+        arquivo_geral = self.pasta / "relatorio_geral.json"
+        with open(arquivo_geral, 'w', encoding='utf-8') as f:
+            json.dump(stats_geral, f, ensure_ascii=False, indent=2)
+        
+        print(f"✅ Relatório geral salvo em: {arquivo_geral}")
+        print()
+        
+        gerar_relatorio_markdown(stats_geral, self._erros, self.pasta)
+        return stats_geral
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.finalizar()
+        else:
+            for arquivos in self._arquivos.values():
+                for arquivo in arquivos:
+                    arquivo.close()
+
+
+def gerar_relatorios_por_area(resultados: Iterable[Dict], pasta_saida: str = "relatorios_treinamento") -> Dict:
+    """
+    Gera relatórios separados por área.
+    
+    Args:
+        resultados: Resultados (lista ou qualquer iterável, ex.: um gerador
+            sobre o journal), percorridos uma única vez
+        pasta_saida: Pasta onde os relatórios são gravados
+    
+    Returns:
+        Estatísticas gerais e por área
+    """
+    print("=" * 80)
+    print("📊 GERANDO RELATÓRIOS POR ÁREA")
+    print("=" * 80)
+    print()
+    
+    with AgregadorRelatorios(pasta_saida) as agregador:
+        for resultado in resultados:
+            agregador.adicionar(resultado)
+    return agregador.estatisticas()
+
+
+def gerar_relatorios_do_journal(
+    caminho: Union[str, Path],
+    questoes_por_chave: Optional[Dict] = None,
+    pasta_saida: str = "relatorios_treinamento"
+) -> Dict:
+    """
+    Gera os relatórios lendo o journal em uma única passada, com memória constante.
+    
+    O journal deve ter um registro por questão, como ao final de uma
+    execução completa (compactado) ou após `--mesclar`.
+    
+    Args:
+        caminho: Journal JSONL dos resultados
+        questoes_por_chave: {`Questao.chave`: `Questao`} para incluir o
+            enunciado e as alternativas nos dados de treinamento
+        pasta_saida: Pasta onde os relatórios são gravados
+    
+    Returns:
+        Estatísticas gerais e por área
+    """
+    def registros():
+        for resultado in ler_journal(caminho):
+            if questoes_por_chave:
+                questao = questoes_por_chave.get(chave_resultado(resultado))
+                if questao is not None:
+                    resultado['questao_original'] = questao
+            yield resultado
+    
+    return gerar_relatorios_por_area(registros(), pasta_saida)
+
+
+def gerar_relatorio_markdown(stats_geral: Dict, erros_por_area: Dict, pasta: Path):
+    """
+    Gera relatório em formato Markdown.
+    
+    Args:
+        stats_geral: Estatísticas de `AgregadorRelatorios.estatisticas`
+        erros_por_area: Primeiras questões com erro de cada área
+        pasta: Pasta dos relatórios
+    """
+    arquivo_md = pasta / "RELATORIO_TREINAMENTO.md"
+    
+    with open(arquivo_md, 'w', encoding='utf-8') as f:
+        f.write("# 📊 Relatório de Resolução - Questões ENEM\n\n")
+        f.write(f"**Data**: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"**Total de Questões**: {stats_geral['total_questoes']:,}\n\n")
+        
+        f.write("## 📈 Resumo Geral\n\n")
+        f.write("| Área | Total | Acertos | Erros | Taxa de Acerto |\n")
+        f.write("|------|-------|---------|-------|----------------|\n")
+        
+        for area, stats in sorted(stats_geral['por_area'].items()):
+            f.write(f"| {area} | {stats['total_questoes']} | {stats['acertos']} | {stats['erros']} | {stats['taxa_acerto']:.2f}% |\n")
+        
+        f.write("\n## 📚 Detalhes por Área\n\n")
+        
+        for area, stats in sorted(stats_geral['por_area'].items()):
+            f.write(f"### {area}\n\n")
+            f.write(f"- **Total de Questões**: {stats['total_questoes']}\n")
+            f.write(f"- **Acertos**: {stats['acertos']}\n")
+            f.write(f"- **Erros**: {stats['erros']}\n")
+            f.write(f"- **Taxa de Acerto**: {stats['taxa_acerto']:.2f}%\n\n")
+            
+            erros_area = erros_por_area.get(area, [])
+            if erros_area:
+                f.write(f"#### Questões com Erro (Primeiras {MAX_ERROS_MARKDOWN})\n\n")
+                for i, erro in enumerate(erros_area, 1):
+                    f.write(f"{i}. Questão {erro['questao_id']}\n")
+                    f.write(f"   - Gabarito: {erro['gabarito']}\n")
+                    f.write(f"   - Resposta do modelo: {erro['resposta_modelo']}...\n\n")
+        
+        f.write("\n## 📁 Arquivos Gerados\n\n")
+        f.write("- `relatorio_{area}.json` - Estatísticas da área\n")
+        f.write("- `resultados_{area}.jsonl` - Resultados da área, um por linha\n")
+        f.write("- `dados_treinamento_{area}.jsonl` - Dados formatados para treinamento\n")
+        f.write("- `relatorio_geral.json` - Estatísticas gerais\n")
+    
+    print(f"✅ Relatório Markdown salvo em: {arquivo_md}")
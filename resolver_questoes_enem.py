@@ -6,19 +6,23 @@ Busca questões da API ENEM ou arquivos locais e pede para o modelo resolver.
 
 import os
 import sys
-import json
 import random
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 
 # Adicionar diretório atual ao path
 sys.path.insert(0, str(Path(__file__).parent))
 
 try:
     from maritaca_api import MaritacaAPI
+    from cache_respostas import CacheRespostas
+    from corpus_enem import amostrar_questoes
+    from questao_enem import Questao, como_questao
+    from extrator_respostas import corrigir
     USE_API = True
-except ImportError:
-    print("❌ maritaca_api.py não encontrado. Instale: pip install requests")
+except ImportError as e:
+    print(f"❌ Erro ao importar dependências: {e}")
+    print("Instale as dependências com: pip install -r requirements.txt")
     sys.exit(1)
 
 
@@ -139,12 +143,16 @@ def buscar_questoes_api(num_questoes: int = 5) -> List[Dict]:
         return []
 
 
-def buscar_questoes_locais(num_questoes: int = 5) -> List[Dict]:
+def buscar_questoes_locais(num_questoes: int = 5, por_area: bool = False) -> List[Dict]:
     """
     Busca questões de arquivos JSONL locais.
     
+    Usa o índice de posições das provas, então apenas as questões sorteadas
+    são lidas do disco.
+    
     Args:
         num_questoes: Número de questões a buscar
+        por_area: Distribui as questões igualmente entre as áreas
     
     Returns:
         Lista de questões
@@ -161,81 +169,60 @@ def buscar_questoes_locais(num_questoes: int = 5) -> List[Dict]:
         print(f"⚠️  Nenhum arquivo .jsonl encontrado em {data_dir}")
         return []
     
-    print(f"📚 Carregando questões de {len(arquivos_jsonl)} arquivos...")
+    print(f"📚 Sorteando questões de {len(arquivos_jsonl)} arquivos...")
     
-    todas_questoes = []
+    questoes_selecionadas = amostrar_questoes(str(data_dir), num_questoes, por_area=por_area)
     
-    for arquivo in arquivos_jsonl:
-        try:
-            with open(arquivo, 'r', encoding='utf-8') as f:
-                for linha in f:
-                    linha = linha.strip()
-                    if linha:
-                        try:
-                            questao = json.loads(linha)
-                            todas_questoes.append(questao)
-                        except json.JSONDecodeError:
-                            continue
-        except Exception as e:
-            print(f"   ⚠️  Erro ao ler {arquivo.name}: {e}")
-    
-    if not todas_questoes:
+    if not questoes_selecionadas:
         print("❌ Nenhuma questão encontrada nos arquivos locais")
         return []
     
-    # Selecionar aleatórias
-    questoes_selecionadas = random.sample(
-        todas_questoes,
-        min(num_questoes, len(todas_questoes))
-    )
-    
-    print(f"✅ {len(questoes_selecionadas)} questões selecionadas de {len(todas_questoes)} disponíveis")
+    print(f"✅ {len(questoes_selecionadas)} questões selecionadas")
     return questoes_selecionadas
 
 
-def formatar_questao(questao: Dict) -> str:
+def formatar_questao(questao: Union[Dict, Questao]) -> str:
     """
     Formata uma questão para o prompt do modelo.
     
     Args:
-        questao: Dicionário com dados da questão
+        questao: Dicionário com dados da questão (ou questão já normalizada)
     
     Returns:
         String formatada
     """
-    # Tentar diferentes formatos de dados
-    ano = questao.get('ano') or questao.get('year') or questao.get('edicao', 'N/A')
-    area = questao.get('area') or questao.get('subject') or questao.get('disciplina', 'N/A')
-    
-    texto = questao.get('questao') or questao.get('question') or questao.get('texto', '')
-    alternativas = questao.get('alternativas') or questao.get('alternatives') or {}
-    gabarito = questao.get('gabarito') or questao.get('correct_answer') or questao.get('resposta', '')
+    questao = como_questao(questao)
+    ano = questao.ano or 'N/A'
+    area = questao.area or 'N/A'
     
     # Formatar prompt
     prompt = f"""Questão do ENEM {ano} - {area}
 
-{texto}
+{questao.enunciado}
 
 """
     
     # Adicionar alternativas
-    if isinstance(alternativas, dict):
-        for letra in ['A', 'B', 'C', 'D', 'E']:
-            alt = alternativas.get(letra) or alternativas.get(letra.lower())
-            if alt:
-                prompt += f"{letra}) {alt}\n"
-    elif isinstance(alternativas, list):
-        for i, alt in enumerate(alternativas):
-            letra = chr(65 + i)  # A, B, C, D, E
-            prompt += f"{letra}) {alt}\n"
+    prompt += questao.formatar_alternativas()
     
     prompt += "\nResolva esta questão passo a passo e indique a alternativa correta:"
     
-    return prompt, gabarito
+    return prompt, questao.gabarito
 
 
-def resolver_questoes(num_questoes: int = 5):
-    """Resolve questões aleatórias do ENEM."""
+def resolver_questoes(
+    num_questoes: int = 5,
+    cache: Optional[CacheRespostas] = None,
+    por_area: bool = False
+):
+    """
+    Resolve questões aleatórias do ENEM.
+    
+    Args:
+        num_questoes: Número de questões a resolver
+        cache: Cache de respostas da API (opcional)
+        por_area: Sorteia as questões igualmente entre as áreas
+    """
     
     print("=" * 80)
     print("🎓 RESOLUÇÃO DE QUESTÕES DO ENEM")
@@ -258,7 +245,7 @@ def resolver_questoes(num_questoes: int = 5):
                             os.environ['MARITACA_API_KEY'] = value.strip()
                             break
     
-    if not api_key:
+    if not api_key and not (cache and cache.replay):
         print("❌ Erro: MARITACA_API_KEY não encontrada!")
         print("\nConfigure no arquivo .env ou como variável de ambiente:")
         print("  echo 'MARITACA_API_KEY=sua-chave' > .env")
@@ -266,7 +253,7 @@ def resolver_questoes(num_questoes: int = 5):
     
     # Inicializar cliente
     try:
-        client = MaritacaAPI(api_key=api_key)
+        client = MaritacaAPI(api_key=api_key, cache=cache)
         print("✅ Cliente API inicializado\n")
     except Exception as e:
         print(f"❌ Erro ao inicializar cliente: {e}")
@@ -274,7 +261,7 @@ def resolver_questoes(num_questoes: int = 5):
     
     # Buscar questões
     print("📥 Buscando questões...")
-    questoes = buscar_questoes_locais(num_questoes)
+    questoes = buscar_questoes_locais(num_questoes, por_area=por_area)
     
     if not questoes:
         print("\n💡 Tentando buscar da API ENEM...")
@@ -323,16 +310,14 @@ def resolver_questoes(num_questoes: int = 5):
             print(resposta)
             
             # Verificar se acertou (se tiver gabarito)
-            acertou = None
-            if gabarito:
-                resposta_upper = resposta.upper()
-                gabarito_upper = str(gabarito).upper()
-                acertou = gabarito_upper in resposta_upper or f"ALTERNATIVA {gabarito_upper}" in resposta_upper
+            acertou, letra, confianca = corrigir(resposta, gabarito)
             
             resultados.append({
                 "questao_num": i,
                 "gabarito": gabarito,
                 "resposta_modelo": resposta,
+                "letra_resposta": letra,
+                "confianca_extracao": confianca,
                 "acertou": acertou
             })
             
@@ -349,6 +334,8 @@ def resolver_questoes(num_questoes: int = 5):
         
         print("\n")
     
+    client.close()
+    
     # Resumo final
     print("=" * 80)
     print("📊 RESUMO")
@@ -368,6 +355,9 @@ def resolver_questoes(num_questoes: int = 5):
         print(f"📈 Taxa de acerto: {taxa:.2f}%")
     if sem_gabarito > 0:
         print(f"⚪ Sem gabarito para comparação: {sem_gabarito}")
+    if cache is not None:
+        stats_cache = cache.estatisticas()
+        print(f"💾 Cache: {stats_cache['hits']} hits, {stats_cache['misses']} misses")
     
     print("\n" + "=" * 80)
 
@@ -383,11 +373,32 @@ def main():
         default=5,
         help='Número de questões a resolver (padrão: 5)'
     )
+    parser.add_argument(
+        '--cache',
+        nargs='?',
+        const='cache_respostas.sqlite',
+        default=None,
+        help='Reutiliza respostas armazenadas em cache SQLite (padrão: cache_respostas.sqlite)'
+    )
+    parser.add_argument(
+        '--replay',
+        action='store_true',
+        help='Usa apenas respostas do cache, sem chamar a API (implica --cache)'
+    )
+    parser.add_argument(
+        '--por-area',
+        action='store_true',
+        help='Sorteia as questões igualmente entre as áreas do conhecimento'
+    )
     
     args = parser.parse_args()
     
+    cache = None
+    if args.cache or args.replay:
+        cache = CacheRespostas(args.cache or 'cache_respostas.sqlite', replay=args.replay)
+    
     try:
-        resolver_questoes(num_questoes=args.num)
+        resolver_questoes(num_questoes=args.num, cache=cache, por_area=args.por_area)
     except KeyboardInterrupt:
         print("\n\n⚠️  Interrompido pelo usuário")
     except Exception as e:
@@ -6,156 +6,395 @@ e gerar relatórios separados por área para treinamento.
 import json
 import os
 import sys
-import time
 from pathlib import Path
 from collections import defaultdict, Counter
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, Union
 import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Adicionar diretório atual ao path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from maritaca_api import MaritacaAPI
+from maritaca_api import MaritacaAPI, TokenBucket
+from cache_respostas import CacheRespostas
+from journal_resultados import JournalResultados, chave_resultado, gravar_journal, indice_chaves_legadas, ler_journal
+from corpus_enem import carregar_corpus
+from questao_enem import Questao, area_prompt, como_questao, formatar_questao_para_prompt, normalizar_questoes
+from questao_enem import MAPEAMENTO_AREAS, formatar_prefixo_prompt  # noqa: F401
+from extrator_respostas import corrigir, extrair_letra
+from protocolo_resposta import MODOS_RESPOSTA, gerar_resposta, preparar_prompt
+from relatorios_resolucao import gerar_relatorios_do_journal, gerar_relatorios_por_area  # noqa: F401
+from shards_resolucao import (
+    caminho_journal_shard,
+    encontrar_journals_shard,
+    filtrar_shard,
+    interpretar_shard,
+    mesclar_journals
+)
 
-# Mapeamento de áreas
-MAPEAMENTO_AREAS = {
-    "languages": "LINGUAGENS",
-    "human-sciences": "HUMANAS",
-    "natural-sciences": "NATUREZA",
-    "mathematics": "MATEMATICA",
-    "N/A": "OUTRAS"
-}
+# Journal do progresso da resolução completa
+ARQUIVO_PROGRESSO = "progresso_resolucao.jsonl"
 
-def carregar_todas_questoes(pasta_provas: str = "provas") -> List[Dict]:
-    """Carrega todas as questões dos arquivos JSONL."""
-    pasta = Path(pasta_provas)
-    arquivos = sorted(list(pasta.glob("*.jsonl")))
-    
-    todas_questoes = []
+
+def carregar_todas_questoes(pasta_provas: str = "provas") -> List[Questao]:
+    """Carrega e normaliza todas as questões dos arquivos JSONL (via cache binário do corpus)."""
+    arquivos = sorted(list(Path(pasta_provas).glob("*.jsonl")))
     
     print(f"📚 Carregando questões de {len(arquivos)} arquivos...")
     
-    for arquivo in arquivos:
-        try:
-            with open(arquivo, 'r', encoding='utf-8') as f:
-                for linha_num, linha in enumerate(f, 1):
-                    linha = linha.strip()
-                    if linha:
-                        try:
-                            questao = json.loads(linha)
-                            # Adicionar nome do arquivo de origem
-                            questao['arquivo_origem'] = arquivo.name
-                            todas_questoes.append(questao)
-                        except json.JSONDecodeError:
-                            continue
-        except Exception as e:
-            print(f"⚠️  Erro ao ler {arquivo.name}: {e}")
+    todas_questoes = normalizar_questoes(carregar_corpus(pasta_provas))
     
     print(f"✅ {len(todas_questoes)} questões carregadas\n")
     return todas_questoes
 
 
-def formatar_questao_para_prompt(questao: Dict) -> tuple:
+def resolver_questao(
+    client: MaritacaAPI,
+    questao: Union[Dict, Questao],
+    modo: str = "raciocinio"
+) -> Dict:
     """
-    Formata questão para prompt do modelo.
+    Resolve uma questão usando o modelo.
     
-    Returns:
-        (prompt_formatado, gabarito, area)
+    Args:
+        client: Cliente da API
+        questao: Questão a resolver
+        modo: "raciocinio" (passo a passo, interrompido após `RESPOSTA: X`)
+            ou "letra" (apenas a letra, para reavaliações rápidas)
     """
-    # Extrair informações
-    texto_questao = questao.get('question') or questao.get('questao') or questao.get('original_question', '')
-    contexto = questao.get('context') or questao.get('description', '')
-    
-    # Alternativas
-    alternativas = questao.get('alternatives') or questao.get('alternativas') or questao.get('options', {})
-    gabarito = questao.get('answer') or questao.get('gabarito') or questao.get('correct_answer', '')
-    
-    # Área
-    area_raw = questao.get('area') or questao.get('subject') or 'N/A'
-    area = MAPEAMENTO_AREAS.get(area_raw, area_raw.upper())
-    
-    # Montar prompt
-    prompt = f"Questão do ENEM - {area}\n\n"
-    
-    if contexto:
-        prompt += f"Contexto: {contexto}\n\n"
-    
-    prompt += f"{texto_questao}\n\n"
-    
-    # Adicionar alternativas
-    if isinstance(alternativas, dict):
-        for letra in ['A', 'B', 'C', 'D', 'E']:
-            alt = alternativas.get(letra) or alternativas.get(letra.lower())
-            if alt:
-                prompt += f"{letra}) {alt}\n"
-    elif isinstance(alternativas, list):
-        for i, alt in enumerate(alternativas):
-            letra = chr(65 + i)  # A, B, C, D, E
-            prompt += f"{letra}) {alt}\n"
-    
-    prompt += "\nResolva esta questão passo a passo e indique a alternativa correta:"
-    
-    return prompt, str(gabarito).upper().strip(), area
-
-
-def resolver_questao(client: MaritacaAPI, questao: Dict) -> Dict:
-    """Resolve uma questão usando o modelo."""
+    questao = como_questao(questao)
     prompt, gabarito, area = formatar_questao_para_prompt(questao)
     
     try:
-        resposta = client.generate_enem_response(
-            prompt=prompt,
+        resposta, _ = gerar_resposta(
+            client,
+            prompt,
+            modo=modo,
             temperature=0.7,
             max_tokens=500
         )
         
-        # Verificar se acertou
-        resposta_upper = resposta.upper()
-        gabarito_upper = gabarito.upper()
-        acertou = (
-            gabarito_upper in resposta_upper or 
-            f"ALTERNATIVA {gabarito_upper}" in resposta_upper or
-            f"LETRA {gabarito_upper}" in resposta_upper or
-            f"OPÇÃO {gabarito_upper}" in resposta_upper
-        )
+        # Verificar se acertou (mesma extração usada para recorrigir o journal)
+        acertou, letra, confianca = corrigir(resposta, gabarito)
         
         return {
-            "questao_id": questao.get('id') or questao.get('number', ''),
-            "arquivo_origem": questao.get('arquivo_origem', ''),
+            "questao_id": questao.id,
+            "chave": questao.chave,
+            "arquivo_origem": questao.arquivo_origem,
             "area": area,
             "gabarito": gabarito,
+            "modo": modo,
             "resposta_modelo": resposta,
+            "letra_resposta": letra,
+            "confianca_extracao": confianca,
             "acertou": acertou,
-            "prompt_usado": prompt,
+            "prompt_usado": preparar_prompt(prompt, modo),
             "questao_original": questao
         }
-        
+    
     except Exception as e:
         return {
-            "questao_id": questao.get('id') or questao.get('number', ''),
-            "arquivo_origem": questao.get('arquivo_origem', ''),
+            "questao_id": questao.id,
+            "chave": questao.chave,
+            "arquivo_origem": questao.arquivo_origem,
             "area": area,
             "gabarito": gabarito,
+            "modo": modo,
             "erro": str(e),
             "questao_original": questao
         }
 
 
+def resolver_questao_com_votos(
+    client: MaritacaAPI,
+    questao: Union[Dict, Questao],
+    k: int = 5,
+    modo: str = "raciocinio"
+) -> Dict:
+    """
+    Resolve uma questão por votação entre k amostras (self-consistency).
+    
+    As k amostras são enviadas em paralelo. Assim que a alternativa mais
+    votada não pode mais ser alcançada pelas amostras restantes, as que
+    ainda estão na fila não são enviadas e os streams em andamento são
+    cancelados, economizando tempo e tokens.
+    
+    Args:
+        client: Cliente da API (use pool_size >= k)
+        questao: Questão a resolver
+        k: Número máximo de amostras
+        modo: Modo de resposta (ver `resolver_questao`)
+    
+    Returns:
+        Resultado no formato de `resolver_questao`, com a alternativa mais
+        votada em `letra_resposta` e, adicionalmente, `votos` (letra ->
+        número de votos) e `amostras` (amostras concluídas)
+    """
+    questao = como_questao(questao)
+    prompt, gabarito, area = formatar_questao_para_prompt(questao)
+    interromper = threading.Event()
+    
+    def amostrar(indice: int) -> Optional[str]:
+        if interromper.is_set():
+            return None
+        resposta, _ = gerar_resposta(
+            client,
+            prompt,
+            modo=modo,
+            temperature=0.7,
+            max_tokens=500,
+            amostra=indice,
+            interromper=interromper
+        )
+        return resposta
+    
+    votos = Counter()
+    respostas = {}  # letra -> (primeira resposta que votou nela, confiança)
+    concluidas = 0
+    erros = []
+    
+    executor = ThreadPoolExecutor(max_workers=k)
+    futuros = [executor.submit(amostrar, indice) for indice in range(k)]
+    try:
+        for futuro in as_completed(futuros):
+            concluidas += 1
+            try:
+                resposta = futuro.result()
+            except Exception as e:
+                erros.append(str(e))
+                continue
+            
+            letra, confianca, _ = extrair_letra(resposta)
+            if letra is not None:
+                votos[letra] += 1
+                respostas.setdefault(letra, (resposta, confianca))
+            
+            # Parar quando a liderança estiver garantida
+            primeiro, segundo = (votos.most_common(2) + [(None, 0), (None, 0)])[:2]
+            if primeiro[1] > segundo[1] + (k - concluidas):
+                break
+    finally:
+        interromper.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    resultado = {
+        "questao_id": questao.id,
+        "chave": questao.chave,
+        "arquivo_origem": questao.arquivo_origem,
+        "area": area,
+        "gabarito": gabarito,
+        "modo": modo,
+        "votos": dict(votos),
+        "amostras": concluidas,
+        "questao_original": questao
+    }
+    
+    if not votos and erros:
+        resultado["erro"] = erros[0]
+        return resultado
+    
+    letra = votos.most_common(1)[0][0] if votos else None
+    resposta, confianca = respostas.get(letra, ("", 0.0))
+    resultado.update({
+        "resposta_modelo": resposta,
+        "letra_resposta": letra,
+        "confianca_extracao": confianca,
+        "acertou": (letra == gabarito) if gabarito else None,
+        "prompt_usado": preparar_prompt(prompt, modo)
+    })
+    return resultado
+
+
+def _resolver_em_ordem(
+    client: MaritacaAPI,
+    pendentes: List[tuple],
+    workers: int,
+    modo: str = "raciocinio",
+    votos: int = 1
+) -> Iterator[tuple]:
+    """
+    Resolve as questões pendentes e devolve (indice, questao, resultado)
+    na mesma ordem de `pendentes`, com até `workers` questões em andamento
+    (cada uma com até `votos` amostras em voo).
+    
+    O ritmo das requisições é controlado pelo limitador do `client`, comum
+    a todos os workers.
+    """
+    def resolver(questao):
+        if votos > 1:
+            return resolver_questao_com_votos(client, questao, votos, modo)
+        return resolver_questao(client, questao, modo)
+    
+    if workers <= 1:
+        for i, questao in pendentes:
+            yield i, questao, resolver(questao)
+        return
+    
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futuros = [(i, questao, executor.submit(resolver, questao)) for i, questao in pendentes]
+    try:
+        for i, questao, futuro in futuros:
+            yield i, questao, futuro.result()
+    finally:
+        # Em caso de interrupção, não inicia as requisições que ainda estão na fila
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _migrar_progresso_legado(arquivo_legado: Path, arquivo_journal: Path):
+    """Converte um progresso_resolucao.json antigo para o journal JSONL."""
+    if not arquivo_legado.exists() or arquivo_journal.exists():
+        return
+    
+    try:
+        with open(arquivo_legado, 'r', encoding='utf-8') as f:
+            progresso_anterior = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️  Progresso anterior ilegível ({arquivo_legado}): {e}")
+        return
+    
+    with JournalResultados(arquivo_journal) as journal:
+        for resultado in progresso_anterior.get('resultados', []):
+            journal.registrar(resultado)
+    print(f"📦 {arquivo_legado} convertido para {arquivo_journal}")
+
+
+def carregar_resultados_journal(caminho: Union[str, Path], questoes: List[Questao],
+                                migrar: bool = False) -> List[Dict]:
+    """
+    Lê os resultados de um journal e religa cada um à sua questão.
+    
+    Os campos não gravados no journal (`questao_original`) são reconstruídos
+    a partir das questões carregadas. Registros anteriores à chave canônica
+    recebem a chave da questão com o mesmo arquivo e id, quando ela é única;
+    os demais (ids repetidos ou vazios no arquivo) são descartados e a
+    questão volta a ser resolvida. Também são descartadas as cópias
+    (`duplicata_de`) de questões que não podem ser deduplicadas pelo texto
+    (ver `Questao.chave_deduplicacao`).
+    
+    Args:
+        caminho: Journal JSONL
+        questoes: Questões carregadas
+        migrar: Regrava o journal com as chaves canônicas se houver
+            registros antigos ou descartados
+    
+    Returns:
+        Resultados do journal
+    """
+    questoes_por_chave = {questao.chave: questao for questao in questoes}
+    
+    # Registros antigos: (arquivo, id) -> questão, apenas se o par for único
+    legado = None
+    
+    resultados = []
+    migrados = 0
+    descartados = 0
+    copias_invalidas = 0
+    for resultado in ler_journal(caminho):
+        if not resultado.get('chave'):
+            if legado is None:
+                legado = indice_chaves_legadas(questoes)
+            questao = legado.get((resultado.get('arquivo_origem', ''), str(resultado.get('questao_id', ''))))
+            if questao is None:
+                descartados += 1
+                continue
+            resultado['chave'] = questao.chave
+            migrados += 1
+        
+        questao = questoes_por_chave.get(chave_resultado(resultado))
+        if questao is not None:
+            if resultado.get('duplicata_de') and questao.chave_deduplicacao == questao.chave:
+                copias_invalidas += 1
+                continue
+            resultado['questao_original'] = questao
+        resultados.append(resultado)
+    
+    if migrados or descartados:
+        print(f"🔑 {migrados} resultados antigos convertidos para a chave canônica")
+        if descartados:
+            print(f"   ⚠️  {descartados} sem questão única (id repetido ou vazio) serão resolvidos novamente")
+    if copias_invalidas:
+        print(f"♻️  {copias_invalidas} respostas copiadas de questões com imagem ou texto incompleto serão resolvidas novamente")
+    if migrar and (migrados or descartados or copias_invalidas):
+        gravar_journal(caminho, resultados)
+    
+    return resultados
+
+
+def copiar_resultado(resultado: Dict, questao: Questao) -> Dict:
+    """
+    Resultado de uma questão com o mesmo conteúdo de outra já resolvida.
+    
+    A resposta é reaproveitada; identificação, gabarito e correção são os
+    da própria questão, e `duplicata_de` aponta a questão resolvida.
+    """
+    copia = dict(resultado)
+    copia.update({
+        "questao_id": questao.id,
+        "chave": questao.chave,
+        "arquivo_origem": questao.arquivo_origem,
+        "area": area_prompt(questao),
+        "gabarito": questao.gabarito,
+        "duplicata_de": resultado.get('chave'),
+        "questao_original": questao
+    })
+    if 'letra_resposta' in resultado:
+        copia['acertou'] = (resultado['letra_resposta'] == questao.gabarito) if questao.gabarito else None
+    return copia
+
+
 def processar_todas_questoes(
-    questoes: List[Dict],
+    questoes: List[Union[Dict, Questao]],
     salvar_progresso: bool = True,
-    intervalo_entre_requisicoes: float = 0.5
+    intervalo_entre_requisicoes: float = 0.5,
+    workers: int = 1,
+    requisicoes_por_segundo: Optional[float] = None,
+    requisicoes_por_segundo_max: Optional[float] = None,
+    cache: Optional[CacheRespostas] = None,
+    modo: str = "raciocinio",
+    votos: int = 1,
+    arquivo_progresso: Union[str, Path] = ARQUIVO_PROGRESSO
 ) -> List[Dict]:
-    """Processa todas as questões com o modelo."""
+    """
+    Processa todas as questões com o modelo.
+    
+    Args:
+        questoes: Questões a resolver
+        salvar_progresso: Se True, salva/retoma progresso no journal
+            `arquivo_progresso`
+        intervalo_entre_requisicoes: Define a taxa inicial de 1/intervalo
+            requisições por segundo quando `requisicoes_por_segundo` não é
+            informado
+        workers: Número de requisições simultâneas à API
+        requisicoes_por_segundo: Taxa inicial de requisições por segundo
+            (somando todos os workers). A taxa sobe aos poucos enquanto não
+            há 429 e é reduzida a cada 429 recebido
+        requisicoes_por_segundo_max: Teto da taxa (padrão:
+            `maritaca_api.TETO_RELATIVO_PADRAO` vezes a taxa inicial)
+        cache: Cache de respostas da API (opcional)
+        modo: Modo de resposta: "raciocinio" ou "letra"
+        votos: Amostras por questão; com mais de uma, a resposta é decidida
+            por votação (ver `resolver_questao_com_votos`)
+        arquivo_progresso: Journal JSONL do progresso (em um shard, o
+            journal do shard; ver `shards_resolucao.py`)
+    
+    Returns:
+        Resultados na mesma ordem das questões
+    """
+    if requisicoes_por_segundo is None and intervalo_entre_requisicoes > 0:
+        requisicoes_por_segundo = 1.0 / intervalo_entre_requisicoes
     
     print("=" * 80)
     print("🤖 RESOLVENDO TODAS AS QUESTÕES COM O MODELO")
     print("=" * 80)
     print()
     
+    # Limitador próprio desta execução, comum a todos os workers
+    limitador = TokenBucket(taxa=requisicoes_por_segundo, taxa_maxima=requisicoes_por_segundo_max)
+    
     # Inicializar cliente
     try:
-        client = MaritacaAPI()
+        client = MaritacaAPI(pool_size=max(workers, 1) * max(votos, 1), limitador=limitador, cache=cache)
         print("✅ Cliente API inicializado\n")
     except Exception as e:
         print(f"❌ Erro ao inicializar cliente: {e}")
@@ -163,198 +402,151 @@ def processar_todas_questoes(
     
     total = len(questoes)
     resultados = []
-    arquivo_progresso = Path("progresso_resolucao.json")
+    arquivo_progresso = Path(arquivo_progresso)
+    journal = None
+    
+    questoes = normalizar_questoes(questoes)
     
     # Carregar progresso anterior se existir
     questoes_processadas = set()
-    if salvar_progresso and arquivo_progresso.exists():
-        try:
-            with open(arquivo_progresso, 'r', encoding='utf-8') as f:
-                progresso_anterior = json.load(f)
-                resultados.extend(progresso_anterior.get('resultados', []))
-                questoes_processadas = set(r.get('questao_id', '') for r in resultados)
-                print(f"📥 Progresso anterior carregado: {len(resultados)} questões já processadas\n")
-        except:
-            pass
-    
-    # Processar questões
-    print(f"🔄 Processando {total} questões...")
-    print(f"   Intervalo entre requisições: {intervalo_entre_requisicoes}s\n")
+    if salvar_progresso:
+        if arquivo_progresso == Path(ARQUIVO_PROGRESSO):
+            _migrar_progresso_legado(Path("progresso_resolucao.json"), arquivo_progresso)
+        # Ler (e migrar, se preciso) antes de abrir o journal para acrescentar
+        resultados = carregar_resultados_journal(arquivo_progresso, questoes, migrar=True)
+        journal = JournalResultados(arquivo_progresso)
+        questoes_processadas = {chave_resultado(resultado) for resultado in resultados}
+        if resultados:
+            print(f"📥 Progresso anterior carregado: {len(resultados)} questões já processadas\n")
+    
+    # Respostas já obtidas, por conteúdo (para questões repetidas em outros
+    # arquivos; ver `Questao.chave_deduplicacao`)
+    resolvidas = {
+        resultado['questao_original'].chave_deduplicacao: resultado for resultado in resultados
+        if 'questao_original' in resultado and 'erro' not in resultado
+    }
     
+    # Questões pendentes (mantendo a ordem original). Uma questão com o mesmo
+    # conteúdo de outra é resolvida uma única vez e recebe uma cópia do resultado
+    pendentes = []
+    representantes = {}
+    duplicatas = defaultdict(list)
     for i, questao in enumerate(questoes, 1):
-        questao_id = questao.get('id') or questao.get('number', '')
-        
-        # Pular se já processada
-        if questao_id in questoes_processadas:
+        if questao.chave in questoes_processadas:
             continue
         
-        print(f"[{i}/{total}] Processando questão {questao_id}...", end=' ', flush=True)
-        
-        resultado = resolver_questao(client, questao)
-        resultados.append(resultado)
+        if questao.chave_deduplicacao in resolvidas:
+            duplicatas[questao.chave_deduplicacao].append((i, questao))
+            continue
         
-        if resultado.get('acertou') is not None:
-            status = "✅" if resultado['acertou'] else "❌"
-            print(f"{status}")
+        representante = representantes.setdefault(questao.chave_deduplicacao, questao)
+        if representante is questao:
+            pendentes.append((i, questao))
         else:
-            print(f"⚠️  Erro")
-        
-        # Salvar progresso a cada 10 questões
-        if salvar_progresso and i % 10 == 0:
-            with open(arquivo_progresso, 'w', encoding='utf-8') as f:
-                json.dump({
-                    "total_processadas": len(resultados),
-                    "total_questoes": total,
-                    "resultados": resultados
-                }, f, ensure_ascii=False, indent=2)
-        
-        # Intervalo entre requisições
-        if i < total:
-            time.sleep(intervalo_entre_requisicoes)
+            duplicatas[questao.chave_deduplicacao].append((i, questao))
     
-    print(f"\n✅ Processamento concluído! {len(resultados)} questões processadas\n")
+    # Processar questões
+    print(f"🔄 Processando {total} questões...")
+    print(f"   Workers: {workers}")
+    print(f"   Modo de resposta: {modo}")
+    if votos > 1:
+        print(f"   Votação: até {votos} amostras por questão")
+    if duplicatas:
+        print(f"   Repetidas: {sum(map(len, duplicatas.values()))} questões com o mesmo conteúdo de outra (resolvidas uma vez)")
+    if limitador.taxa:
+        print(f"   Limite: {limitador.taxa:.2f} requisições/s iniciais, até {limitador.taxa_maxima:.2f} (adaptativo)\n")
+    else:
+        print("   Limite: sem limite de requisições/s\n")
+    
+    def registrar(resultado):
+        resultados.append(resultado)
+        # Salvar progresso (fsync a cada 10 questões)
+        if journal is not None:
+            journal.registrar(resultado)
+    
+    # Repetições de questões resolvidas em execuções anteriores
+    copiadas = 0
+    for chave_deduplicacao in [c for c in duplicatas if c in resolvidas]:
+        for _, questao in duplicatas.pop(chave_deduplicacao):
+            registrar(copiar_resultado(resolvidas[chave_deduplicacao], questao))
+            copiadas += 1
+    
+    novos = 0
+    amostras = 0
+    with client:
+        for i, questao, resultado in _resolver_em_ordem(client, pendentes, workers, modo, votos):
+            print(f"[{i}/{total}] Processando questão {questao.id}...", end=' ', flush=True)
+            
+            registrar(resultado)
+            novos += 1
+            amostras += resultado.get('amostras', 1)
+            
+            if resultado.get('acertou') is not None:
+                status = "✅" if resultado['acertou'] else "❌"
+                print(f"{status}")
+            else:
+                print(f"⚠️  Erro")
+            
+            # Com erro, as repetições continuam pendentes para a próxima execução
+            if 'erro' not in resultado:
+                for _, duplicata in duplicatas.pop(questao.chave_deduplicacao, []):
+                    registrar(copiar_resultado(resultado, duplicata))
+                    copiadas += 1
+    
+    if journal is not None:
+        # Execução completa: compactar o journal
+        if len(pendentes) == novos:
+            journal.compactar()
+        journal.close()
+    
+    print(f"\n✅ Processamento concluído! {len(resultados)} questões processadas")
+    if copiadas:
+        print(f"   ♻️  {copiadas} questões repetidas reaproveitaram a resposta da questão idêntica")
+    if votos > 1 and novos:
+        print(f"   🗳️  Amostras: {amostras} de até {novos * votos} ({amostras / novos:.2f} por questão)")
+    if limitador.total_limitadas:
+        print(f"   ⚠️  {limitador.total_limitadas} respostas 429 recebidas; taxa final: {limitador.taxa:.2f} requisições/s")
+    if cache is not None:
+        stats_cache = cache.estatisticas()
+        print(f"   💾 Cache: {stats_cache['hits']} hits, {stats_cache['misses']} misses ({stats_cache['taxa_acerto']:.2f}%)")
+    print()
     
     return resultados
 
 
-def gerar_relatorios_por_area(resultados: List[Dict]):
-    """Gera relatórios separados por área."""
-    
-    print("=" * 80)
-    print("📊 GERANDO RELATÓRIOS POR ÁREA")
-    print("=" * 80)
-    print()
-    
-    # Separar por área
-    resultados_por_area = defaultdict(list)
-    
-    for resultado in resultados:
-        area = resultado.get('area', 'OUTRAS')
-        resultados_por_area[area].append(resultado)
-    
-    # Criar pasta para relatórios
-    pasta_relatorios = Path("relatorios_treinamento")
-    pasta_relatorios.mkdir(exist_ok=True)
-    
-    # Estatísticas gerais
-    stats_geral = {
-        "total_questoes": len(resultados),
-        "por_area": {}
-    }
-    
-    # Gerar relatório para cada área
-    for area, resultados_area in resultados_por_area.items():
-        print(f"📝 Gerando relatório para {area}...")
-        
-        # Estatísticas da área
-        acertos = sum(1 for r in resultados_area if r.get('acertou') == True)
-        erros = sum(1 for r in resultados_area if r.get('acertou') == False)
-        sem_resposta = sum(1 for r in resultados_area if r.get('acertou') is None)
-        total_area = len(resultados_area)
-        
-        taxa_acerto = (acertos / (acertos + erros)) * 100 if (acertos + erros) > 0 else 0
-        
-        stats_area = {
-            "area": area,
-            "total_questoes": total_area,
-            "acertos": acertos,
-            "erros": erros,
-            "sem_resposta": sem_resposta,
-            "taxa_acerto": round(taxa_acerto, 2)
-        }
-        
-        stats_geral["por_area"][area] = stats_area
-        
-        # Salvar relatório JSON da área
-        arquivo_relatorio = pasta_relatorios / f"relatorio_{area.lower()}.json"
-        with open(arquivo_relatorio, 'w', encoding='utf-8') as f:
-            json.dump({
-                "estatisticas": stats_area,
-                "resultados": resultados_area
-            }, f, ensure_ascii=False, indent=2)
-        
-        # Salvar apenas questões para treinamento (formato simplificado)
-        arquivo_treinamento = pasta_relatorios / f"dados_treinamento_{area.lower()}.json"
-        dados_treinamento = []
-        
-        for resultado in resultados_area:
-            questao_original = resultado.get('questao_original', {})
-            dados_treinamento.append({
-                "questao": questao_original.get('question') or questao_original.get('questao', ''),
-                "alternativas": questao_original.get('alternatives') or questao_original.get('alternativas', {}),
-                "gabarito": resultado.get('gabarito', ''),
-                "resposta_modelo": resultado.get('resposta_modelo', ''),
-                "acertou": resultado.get('acertou'),
-                "area": area
-            })
-        
-        with open(arquivo_treinamento, 'w', encoding='utf-8') as f:
-            json.dump(dados_treinamento, f, ensure_ascii=False, indent=2)
-        
-        print(f"   ✅ {arquivo_relatorio.name} ({total_area} questões)")
-        print(f"   ✅ {arquivo_treinamento.name} (dados para treinamento)")
-        print(f"   📊 Taxa de acerto: {taxa_acerto:.2f}% ({acertos}/{acertos + erros})")
-        print()
+def mesclar_shards(questoes: List[Questao], arquivo_progresso: Union[str, Path] = ARQUIVO_PROGRESSO) -> List[Dict]:
+    """
+    Mescla os journals dos shards (`--shard i/N`) no journal principal.
     
-    # Salvar relatório geral
-    arquivo_geral = pasta_relatorios / "relatorio_geral.json"
-    with open(arquivo_geral, 'w', encoding='utf-8') as f:
-        json.dump(stats_geral, f, ensure_ascii=False, indent=2)
+    Resultados já presentes no journal principal são mantidos; os dos
+    shards prevalecem para as mesmas questões. Shards ausentes são
+    informados, e a mescla pode ser repetida quando eles terminarem.
     
-    print(f"✅ Relatório geral salvo em: {arquivo_geral}")
-    print()
+    Args:
+        questoes: Questões carregadas (para religar os resultados)
+        arquivo_progresso: Journal principal
     
-    # Gerar relatório em Markdown
-    gerar_relatorio_markdown(stats_geral, resultados_por_area, pasta_relatorios)
+    Returns:
+        Resultados mesclados (ver `carregar_resultados_journal`)
+    """
+    journals_por_total = encontrar_journals_shard(arquivo_progresso)
+    if not journals_por_total:
+        print(f"❌ Nenhum journal de shard encontrado ao lado de {arquivo_progresso}")
+        return []
     
-    return stats_geral
-
-
-def gerar_relatorio_markdown(stats_geral: Dict, resultados_por_area: Dict, pasta: Path):
-    """Gera relatório em formato Markdown."""
+    caminhos = [Path(arquivo_progresso)] if Path(arquivo_progresso).exists() else []
+    for total, journals in journals_por_total.items():
+        faltando = [str(indice) for indice in range(total) if indice not in journals]
+        print(f"🧩 {len(journals)} de {total} shards encontrados")
+        if faltando:
+            print(f"   ⚠️  Shards ausentes: {', '.join(faltando)} (os relatórios ficarão parciais)")
+        caminhos.extend(journals.values())
     
-    arquivo_md = pasta / "RELATORIO_TREINAMENTO.md"
+    estatisticas = mesclar_journals(caminhos, arquivo_progresso)
+    print(f"✅ {estatisticas['registros']} registros de {estatisticas['journals']} journals -> "
+          f"{estatisticas['questoes']} questões em {arquivo_progresso}\n")
     
-    with open(arquivo_md, 'w', encoding='utf-8') as f:
-        f.write("# 📊 Relatório de Resolução - Questões ENEM\n\n")
-        f.write(f"**Data**: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"**Total de Questões**: {stats_geral['total_questoes']:,}\n\n")
-        
-        f.write("## 📈 Resumo Geral\n\n")
-        f.write("| Área | Total | Acertos | Erros | Taxa de Acerto |\n")
-        f.write("|------|-------|---------|-------|----------------|\n")
-        
-        for area, stats in sorted(stats_geral['por_area'].items()):
-            f.write(f"| {area} | {stats['total_questoes']} | {stats['acertos']} | {stats['erros']} | {stats['taxa_acerto']:.2f}% |\n")
-        
-        f.write("\n## 📚 Detalhes por Área\n\n")
-        
-        for area, resultados_area in sorted(resultados_por_area.items()):
-            stats = stats_geral['por_area'][area]
-            f.write(f"### {area}\n\n")
-            f.write(f"- **Total de Questões**: {stats['total_questoes']}\n")
-            f.write(f"- **Acertos**: {stats['acertos']}\n")
-            f.write(f"- **Erros**: {stats['erros']}\n")
-            f.write(f"- **Taxa de Acerto**: {stats['taxa_acerto']:.2f}%\n\n")
-            
-            # Top 10 erros mais comuns
-            erros_area = [r for r in resultados_area if r.get('acertou') == False]
-            if erros_area:
-                f.write("#### Questões com Erro (Primeiras 10)\n\n")
-                for i, erro in enumerate(erros_area[:10], 1):
-                    f.write(f"{i}. Questão {erro.get('questao_id', 'N/A')}\n")
-                    f.write(f"   - Gabarito: {erro.get('gabarito', 'N/A')}\n")
-                    f.write(f"   - Resposta do modelo: {erro.get('resposta_modelo', '')[:100]}...\n\n")
-        
-        f.write("\n## 📁 Arquivos Gerados\n\n")
-        f.write("- `relatorio_LINGUAGENS.json` - Dados completos de Linguagens\n")
-        f.write("- `relatorio_HUMANAS.json` - Dados completos de Humanas\n")
-        f.write("- `relatorio_NATUREZA.json` - Dados completos de Natureza\n")
-        f.write("- `relatorio_MATEMATICA.json` - Dados completos de Matemática\n")
-        f.write("- `dados_treinamento_*.json` - Dados formatados para treinamento\n")
-        f.write("- `relatorio_geral.json` - Estatísticas gerais\n")
-    
-    print(f"✅ Relatório Markdown salvo em: {arquivo_md}")
+    return carregar_resultados_journal(arquivo_progresso, questoes, migrar=True)
 
 
 def main():
@@ -368,11 +560,65 @@ def main():
         default=0.5,
         help='Intervalo entre requisições em segundos (padrão: 0.5)'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Número de requisições simultâneas à API (padrão: 1)'
+    )
+    parser.add_argument(
+        '--rps',
+        type=float,
+        default=None,
+        help='Taxa inicial de requisições por segundo (todos os workers); sobe sem 429 e cai a cada 429 (padrão: 1/intervalo)'
+    )
+    parser.add_argument(
+        '--rps-max',
+        type=float,
+        default=None,
+        help='Teto da taxa adaptativa de requisições por segundo (padrão: 4x a taxa inicial)'
+    )
+    parser.add_argument(
+        '--cache',
+        nargs='?',
+        const='cache_respostas.sqlite',
+        default=None,
+        help='Reutiliza respostas armazenadas em cache SQLite (padrão: cache_respostas.sqlite)'
+    )
+    parser.add_argument(
+        '--replay',
+        action='store_true',
+        help='Usa apenas respostas do cache, sem chamar a API (implica --cache)'
+    )
+    parser.add_argument(
+        '--modo',
+        choices=MODOS_RESPOSTA,
+        default='raciocinio',
+        help="Formato da resposta: 'raciocinio' (passo a passo, interrompido após RESPOSTA: X) ou 'letra' (só a letra; reavaliações rápidas)"
+    )
+    parser.add_argument(
+        '--votos',
+        type=int,
+        default=1,
+        help='Amostras por questão; com mais de uma, a resposta é decidida por votação com parada antecipada (padrão: 1)'
+    )
     parser.add_argument(
         '--continuar',
         action='store_true',
         help='Continuar processamento anterior'
     )
+    parser.add_argument(
+        '--shard',
+        type=interpretar_shard,
+        default=None,
+        metavar='i/N',
+        help='Resolver apenas o shard i de N (0 a N-1), com journal próprio; combine os shards depois com --mesclar'
+    )
+    parser.add_argument(
+        '--mesclar',
+        action='store_true',
+        help='Mesclar os journals dos shards e gerar os relatórios, sem chamar a API'
+    )
     
     args = parser.parse_args()
     
@@ -388,19 +634,50 @@ def main():
         print("❌ Nenhuma questão encontrada!")
         return
     
-    # Processar
-    resultados = processar_todas_questoes(
-        questoes,
-        salvar_progresso=True,
-        intervalo_entre_requisicoes=args.intervalo
-    )
+    if args.mesclar:
+        resultados = mesclar_shards(questoes)
+    else:
+        arquivo_progresso = ARQUIVO_PROGRESSO
+        if args.shard is not None:
+            indice, total_shards = args.shard
+            questoes = filtrar_shard(questoes, indice, total_shards)
+            arquivo_progresso = caminho_journal_shard(ARQUIVO_PROGRESSO, indice, total_shards)
+            print(f"🧩 Shard {indice}/{total_shards}: {len(questoes)} questões (journal: {arquivo_progresso})\n")
+        
+        cache = None
+        if args.cache or args.replay:
+            cache = CacheRespostas(args.cache or 'cache_respostas.sqlite', replay=args.replay)
+        
+        # Processar
+        resultados = processar_todas_questoes(
+            questoes,
+            salvar_progresso=True,
+            intervalo_entre_requisicoes=args.intervalo,
+            workers=args.workers,
+            requisicoes_por_segundo=args.rps,
+            requisicoes_por_segundo_max=args.rps_max,
+            cache=cache,
+            modo=args.modo,
+            votos=args.votos,
+            arquivo_progresso=arquivo_progresso
+        )
+        
+        if args.shard is not None and resultados:
+            # Relatórios só com todos os shards (cada shard tem uma parte das questões)
+            print(f"✅ Shard {indice}/{total_shards} concluído: {len(resultados)} questões em {arquivo_progresso}")
+            print("💡 Quando todos os shards terminarem, gere os relatórios com --mesclar")
+            return
     
     if not resultados:
         print("❌ Nenhum resultado gerado!")
         return
     
-    # Gerar relatórios
-    stats = gerar_relatorios_por_area(resultados)
+    # Gerar relatórios (uma passada pelo journal, já com um registro por questão)
+    del resultados
+    stats = gerar_relatorios_do_journal(
+        ARQUIVO_PROGRESSO,
+        {questao.chave: questao for questao in questoes}
+    )
     
     # Resumo final
     print("=" * 80)
@@ -0,0 +1,428 @@
+"""
+Servidor local que imita a API de chat completion da Maritaca
+
+Implementa POST /api/chat/completions com latência, erros, respostas 429 e
+streaming (SSE) configuráveis, para medir o desempenho do pipeline de
+resolução sem chave de API nem rede. As respostas são determinísticas para
+o mesmo prompt.
+
+Uso:
+    python servidor_mock_maritaca.py --porta 8765 --latencia 0.3 --taxa-429 0.05
+    MARITACA_BASE_URL=http://127.0.0.1:8765 MARITACA_API_KEY=chave-de-teste-local python resolver_todas_questoes.py
+
+Ou dentro de um script/benchmark:
+    with ServidorMockMaritaca(latencia=0.05) as servidor:
+        client = MaritacaAPI(api_key=CHAVE_TESTE, base_url=servidor.base_url)
+"""
+
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+CAMINHO = "/api/chat/completions"
+
+# O servidor aceita qualquer chave; esta apenas passa na validação do cliente
+CHAVE_TESTE = "chave-de-teste-local"
+
+# Texto base das respostas simuladas (repetido até atingir o número de tokens)
+TEXTO_RACIOCINIO = (
+    "Analisando o enunciado e as alternativas , identificamos os conceitos "
+    "envolvidos e eliminamos as opções incompatíveis com os dados ."
+).split()
+
+
+def _aplicar_stop(tokens: list, stop) -> list:
+    """Corta os tokens antes da primeira ocorrência de uma sequência de parada."""
+    if not stop:
+        return tokens
+    if isinstance(stop, str):
+        stop = [stop]
+    
+    texto = "".join(tokens)
+    posicoes = [texto.find(sequencia) for sequencia in stop if sequencia and sequencia in texto]
+    if not posicoes:
+        return tokens
+    
+    corte = min(posicoes)
+    cortados = []
+    tamanho = 0
+    for token in tokens:
+        if tamanho + len(token) > corte:
+            if corte > tamanho:
+                cortados.append(token[:corte - tamanho])
+            break
+        cortados.append(token)
+        tamanho += len(token)
+    return cortados
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Atende as requisições do servidor mock."""
+    
+    protocol_version = "HTTP/1.1"
+    # Cabeçalhos e corpo saem em escritas separadas; sem isso o Nagle +
+    # ACK atrasado somam ~40 ms a cada resposta
+    disable_nagle_algorithm = True
+    
+    def log_message(self, format, *args):
+        if self.server.mock.verbose:
+            super().log_message(format, *args)
+    
+    def _responder_json(self, status: int, corpo: Dict, cabecalhos: Optional[Dict] = None):
+        dados = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+    
+    def _enviar_chunk(self, dados: bytes):
+        self.wfile.write(f"{len(dados):x}\r\n".encode("ascii") + dados + b"\r\n")
+        self.wfile.flush()
+    
+    def do_POST(self):
+        mock = self.server.mock
+        tamanho = int(self.headers.get("Content-Length", 0))
+        corpo = self.rfile.read(tamanho)
+        
+        if self.path.rstrip("/") != CAMINHO:
+            self._responder_json(404, {"detail": "Not Found"})
+            return
+        
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            self._responder_json(401, {"detail": "Missing API key"})
+            return
+        
+        try:
+            payload = json.loads(corpo)
+        except json.JSONDecodeError:
+            self._responder_json(400, {"detail": "Invalid JSON"})
+            return
+        
+        # Falhas simuladas
+        falha = mock._sortear_falha()
+        if falha == 429:
+            self._responder_json(
+                429,
+                {"detail": "Rate limit exceeded"},
+                {"Retry-After": f"{mock.retry_after:g}"}
+            )
+            return
+        
+        time.sleep(mock._sortear_latencia())
+        
+        if falha == 500:
+            self._responder_json(500, {"detail": "Internal Server Error"})
+            return
+        
+        tokens = mock.gerar_tokens(payload)
+        if payload.get("stream"):
+            self._responder_stream(payload, tokens)
+        else:
+            self._responder_json(200, mock.montar_resposta(payload, tokens))
+    
+    def _responder_stream(self, payload: Dict, tokens: list):
+        """Envia a resposta em Server-Sent Events, um token por evento."""
+        mock = self.server.mock
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        
+        try:
+            for token in tokens:
+                evento = {
+                    "id": "mock",
+                    "object": "chat.completion.chunk",
+                    "model": payload.get("model", ""),
+                    "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+                }
+                self._enviar_chunk(f"data: {json.dumps(evento, ensure_ascii=False)}\n\n".encode("utf-8"))
+                if mock.atraso_token:
+                    time.sleep(mock.atraso_token)
+            
+            final = {
+                "id": "mock",
+                "object": "chat.completion.chunk",
+                "model": payload.get("model", ""),
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+            }
+            self._enviar_chunk(f"data: {json.dumps(final)}\n\n".encode("utf-8"))
+            self._enviar_chunk(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Cliente cancelou a geração
+            mock._registrar("cancelamentos")
+            self.close_connection = True
+
+
+class _Servidor(ThreadingHTTPServer):
+    request_queue_size = 512
+    daemon_threads = True
+    
+    def handle_error(self, request, client_address):
+        # Conexões encerradas pelo cliente (stream cancelado, keep-alive
+        # descartado) são esperadas e não merecem traceback
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class ServidorMockMaritaca:
+    """Servidor HTTP local compatível com /api/chat/completions."""
+    
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        porta: int = 0,
+        latencia: float = 0.2,
+        dispersao: float = 0.3,
+        taxa_erro: float = 0.0,
+        taxa_429: float = 0.0,
+        limite_rps: Optional[float] = None,
+        retry_after: float = 1.0,
+        tokens_resposta: int = 60,
+        atraso_token: float = 0.0,
+        concordancia: float = 1.0,
+        seed: Optional[int] = None,
+        verbose: bool = False
+    ):
+        """
+        Configura o servidor (use `iniciar()` ou o context manager para subir).
+        
+        Args:
+            host: Endereço de escuta
+            porta: Porta de escuta (0 escolhe uma porta livre)
+            latencia: Latência mediana de cada resposta, em segundos
+            dispersao: Desvio padrão do log da latência (distribuição
+                log-normal; 0 para latência fixa)
+            taxa_erro: Fração das requisições respondidas com 500
+            taxa_429: Fração das requisições respondidas com 429
+            limite_rps: Limite real de requisições por segundo; o excesso
+                recebe 429 com Retry-After
+            retry_after: Valor do cabeçalho Retry-After, em segundos
+            tokens_resposta: Número de tokens de cada resposta (limitado
+                pelo max_tokens da requisição)
+            atraso_token: Intervalo entre tokens no modo streaming, em segundos
+            concordancia: Probabilidade de uma requisição com temperature > 0
+                receber a alternativa preferida do prompt; nas demais a
+                alternativa é sorteada (simula amostras divergentes)
+            seed: Semente das falhas e latências sorteadas
+            verbose: Registra cada requisição no terminal
+        """
+        self.host = host
+        self.porta = porta
+        self.latencia = latencia
+        self.dispersao = dispersao
+        self.taxa_erro = taxa_erro
+        self.taxa_429 = taxa_429
+        self.limite_rps = limite_rps
+        self.retry_after = retry_after
+        self.tokens_resposta = tokens_resposta
+        self.atraso_token = atraso_token
+        self.concordancia = concordancia
+        self.verbose = verbose
+        
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._contadores = {"requisicoes": 0, "sucessos": 0, "erros_500": 0, "respostas_429": 0, "cancelamentos": 0}
+        self._janela_inicio = time.monotonic()
+        self._janela_contagem = 0
+        self._servidor = None
+        self._thread = None
+    
+    @property
+    def base_url(self) -> str:
+        """Endereço para `MaritacaAPI(base_url=...)` ou MARITACA_BASE_URL."""
+        return f"http://{self.host}:{self.porta}"
+    
+    def _registrar(self, contador: str):
+        with self._lock:
+            self._contadores[contador] += 1
+    
+    def _sortear_falha(self) -> Optional[int]:
+        """Decide se a requisição atual falha (429, 500) ou segue (None)."""
+        with self._lock:
+            self._contadores["requisicoes"] += 1
+            
+            if self.limite_rps:
+                agora = time.monotonic()
+                if agora - self._janela_inicio >= 1.0:
+                    self._janela_inicio = agora
+                    self._janela_contagem = 0
+                self._janela_contagem += 1
+                if self._janela_contagem > self.limite_rps:
+                    self._contadores["respostas_429"] += 1
+                    return 429
+            
+            sorteio = self._rng.random()
+            if sorteio < self.taxa_429:
+                self._contadores["respostas_429"] += 1
+                return 429
+            if sorteio < self.taxa_429 + self.taxa_erro:
+                self._contadores["erros_500"] += 1
+                return 500
+            
+            self._contadores["sucessos"] += 1
+            return None
+    
+    def _sortear_latencia(self) -> float:
+        with self._lock:
+            if self.dispersao <= 0:
+                return self.latencia
+            return self.latencia * self._rng.lognormvariate(0.0, self.dispersao)
+    
+    def gerar_tokens(self, payload: Dict) -> list:
+        """
+        Gera a resposta simulada de um payload, já dividida em tokens.
+        
+        A resposta tem raciocínio, a linha final `RESPOSTA: X` e um
+        comentário posterior (para simular tokens gastos depois da resposta).
+        A alternativa é derivada do hash das mensagens, então o mesmo prompt
+        sempre recebe a mesma resposta (exceto com `concordancia` < 1 e
+        temperature > 0). Com max_tokens pequeno, a linha da
+        resposta é preservada; sequências `stop` cortam o texto.
+        """
+        mensagens = json.dumps(payload.get("messages", []), sort_keys=True, ensure_ascii=False)
+        digest = hashlib.sha256(mensagens.encode("utf-8")).digest()
+        letra = "ABCDE"[digest[0] % 5]
+        if self.concordancia < 1.0 and payload.get("temperature"):
+            with self._lock:
+                if self._rng.random() >= self.concordancia:
+                    letra = self._rng.choice("ABCDE")
+        
+        limite = min(self.tokens_resposta, int(payload.get("max_tokens") or self.tokens_resposta))
+        final = [" Portanto", ",", " a", " alternativa", " correta", " é", f" {letra}", ".", "\nRESPOSTA:", f" {letra}"]
+        
+        if limite <= len(final):
+            tokens = final[-limite:] if limite > 0 else []
+        else:
+            livres = limite - len(final)
+            antes = [TEXTO_RACIOCINIO[i % len(TEXTO_RACIOCINIO)] for i in range(livres - livres // 2)]
+            depois = ["\n\nObservação:"] + [TEXTO_RACIOCINIO[i % len(TEXTO_RACIOCINIO)] for i in range(livres // 2 - 1)]
+            tokens = antes + final + (depois if livres // 2 else [])
+        
+        tokens = [token if token[0] in ",.\n " else " " + token for token in tokens]
+        if tokens:
+            tokens[0] = tokens[0].lstrip()
+        
+        return _aplicar_stop(tokens, payload.get("stop"))
+    
+    def montar_resposta(self, payload: Dict, tokens: list) -> Dict:
+        """Monta o corpo JSON de uma resposta sem streaming."""
+        conteudo = "".join(tokens)
+        tokens_prompt = sum(len(str(m.get("content", "")).split()) for m in payload.get("messages", []))
+        return {
+            "id": "mock",
+            "object": "chat.completion",
+            "model": payload.get("model", ""),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": conteudo},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": tokens_prompt,
+                "completion_tokens": len(tokens),
+                "total_tokens": tokens_prompt + len(tokens)
+            }
+        }
+    
+    def estatisticas(self) -> Dict:
+        """Retorna os contadores de requisições atendidas."""
+        with self._lock:
+            return dict(self._contadores)
+    
+    def iniciar(self) -> "ServidorMockMaritaca":
+        """Sobe o servidor em uma thread em segundo plano."""
+        self._servidor = _Servidor((self.host, self.porta), _Handler)
+        self._servidor.mock = self
+        self.porta = self._servidor.server_address[1]
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def parar(self):
+        """Derruba o servidor."""
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+    
+    def servir(self):
+        """Sobe o servidor e bloqueia até Ctrl+C."""
+        self._servidor = _Servidor((self.host, self.porta), _Handler)
+        self._servidor.mock = self
+        self.porta = self._servidor.server_address[1]
+        try:
+            self._servidor.serve_forever()
+        finally:
+            self._servidor.server_close()
+            self._servidor = None
+    
+    def __enter__(self):
+        return self.iniciar()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.parar()
+
+
+def main():
+    """Função principal."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Servidor local que imita a API da Maritaca')
+    parser.add_argument('--host', default='127.0.0.1', help='Endereço de escuta (padrão: 127.0.0.1)')
+    parser.add_argument('--porta', type=int, default=8765, help='Porta de escuta (padrão: 8765)')
+    parser.add_argument('--latencia', type=float, default=0.2, help='Latência mediana em segundos (padrão: 0.2)')
+    parser.add_argument('--dispersao', type=float, default=0.3, help='Dispersão log-normal da latência (padrão: 0.3)')
+    parser.add_argument('--taxa-erro', type=float, default=0.0, help='Fração de respostas 500 (padrão: 0)')
+    parser.add_argument('--taxa-429', type=float, default=0.0, help='Fração de respostas 429 (padrão: 0)')
+    parser.add_argument('--limite-rps', type=float, default=None, help='Limite real de requisições por segundo')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Cabeçalho Retry-After das respostas 429 (padrão: 1)')
+    parser.add_argument('--tokens', type=int, default=60, help='Tokens por resposta (padrão: 60)')
+    parser.add_argument('--atraso-token', type=float, default=0.0, help='Intervalo entre tokens no streaming (padrão: 0)')
+    parser.add_argument('--concordancia', type=float, default=1.0, help='Probabilidade de repetir a alternativa preferida do prompt (padrão: 1)')
+    parser.add_argument('--seed', type=int, default=None, help='Semente das falhas e latências')
+    parser.add_argument('--verbose', action='store_true', help='Registra cada requisição')
+    
+    args = parser.parse_args()
+    
+    servidor = ServidorMockMaritaca(
+        host=args.host,
+        porta=args.porta,
+        latencia=args.latencia,
+        dispersao=args.dispersao,
+        taxa_erro=args.taxa_erro,
+        taxa_429=args.taxa_429,
+        limite_rps=args.limite_rps,
+        retry_after=args.retry_after,
+        tokens_resposta=args.tokens,
+        atraso_token=args.atraso_token,
+        concordancia=args.concordancia,
+        seed=args.seed,
+        verbose=args.verbose
+    )
+    
+    print(f"🧪 Servidor mock da Maritaca em {servidor.base_url}{CAMINHO}")
+    print(f"   Use: MARITACA_BASE_URL={servidor.base_url} MARITACA_API_KEY={CHAVE_TESTE}")
+    print("   Ctrl+C para encerrar\n")
+    
+    try:
+        servidor.servir()
+    except KeyboardInterrupt:
+        print("\n📊 Estatísticas:", json.dumps(servidor.estatisticas()))
+
+
+if __name__ == "__main__":
+    main()
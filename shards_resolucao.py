@@ -0,0 +1,114 @@
+"""
+Divisão de uma resolução completa em shards independentes
+
+Com `--shard i/N`, cada processo (ou máquina) resolve apenas as questões
+cujo hash estável da chave cai no shard `i` (de 0 a N-1) e grava o próprio
+journal (`progresso_resolucao.shard-i-de-N.jsonl`). Não há coordenação
+entre os shards: a partição depende só da chave da questão. Ao final, os
+journals são mesclados e os relatórios gerados a partir do resultado:
+
+    python resolver_todas_questoes.py --shard 0/4   # em cada máquina: 0/4 ... 3/4
+    python resolver_todas_questoes.py --mesclar     # journals copiados para a pasta
+"""
+
+import hashlib
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from journal_resultados import chave_resultado, gravar_journal, ler_journal
+
+
+def interpretar_shard(texto: str) -> Tuple[int, int]:
+    """
+    Interpreta a especificação de shard "i/N".
+    
+    Args:
+        texto: Ex.: "0/4" (primeiro de quatro shards)
+    
+    Returns:
+        (índice, total de shards)
+    
+    Raises:
+        ValueError: Se o formato for inválido ou o índice estiver fora de 0..N-1
+    """
+    encontrado = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", str(texto))
+    if not encontrado:
+        raise ValueError(f"Shard inválido: {texto!r} (use i/N, ex.: 0/4)")
+    
+    indice, total = int(encontrado.group(1)), int(encontrado.group(2))
+    if total < 1 or not 0 <= indice < total:
+        raise ValueError(f"Shard inválido: {texto!r} (o índice vai de 0 a N-1)")
+    return indice, total
+
+
+def shard_da_chave(chave: str, total: int) -> int:
+    """
+    Shard de uma questão (`Questao.chave`), estável entre processos, máquinas
+    e versões do Python.
+    
+    `hash()` não serve: é aleatorizado a cada processo.
+    """
+    resumo = hashlib.sha1(chave.encode('utf-8')).digest()
+    return int.from_bytes(resumo[:8], 'big') % total
+
+
+def filtrar_shard(questoes: Iterable, indice: int, total: int) -> List:
+    """Questões (`Questao`) do shard `indice`, na ordem original."""
+    return [
+        questao for questao in questoes
+        if shard_da_chave(questao.chave, total) == indice
+    ]
+
+
+def caminho_journal_shard(caminho: str, indice: int, total: int) -> Path:
+    """Journal do shard: progresso_resolucao.jsonl -> progresso_resolucao.shard-0-de-4.jsonl."""
+    caminho = Path(caminho)
+    return caminho.with_name(f"{caminho.stem}.shard-{indice}-de-{total}{caminho.suffix}")
+
+
+def encontrar_journals_shard(caminho: str) -> Dict[int, Dict[int, Path]]:
+    """
+    Procura os journals de shard ao lado de `caminho`.
+    
+    Returns:
+        {total de shards: {índice: journal}}, com os índices em ordem
+    """
+    caminho = Path(caminho)
+    padrao = re.compile(re.escape(caminho.stem) + r"\.shard-(\d+)-de-(\d+)" + re.escape(caminho.suffix) + "$")
+    
+    encontrados = {}
+    for arquivo in caminho.parent.glob(f"{caminho.stem}.shard-*{caminho.suffix}"):
+        partes = padrao.match(arquivo.name)
+        if partes:
+            indice, total = int(partes.group(1)), int(partes.group(2))
+            encontrados.setdefault(total, {})[indice] = arquivo
+    
+    return {total: dict(sorted(arquivos.items())) for total, arquivos in sorted(encontrados.items())}
+
+
+def mesclar_journals(caminhos: Iterable[str], destino: str) -> Dict[str, int]:
+    """
+    Combina vários journals em um só, com um registro por questão.
+    
+    Se uma questão aparece em mais de um journal, vale o último registro na
+    ordem de `caminhos`. O destino é escrito em um arquivo temporário e
+    substituído de forma atômica, então pode estar entre os `caminhos`.
+    
+    Args:
+        caminhos: Journals de entrada
+        destino: Journal mesclado
+    
+    Returns:
+        Contagens: journals, registros lidos e questões no destino
+    """
+    registros = {}
+    estatisticas = {"journals": 0, "registros": 0, "questoes": 0}
+    for caminho in caminhos:
+        estatisticas["journals"] += 1
+        for registro in ler_journal(caminho):
+            estatisticas["registros"] += 1
+            registros[chave_resultado(registro)] = registro
+    
+    estatisticas["questoes"] = gravar_journal(destino, registros.values())
+    return estatisticas
@@ -2,77 +2,135 @@
 Script de teste do modelo sabia-7b-enem-finetuned
 
 Testa o modelo com questões e exemplos relacionados ao ENEM.
+
+torch, transformers e peft são importados apenas nas funções que os usam:
+importar este módulo (ex.: `find_base_model` em outros scripts) é instantâneo.
 """
 
-import torch
+import math
+import os
 import sys
+import time
+import argparse
+from collections import Counter
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
-try:
-    from transformers import AutoModelForCausalLM, AutoTokenizer
-    from peft import PeftModel
-except ImportError as e:
-    print(f"❌ Erro ao importar dependências: {e}")
-    print("Instale as dependências com: pip install -r requirements.txt")
-    sys.exit(1)
-
-
-def find_base_model():
-    """Tenta encontrar o modelo base em diferentes locais."""
-    possible_paths = [
-        "sabia-7b",  # Nome do modelo no Hugging Face
-        "./sabia-7b",
-        "/content/drive/MyDrive/modelos/sabia-7b",  # Caminho original do Colab
-        "~/models/sabia-7b",
-    ]
+
+# Nome do modelo base no Hugging Face
+BASE_MODEL_NAME = "sabia-7b"
+
+BASE_MODEL_PATHS = [
+    "./sabia-7b",
+    "/content/drive/MyDrive/modelos/sabia-7b",  # Caminho original do Colab
+    "~/models/sabia-7b",
+]
+
+# Variáveis que impedem transformers/huggingface_hub de acessar a rede
+OFFLINE_ENV_VARS = ("HF_HUB_OFFLINE", "TRANSFORMERS_OFFLINE")
+
+
+def enable_offline_mode():
+    """Impede acessos ao Hugging Face Hub (vale para os imports feitos depois)."""
+    for variavel in OFFLINE_ENV_VARS:
+        os.environ[variavel] = "1"
+
+
+def is_offline() -> bool:
+    """Indica se o modo offline foi ativado (`enable_offline_mode` ou ambiente)."""
+    return any(os.environ.get(variavel, "").lower() in ("1", "true", "yes") for variavel in OFFLINE_ENV_VARS)
+
+
+def find_base_model(offline: Optional[bool] = None):
+    """
+    Tenta encontrar o modelo base, dos locais mais baratos para os mais caros.
     
-    # Verificar se é um nome do Hugging Face
-    try:
-        from transformers import AutoConfig
-        config = AutoConfig.from_pretrained("sabia-7b", trust_remote_code=True)
-        print("✅ Modelo 'sabia-7b' encontrado no Hugging Face")
-        return "sabia-7b"
-    except:
-        pass
+    Ordem: pastas locais, cache local do Hugging Face e, só fora do modo
+    offline, o Hugging Face Hub (que sem rede espera o timeout da conexão).
+    
+    Args:
+        offline: Não consultar o Hub (padrão: `is_offline()`)
+    
+    Returns:
+        Caminho local ou nome do modelo, ou None se não encontrado
+    """
+    if offline is None:
+        offline = is_offline()
     
     # Verificar caminhos locais
-    for path in possible_paths:
+    for path in BASE_MODEL_PATHS:
         expanded_path = Path(path).expanduser()
         if expanded_path.exists() and expanded_path.is_dir():
             print(f"✅ Modelo encontrado em: {expanded_path}")
             return str(expanded_path)
     
+    # Verificar o cache local do Hugging Face (sem rede)
+    try:
+        from huggingface_hub import try_to_load_from_cache
+        if isinstance(try_to_load_from_cache(BASE_MODEL_NAME, "config.json"), str):
+            print(f"✅ Modelo '{BASE_MODEL_NAME}' encontrado no cache do Hugging Face")
+            return BASE_MODEL_NAME
+    except Exception:
+        pass
+    
+    if offline:
+        return None
+    
+    # Verificar se é um nome do Hugging Face
+    try:
+        from transformers import AutoConfig
+        AutoConfig.from_pretrained(BASE_MODEL_NAME, trust_remote_code=True)
+        print(f"✅ Modelo '{BASE_MODEL_NAME}' encontrado no Hugging Face")
+        return BASE_MODEL_NAME
+    except Exception:
+        pass
+    
     return None
 
 
+def load_base_model(base_model_path: str):
+    """Carrega tokenizer e modelo base (sem adapter)."""
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+    
+    print(f"📥 Carregando tokenizer de: {base_model_path}")
+    tokenizer = AutoTokenizer.from_pretrained(
+        base_model_path,
+        trust_remote_code=True
+    )
+    
+    # Configurar pad_token se não existir
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+        print("   ⚠️  pad_token configurado como eos_token")
+    
+    # Padding à esquerda: em lote, todos os prompts terminam na mesma
+    # posição e os tokens gerados começam logo depois
+    tokenizer.padding_side = "left"
+    
+    print(f"📥 Carregando modelo base: {base_model_path}")
+    print("   ⏳ Isso pode levar alguns minutos...")
+    
+    model = AutoModelForCausalLM.from_pretrained(
+        base_model_path,
+        torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
+        device_map="auto",
+        trust_remote_code=True,
+        low_cpu_mem_usage=True
+    )
+    return model, tokenizer
+
+
 def load_model_safe(base_model_path: str, adapter_path: str):
     """Carrega o modelo com tratamento de erros."""
+    from peft import PeftModel
+    
     print(f"\n{'='*80}")
     print("🔧 CARREGANDO MODELO")
     print(f"{'='*80}\n")
     
     try:
-        print(f"📥 Carregando tokenizer de: {base_model_path}")
-        tokenizer = AutoTokenizer.from_pretrained(
-            base_model_path,
-            trust_remote_code=True
-        )
-        
-        # Configurar pad_token se não existir
-        if tokenizer.pad_token is None:
-            tokenizer.pad_token = tokenizer.eos_token
-            print("   ⚠️  pad_token configurado como eos_token")
-        
-        print(f"📥 Carregando modelo base: {base_model_path}")
-        print("   ⏳ Isso pode levar alguns minutos...")
-        
-        model = AutoModelForCausalLM.from_pretrained(
-            base_model_path,
-            torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
-            device_map="auto",
-            trust_remote_code=True,
-            low_cpu_mem_usage=True
-        )
+        model, tokenizer = load_base_model(base_model_path)
         
         print(f"📥 Carregando adapter LoRA de: {adapter_path}")
         model = PeftModel.from_pretrained(model, adapter_path)
@@ -80,37 +138,326 @@ def load_model_safe(base_model_path: str, adapter_path: str):
         
         print("✅ Modelo carregado com sucesso!\n")
         return model, tokenizer
-        
+    
     except Exception as e:
         print(f"❌ Erro ao carregar modelo: {e}")
         raise
 
 
+# Memória reservada para o cache de atenção (chaves/valores) de cada lote
+MEMORIA_LOTE_MB = 2048
+MAX_LOTE = 16
+
+
+def _kv_bytes_per_token(model) -> int:
+    """Estima a memória do cache de atenção (chaves e valores) por token."""
+    import torch
+    
+    config = model.config
+    cabecas = getattr(config, "num_attention_heads", 32)
+    cabecas_kv = getattr(config, "num_key_value_heads", None) or cabecas
+    dim_cabeca = getattr(config, "head_dim", None) or config.hidden_size // cabecas
+    bytes_elemento = torch.finfo(model.dtype).bits // 8
+    return 2 * config.num_hidden_layers * cabecas_kv * dim_cabeca * bytes_elemento
+
+
+def _make_batches(lengths: List[int], max_new_tokens: int, token_budget: int, max_batch_size: int) -> List[List[int]]:
+    """
+    Agrupa os prompts em lotes de comprimentos parecidos.
+    
+    Os índices são ordenados do maior para o menor prompt (menos padding
+    por lote, e o lote mais pesado roda primeiro). Um lote cresce enquanto
+    tamanho x (maior prompt + max_new_tokens) couber em `token_budget`.
+    """
+    ordem = sorted(range(len(lengths)), key=lengths.__getitem__, reverse=True)
+    
+    lotes = []
+    atual = []
+    maior = 0
+    for i in ordem:
+        maior_com_i = max(maior, lengths[i] + max_new_tokens)
+        if atual and (len(atual) >= max_batch_size or (len(atual) + 1) * maior_com_i > token_budget):
+            lotes.append(atual)
+            atual = []
+            maior_com_i = lengths[i] + max_new_tokens
+        atual.append(i)
+        maior = maior_com_i
+    
+    if atual:
+        lotes.append(atual)
+    return lotes
+
+
+def _prefix_batches(prefixos: List[Tuple[int, ...]], suffix_lengths: List[int], max_new_tokens: int,
+                    token_budget: int, max_batch_size: int) -> List[Tuple[Tuple[int, ...], List[int]]]:
+    """
+    Agrupa os prompts pelo prefixo e divide cada grupo em lotes.
+    
+    O estado do prefixo é replicado em cada linha do lote, então cada linha
+    ocupa prefixo + sufixo + tokens gerados no orçamento de `_make_batches`.
+    
+    Returns:
+        [(prefixo, índices do lote), ...], na ordem da primeira ocorrência
+        de cada prefixo
+    """
+    grupos = {}
+    for i, prefixo in enumerate(prefixos):
+        grupos.setdefault(prefixo, []).append(i)
+    
+    lotes = []
+    for prefixo, indices in grupos.items():
+        tamanhos = [suffix_lengths[i] for i in indices]
+        for lote in _make_batches(tamanhos, len(prefixo) + max_new_tokens, token_budget, max_batch_size):
+            lotes.append((prefixo, [indices[j] for j in lote]))
+    return lotes
+
+
+def _left_pad(sequencias: List[List[int]], pad_id: int) -> Tuple[List[List[int]], List[List[int]]]:
+    """Completa as sequências à esquerda com `pad_id`; retorna (ids, máscara de atenção)."""
+    maior = max(len(sequencia) for sequencia in sequencias)
+    ids = [[pad_id] * (maior - len(sequencia)) + list(sequencia) for sequencia in sequencias]
+    mascara = [[0] * (maior - len(sequencia)) + [1] * len(sequencia) for sequencia in sequencias]
+    return ids, mascara
+
+
+def _split_prompt(tokenizer, prompt: str, prefix: str):
+    """Tokeniza o prompt e separa os ids do prefixo (ver `dividir_prefixo`)."""
+    from cache_prefixos import dividir_prefixo
+    
+    ids = tokenizer(prompt, truncation=True)["input_ids"]
+    prefixo, _ = dividir_prefixo(ids, tokenizer(prefix)["input_ids"])
+    return ids, prefixo
+
+
+def _split_prompts(tokenizer, prompts: List[str], prefixes: List[str]):
+    """Prefixos (tuplas de ids) e sufixos (listas de ids) de cada prompt (ver `_shared_prefixes`)."""
+    divididos = [_split_prompt(tokenizer, prompt, prefix) for prompt, prefix in zip(prompts, prefixes)]
+    return _shared_prefixes([ids for ids, _ in divididos], [prefixo for _, prefixo in divididos])
+
+
+def _shared_prefixes(ids: List[List[int]], prefixos: List[Tuple[int, ...]]):
+    """
+    Separa prefixo e sufixo apenas dos prompts cujo prefixo se repete.
+    
+    Um prefixo usado por um único prompt não é reaproveitado e formaria um
+    lote de uma linha; esses prompts ficam sem prefixo (prompt inteiro no
+    sufixo) e são agrupados entre si, como sem o cache.
+    
+    Returns:
+        (prefixos, sufixos)
+    """
+    usos = Counter(prefixos)
+    prefixos = [prefixo if usos[prefixo] > 1 else () for prefixo in prefixos]
+    return prefixos, [list(linha[len(prefixo):]) for linha, prefixo in zip(ids, prefixos)]
+
+
+def _prefixed_batch(model, tokenizer, prefix_cache, prefixo: Tuple[int, ...], sufixos: List[List[int]]):
+    """
+    Monta as entradas de um lote de sufixos com o mesmo prefixo.
+    
+    Cada sufixo recebe padding à esquerda, entre o prefixo e o seu texto. As
+    posições seguem a máscara de atenção, então o padding não desloca os
+    sufixos. O estado do prefixo é copiado do `prefix_cache` e replicado
+    para cada linha do lote; o estado guardado não é alterado.
+    
+    Returns:
+        (input_ids do prompt inteiro, attention_mask, position_ids, estado
+        do prefixo ou None se não houver prefixo)
+    """
+    import copy
+    import torch
+    
+    pad_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+    ids, mascara = _left_pad(sufixos, pad_id)
+    
+    input_ids = torch.tensor([list(prefixo) + linha for linha in ids], device=model.device)
+    attention_mask = torch.tensor([[1] * len(prefixo) + linha for linha in mascara], dtype=torch.long, device=model.device)
+    position_ids = (attention_mask.cumsum(-1) - 1).clamp(min=0)
+    
+    estado = None
+    if prefixo:
+        estado = copy.deepcopy(prefix_cache.obter(model, prefixo, usos=len(sufixos)))
+        if len(sufixos) > 1:
+            estado.batch_repeat_interleave(len(sufixos))
+    return input_ids, attention_mask, position_ids, estado
+
+
+def _generate_with_prefixes(model, tokenizer, prompts: List[str], prefixes: List[str], prefix_cache,
+                            max_new_tokens: int, sampling: Dict, token_budget: int, max_batch_size: int) -> List[str]:
+    """Gera em lotes de prompts com o mesmo prefixo, reaproveitando o estado de atenção dele."""
+    import torch
+    
+    prefixos, sufixos = _split_prompts(tokenizer, prompts, prefixes)
+    lotes = _prefix_batches(prefixos, [len(sufixo) for sufixo in sufixos], max_new_tokens, token_budget, max_batch_size)
+    
+    responses = [None] * len(prompts)
+    for prefixo, lote in lotes:
+        input_ids, attention_mask, _, estado = _prefixed_batch(
+            model, tokenizer, prefix_cache, prefixo, [sufixos[i] for i in lote]
+        )
+        kwargs = {"past_key_values": estado} if estado is not None else {}
+        with torch.no_grad():
+            outputs = model.generate(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                max_new_tokens=max_new_tokens,
+                pad_token_id=tokenizer.pad_token_id,
+                eos_token_id=tokenizer.eos_token_id,
+                repetition_penalty=1.1,
+                **sampling,
+                **kwargs
+            )
+        
+        novos = outputs[:, input_ids.shape[1]:]
+        for i, texto in zip(lote, tokenizer.batch_decode(novos, skip_special_tokens=True)):
+            responses[i] = texto.strip()
+    
+    return responses
+
+
+def generate_batch(model, tokenizer, prompts: List[str], max_new_tokens: int = 256,
+                   temperature: float = 0.7, top_p: float = 0.9,
+                   memory_budget_mb: float = MEMORIA_LOTE_MB, max_batch_size: int = MAX_LOTE,
+                   prefix_cache=None, prefixes: Optional[List[str]] = None) -> List[str]:
+    """
+    Gera respostas para vários prompts, em lotes.
+    
+    Os prompts são agrupados por comprimento e cada lote é dimensionado para
+    que o cache de atenção caiba em `memory_budget_mb`; com padding à
+    esquerda, cada lote é uma única chamada a `model.generate`.
+    
+    Args:
+        model: Modelo (PEFT) carregado por `load_model_safe`
+        tokenizer: Tokenizer do modelo
+        prompts: Prompts a responder
+        max_new_tokens: Tokens gerados por resposta
+        temperature: Temperatura para sampling (0 = decodificação gulosa)
+        top_p: Nucleus sampling parameter
+        memory_budget_mb: Memória máxima do cache de atenção por lote
+        max_batch_size: Número máximo de prompts por lote
+        prefix_cache: `CachePrefixos` opcional. Se informado, os lotes reúnem
+            prompts com o mesmo prefixo e o estado de atenção de
+            `prefixes[i]` é calculado uma vez e replicado no lote
+        prefixes: Texto inicial de cada prompt (obrigatório com `prefix_cache`)
+    
+    Returns:
+        Respostas (sem o prompt), na ordem dos prompts
+    """
+    if not prompts:
+        return []
+    
+    import torch
+    
+    sampling = {"do_sample": False}
+    if temperature > 0:
+        sampling = {"do_sample": True, "temperature": temperature, "top_p": top_p}
+    
+    token_budget = max(1, int(memory_budget_mb * 1024 * 1024) // _kv_bytes_per_token(model))
+    
+    if prefix_cache is not None:
+        if prefixes is None:
+            raise ValueError("prefixes é obrigatório quando prefix_cache é informado")
+        return _generate_with_prefixes(
+            model, tokenizer, prompts, prefixes, prefix_cache, max_new_tokens, sampling, token_budget, max_batch_size
+        )
+    
+    tokenizer.padding_side = "left"
+    lengths = [len(ids) for ids in tokenizer(prompts, truncation=True)["input_ids"]]
+    
+    responses = [None] * len(prompts)
+    for batch in _make_batches(lengths, max_new_tokens, token_budget, max_batch_size):
+        inputs = tokenizer([prompts[i] for i in batch], return_tensors="pt", padding=True, truncation=True)
+        inputs = {k: v.to(model.device) for k, v in inputs.items()}
+        
+        with torch.no_grad():
+            outputs = model.generate(
+                **inputs,
+                max_new_tokens=max_new_tokens,
+                pad_token_id=tokenizer.pad_token_id,
+                eos_token_id=tokenizer.eos_token_id,
+                repetition_penalty=1.1,
+                **sampling
+            )
+        
+        # Com padding à esquerda, a resposta começa no fim da entrada
+        novos = outputs[:, inputs["input_ids"].shape[1]:]
+        for i, texto in zip(batch, tokenizer.batch_decode(novos, skip_special_tokens=True)):
+            responses[i] = texto.strip()
+    
+    return responses
+
+
 def generate_response(model, tokenizer, prompt: str, max_new_tokens: int = 256, 
                      temperature: float = 0.7, top_p: float = 0.9):
     """Gera resposta do modelo."""
-    inputs = tokenizer(prompt, return_tensors="pt", padding=True, truncation=True)
-    inputs = {k: v.to(model.device) for k, v in inputs.items()}
-    
-    with torch.no_grad():
-        outputs = model.generate(
-            **inputs,
-            max_new_tokens=max_new_tokens,
-            temperature=temperature,
-            top_p=top_p,
-            do_sample=True,
-            pad_token_id=tokenizer.pad_token_id,
-            eos_token_id=tokenizer.eos_token_id,
-            repetition_penalty=1.1
-        )
+    return generate_batch(
+        model,
+        tokenizer,
+        [prompt],
+        max_new_tokens=max_new_tokens,
+        temperature=temperature,
+        top_p=top_p
+    )[0]
+
+
+def evaluate_questions(model, tokenizer, questoes: List, max_new_tokens: int = 256,
+                       temperature: float = 0.0, memory_budget_mb: float = MEMORIA_LOTE_MB,
+                       max_batch_size: int = MAX_LOTE, prefix_cache=None) -> List[Dict]:
+    """
+    Resolve questões do ENEM com o modelo local, em lotes.
     
-    response = tokenizer.decode(outputs[0], skip_special_tokens=True)
+    Args:
+        model: Modelo (PEFT) carregado por `load_model_safe`
+        tokenizer: Tokenizer do modelo
+        questoes: Questões (dicionários ou `Questao`)
+        max_new_tokens: Tokens gerados por questão
+        temperature: Temperatura (padrão: 0, decodificação gulosa e determinística)
+        memory_budget_mb: Memória máxima do cache de atenção por lote
+        max_batch_size: Número máximo de questões por lote
+        prefix_cache: `CachePrefixos` opcional para reaproveitar cabeçalho e
+            contexto entre questões (ver `generate_batch`)
     
-    # Remover prompt da resposta
-    if response.startswith(prompt):
-        response = response[len(prompt):].strip()
+    Returns:
+        Resultados no formato de `resolver_todas_questoes.resolver_questao`
+    """
+    from extrator_respostas import corrigir
+    from questao_enem import normalizar_questoes
+    from questao_enem import formatar_prefixo_prompt, formatar_questao_para_prompt
     
-    return response
+    questoes = normalizar_questoes(questoes)
+    formatadas = [formatar_questao_para_prompt(questao) for questao in questoes]
+    
+    respostas = generate_batch(
+        model,
+        tokenizer,
+        [prompt for prompt, _, _ in formatadas],
+        max_new_tokens=max_new_tokens,
+        temperature=temperature,
+        memory_budget_mb=memory_budget_mb,
+        max_batch_size=max_batch_size,
+        prefix_cache=prefix_cache,
+        prefixes=[formatar_prefixo_prompt(questao) for questao in questoes] if prefix_cache is not None else None
+    )
+    
+    resultados = []
+    for questao, (prompt, gabarito, area), resposta in zip(questoes, formatadas, respostas):
+        acertou, letra, confianca = corrigir(resposta, gabarito)
+        resultados.append({
+            "questao_id": questao.id,
+            "chave": questao.chave,
+            "arquivo_origem": questao.arquivo_origem,
+            "area": area,
+            "gabarito": gabarito,
+            "modo": "local",
+            "resposta_modelo": resposta,
+            "letra_resposta": letra,
+            "confianca_extracao": confianca,
+            "acertou": acertou,
+            "prompt_usado": prompt,
+            "questao_original": questao
+        })
+    
+    return resultados
 
 
 def test_enem_questions(model, tokenizer):
@@ -184,7 +531,7 @@ Analise o desempenho deste estudante e forneça orientações:""",
                 "status": "✅ Sucesso",
                 "resposta": response[:200] + "..." if len(response) > 200 else response
             })
-            
+        
         except Exception as e:
             print(f"❌ Erro: {e}\n")
             results.append({
@@ -216,8 +563,224 @@ def print_summary(results):
         print()
 
 
+def _letter_token_ids(tokenizer) -> Dict[str, List[int]]:
+    """Tokens de cada letra logo após 'RESPOSTA:' (com e sem espaço antes)."""
+    from questao_enem import LETRAS
+    
+    return {
+        letra: sorted({tokenizer.encode(variante, add_special_tokens=False)[-1] for variante in (letra, " " + letra)})
+        for letra in LETRAS
+    }
+
+
+def _last_logits(model, inputs: Dict, use_cache: bool = False):
+    """Logits da última posição de cada sequência (uma única passada)."""
+    try:
+        # Calcula a projeção no vocabulário só para a última posição
+        outputs = model(**inputs, use_cache=use_cache, logits_to_keep=1)
+    except TypeError:
+        outputs = model(**inputs, use_cache=use_cache)
+    return outputs.logits[:, -1, :]
+
+
+def _letter_scores(logits, letter_ids: Dict[str, List[int]]) -> List[Dict[str, float]]:
+    """Converte logits da última posição em {letra: log-probabilidade}."""
+    import torch
+    
+    logprobs = torch.log_softmax(logits.float(), dim=-1)
+    return [
+        {letra: torch.logsumexp(linha[ids], dim=0).item() for letra, ids in letter_ids.items()}
+        for linha in logprobs
+    ]
+
+
+def score_letters(model, tokenizer, prompts: List[str],
+                  memory_budget_mb: float = MEMORIA_LOTE_MB, max_batch_size: int = MAX_LOTE,
+                  prefix_cache=None, prefixes: Optional[List[str]] = None) -> List[Dict[str, float]]:
+    """
+    Calcula a log-probabilidade de cada letra A–E como próximo token.
+    
+    Cada prompt deve terminar onde a letra da resposta começa (ex.:
+    "...\nRESPOSTA:"). Os prompts são processados em lotes com uma única
+    passada pelo modelo, sem geração.
+    
+    Args:
+        model: Modelo (PEFT) carregado por `load_model_safe`
+        tokenizer: Tokenizer do modelo
+        prompts: Prompts a pontuar
+        memory_budget_mb: Memória máxima por lote (ver `generate_batch`)
+        max_batch_size: Número máximo de prompts por lote
+        prefix_cache: `CachePrefixos` opcional; os lotes reúnem prompts com
+            o mesmo prefixo e só o trecho após `prefixes[i]` é processado
+        prefixes: Texto inicial de cada prompt (obrigatório com `prefix_cache`)
+    
+    Returns:
+        Para cada prompt, {letra: log-probabilidade}
+    """
+    if not prompts:
+        return []
+    
+    import torch
+    
+    letter_ids = _letter_token_ids(tokenizer)
+    scores = [None] * len(prompts)
+    token_budget = max(1, int(memory_budget_mb * 1024 * 1024) // _kv_bytes_per_token(model))
+    
+    if prefix_cache is not None:
+        if prefixes is None:
+            raise ValueError("prefixes é obrigatório quando prefix_cache é informado")
+        
+        prefixos, sufixos = _split_prompts(tokenizer, prompts, prefixes)
+        lotes = _prefix_batches(prefixos, [len(sufixo) for sufixo in sufixos], 0, token_budget, max_batch_size)
+        for prefixo, lote in lotes:
+            input_ids, attention_mask, position_ids, estado = _prefixed_batch(
+                model, tokenizer, prefix_cache, prefixo, [sufixos[i] for i in lote]
+            )
+            # Só o trecho após o prefixo passa pelo modelo
+            inputs = {
+                "input_ids": input_ids[:, len(prefixo):],
+                "attention_mask": attention_mask,
+                "position_ids": position_ids[:, len(prefixo):]
+            }
+            if estado is not None:
+                inputs["past_key_values"] = estado
+            with torch.no_grad():
+                logits = _last_logits(model, inputs, use_cache=estado is not None)
+            
+            for i, letras in zip(lote, _letter_scores(logits, letter_ids)):
+                scores[i] = letras
+        return scores
+    
+    tokenizer.padding_side = "left"
+    lengths = [len(ids) for ids in tokenizer(prompts, truncation=True)["input_ids"]]
+    
+    for batch in _make_batches(lengths, 0, token_budget, max_batch_size):
+        inputs = tokenizer([prompts[i] for i in batch], return_tensors="pt", padding=True, truncation=True)
+        inputs = {k: v.to(model.device) for k, v in inputs.items()}
+        
+        with torch.no_grad():
+            logits = _last_logits(model, inputs)
+        
+        for i, letras in zip(batch, _letter_scores(logits, letter_ids)):
+            scores[i] = letras
+    
+    return scores
+
+
+def score_questions(model, tokenizer, questoes: List, memory_budget_mb: float = MEMORIA_LOTE_MB,
+                    max_batch_size: int = MAX_LOTE, prefix_cache=None) -> List[Dict]:
+    """
+    Resolve questões do ENEM escolhendo a letra mais provável (sem geração).
+    
+    Determinístico e muito mais barato que gerar a resolução: uma passada
+    pelo modelo por questão, em lotes.
+    
+    Args:
+        model: Modelo (PEFT) carregado por `load_model_safe`
+        tokenizer: Tokenizer do modelo
+        questoes: Questões (dicionários ou `Questao`)
+        memory_budget_mb: Memória máxima por lote
+        max_batch_size: Número máximo de questões por lote
+        prefix_cache: `CachePrefixos` opcional (ver `score_letters`)
+    
+    Returns:
+        Resultados no formato de `resolver_todas_questoes.resolver_questao`,
+        com `logprobs` por letra e, em `confianca_extracao`, a probabilidade
+        da letra escolhida normalizada entre as alternativas
+    """
+    from protocolo_resposta import preparar_prompt
+    from questao_enem import LETRAS, normalizar_questoes
+    from questao_enem import formatar_prefixo_prompt, formatar_questao_para_prompt
+    
+    questoes = normalizar_questoes(questoes)
+    formatadas = [formatar_questao_para_prompt(questao) for questao in questoes]
+    prompts = [preparar_prompt(prompt, "letra") + "\nRESPOSTA:" for prompt, _, _ in formatadas]
+    
+    scores = score_letters(
+        model,
+        tokenizer,
+        prompts,
+        memory_budget_mb=memory_budget_mb,
+        max_batch_size=max_batch_size,
+        prefix_cache=prefix_cache,
+        prefixes=[formatar_prefixo_prompt(questao) for questao in questoes] if prefix_cache is not None else None
+    )
+    
+    resultados = []
+    for questao, (_, gabarito, area), prompt, logprobs in zip(questoes, formatadas, prompts, scores):
+        # Apenas as letras que existem na questão
+        candidatas = [letra for letra, _ in questao.alternativas] or list(LETRAS)
+        letra = max(candidatas, key=logprobs.__getitem__)
+        normalizador = logprobs[letra] + math.log(sum(math.exp(logprobs[c] - logprobs[letra]) for c in candidatas))
+        
+        resultados.append({
+            "questao_id": questao.id,
+            "chave": questao.chave,
+            "arquivo_origem": questao.arquivo_origem,
+            "area": area,
+            "gabarito": gabarito,
+            "modo": "verossimilhanca",
+            "resposta_modelo": letra,
+            "letra_resposta": letra,
+            "confianca_extracao": math.exp(logprobs[letra] - normalizador),
+            "logprobs": {c: round(logprobs[c], 4) for c in candidatas},
+            "acertou": (letra == gabarito) if gabarito else None,
+            "prompt_usado": prompt,
+            "questao_original": questao
+        })
+    
+    return resultados
+
+
+def print_corpus_summary(resultados: List[Dict], duracao: float):
+    """Imprime acurácia e vazão da avaliação do corpus."""
+    print(f"\n{'='*80}")
+    print("📊 AVALIAÇÃO DO CORPUS (modelo local)")
+    print(f"{'='*80}\n")
+    
+    total = len(resultados)
+    acertos = sum(1 for r in resultados if r.get('acertou'))
+    sem_letra = sum(1 for r in resultados if r.get('letra_resposta') is None)
+    
+    print(f"Questões avaliadas: {total}")
+    print(f"Acertos: {acertos} ({acertos / max(total, 1) * 100:.2f}%)")
+    print(f"Sem alternativa identificada: {sem_letra}")
+    print(f"Tempo: {duracao:.1f}s ({total / max(duracao, 1e-9):.2f} questões/s)\n")
+
+
 def main():
     """Função principal."""
+    parser = argparse.ArgumentParser(description='Teste do modelo sabia-7b-enem-finetuned')
+    parser.add_argument('--corpus', action='store_true', help='Avaliar as questões das provas em lote (em vez dos testes de exemplo)')
+    parser.add_argument('--provas', default='provas', help='Pasta com os arquivos JSONL das provas (padrão: provas)')
+    parser.add_argument('--limite', type=int, default=None, help='Número máximo de questões avaliadas')
+    parser.add_argument('--max-tokens', type=int, default=256, help='Tokens gerados por questão (padrão: 256)')
+    parser.add_argument('--memoria-mb', type=float, default=MEMORIA_LOTE_MB, help=f'Memória do cache de atenção por lote (padrão: {MEMORIA_LOTE_MB})')
+    parser.add_argument('--metodo', choices=['geracao', 'verossimilhanca'], default='geracao',
+                        help="Com --corpus: 'geracao' (resolução gerada) ou 'verossimilhanca' (letra mais provável, uma passada por questão)")
+    parser.add_argument('--relatorios', default=None, help='Com --corpus: pasta para os relatórios por área (como em resolver_todas_questoes.py)')
+    parser.add_argument('--cache-prefixos-mb', type=float, default=0,
+                        help='Com --corpus: memória para reaproveitar o cabeçalho/contexto comum entre questões; '
+                             'os lotes reúnem questões com o mesmo prefixo (padrão: 0, desativado)')
+    parser.add_argument('--modelo-compilado', default=None,
+                        help='Pasta do artefato de compilar_modelo.py (LoRA mesclado); compila na primeira execução')
+    parser.add_argument('--int8', action='store_true', help='Com --modelo-compilado: pesos lineares em int8 (CPU)')
+    parser.add_argument('--lote', type=int, default=MAX_LOTE, help=f'Máximo de questões por lote (padrão: {MAX_LOTE})')
+    parser.add_argument('--offline', action='store_true', help='Usar apenas modelos locais, sem acessar o Hugging Face Hub')
+    args = parser.parse_args()
+    
+    if args.offline:
+        enable_offline_mode()
+    
+    try:
+        import torch
+        import transformers  # noqa: F401
+        import peft  # noqa: F401
+    except ImportError as e:
+        print(f"❌ Erro ao importar dependências: {e}")
+        print("Instale as dependências com: pip install -r requirements.txt")
+        sys.exit(1)
+    
     print("=" * 80)
     print("🧪 TESTE DO MODELO sabia-7b-enem-finetuned")
     print("=" * 80)
@@ -238,9 +801,12 @@ def main():
         print("\n❌ Modelo base não encontrado!")
         print("\nOpções:")
         print("1. Baixar do Hugging Face: o modelo será baixado automaticamente")
-        print("2. Especificar caminho local: edite o script e defina BASE_MODEL_PATH")
+        print(f"2. Especificar caminho local: coloque o modelo em {BASE_MODEL_PATHS[0]}")
+        if is_offline():
+            print("\n❌ Modo offline: o download não é possível")
+            return
         print("\nTentando baixar do Hugging Face...")
-        base_model_path = "sabia-7b"
+        base_model_path = BASE_MODEL_NAME
     
     # Verificar adapter
     adapter_path = "./checkpoint-367"
@@ -258,18 +824,64 @@ def main():
     
     try:
         # Carregar modelo
-        model, tokenizer = load_model_safe(base_model_path, adapter_path)
-        
-        # Executar testes
-        results = test_enem_questions(model, tokenizer)
+        if args.modelo_compilado:
+            from compilar_modelo import carregar_ou_compilar
+            model, tokenizer = carregar_ou_compilar(base_model_path, adapter_path, args.modelo_compilado, int8=args.int8)
+        else:
+            model, tokenizer = load_model_safe(base_model_path, adapter_path)
         
-        # Resumo
-        print_summary(results)
+        if args.corpus:
+            from corpus_enem import carregar_corpus
+            
+            questoes = carregar_corpus(args.provas)[:args.limite]
+            print(f"📚 Avaliando {len(questoes)} questões por {args.metodo} em lotes (até {args.lote} por lote, {args.memoria_mb:.0f} MB)...")
+            
+            prefix_cache = None
+            if args.cache_prefixos_mb > 0:
+                from cache_prefixos import CachePrefixos
+                prefix_cache = CachePrefixos(_kv_bytes_per_token(model), max_mb=args.cache_prefixos_mb)
+            
+            inicio = time.perf_counter()
+            if args.metodo == 'verossimilhanca':
+                resultados = score_questions(
+                    model,
+                    tokenizer,
+                    questoes,
+                    memory_budget_mb=args.memoria_mb,
+                    max_batch_size=args.lote,
+                    prefix_cache=prefix_cache
+                )
+            else:
+                resultados = evaluate_questions(
+                    model,
+                    tokenizer,
+                    questoes,
+                    max_new_tokens=args.max_tokens,
+                    memory_budget_mb=args.memoria_mb,
+                    max_batch_size=args.lote,
+                    prefix_cache=prefix_cache
+                )
+            print_corpus_summary(resultados, time.perf_counter() - inicio)
+            
+            if prefix_cache is not None:
+                stats = prefix_cache.estatisticas()
+                print(f"♻️  Cache de prefixos: {stats['hits']} hits, {stats['misses']} misses, "
+                      f"{stats['taxa_reaproveitamento']:.1f}% dos tokens de prefixo reaproveitados ({stats['ocupacao_mb']:.0f} MB)\n")
+            
+            if args.relatorios:
+                from relatorios_resolucao import gerar_relatorios_por_area
+                gerar_relatorios_por_area(resultados, args.relatorios)
+        else:
+            # Executar testes
+            results = test_enem_questions(model, tokenizer)
+            
+            # Resumo
+            print_summary(results)
         
         print("=" * 80)
         print("✅ TESTE CONCLUÍDO")
         print("=" * 80)
-        
+    
     except KeyboardInterrupt:
         print("\n\n⚠️  Teste interrompido pelo usuário")
     except Exception as e:
@@ -153,6 +153,8 @@ Analise o desempenho deste estudante e forneça orientações:""",
                 "tamanho_resposta": 0
             })
     
+    client.close()
+    
     # Resumo
     print("=" * 80)
     print("📊 RESUMO DOS TESTES")
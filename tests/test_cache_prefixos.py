@@ -0,0 +1,30 @@
+"""
+Testes da divisão de prompts em prefixo compartilhado e sufixo
+"""
+
+from cache_prefixos import dividir_prefixo
+
+
+def test_prefixo_inteiro_em_comum():
+    prefixo, sufixo = dividir_prefixo([1, 5, 6, 7, 8, 9], [1, 5, 6])
+    assert prefixo == (1, 5, 6)
+    assert sufixo == [7, 8, 9]
+
+
+def test_fronteira_tokenizada_de_outra_forma():
+    # O último token do prefixo isolado se funde ao texto seguinte no prompt
+    prefixo, sufixo = dividir_prefixo([1, 5, 6, 42, 9], [1, 5, 6, 7])
+    assert prefixo == (1, 5, 6)
+    assert sufixo == [42, 9]
+
+
+def test_sufixo_mantem_ao_menos_um_token():
+    prefixo, sufixo = dividir_prefixo([1, 5, 6], [1, 5, 6])
+    assert prefixo == (1, 5)
+    assert sufixo == [6]
+
+
+def test_sem_prefixo_em_comum():
+    prefixo, sufixo = dividir_prefixo([1, 5, 6], [2, 5])
+    assert prefixo == ()
+    assert sufixo == [1, 5, 6]
@@ -0,0 +1,98 @@
+"""
+Testes do cache SQLite de respostas (remoção por tamanho e idade, modo replay)
+"""
+
+import pytest
+
+import cache_respostas
+from cache_respostas import CacheRespostas
+from maritaca_api import MaritacaAPI, MaritacaAPIError
+from servidor_mock_maritaca import ServidorMockMaritaca
+
+
+class RelogioFalso:
+    """Substitui `time.time` por um relógio controlado pelo teste."""
+    
+    def __init__(self):
+        self.agora = 1_700_000_000.0
+    
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = RelogioFalso()
+    monkeypatch.setattr(cache_respostas.time, "time", relogio)
+    return relogio
+
+
+def resposta(texto: str):
+    return {"choices": [{"message": {"content": texto}}]}
+
+
+def payload(conteudo: str, **campos):
+    return {"model": "sabia-3", "messages": [{"role": "user", "content": conteudo}], "temperature": 0.0, **campos}
+
+
+def test_chave_depende_so_dos_campos_da_resposta():
+    chave = CacheRespostas.calcular_chave(payload("Quanto é 2 + 2?"))
+    assert CacheRespostas.calcular_chave(payload("Quanto é 2 + 2?", stream=True)) == chave
+    assert CacheRespostas.calcular_chave(payload("Quanto é 2 + 2?", stop=None)) == chave
+    assert CacheRespostas.calcular_chave(payload("Quanto é 2 + 2?", stop=["\n"])) != chave
+    assert CacheRespostas.calcular_chave(payload("Quanto é 2 + 2?", amostra=1)) != chave
+    assert CacheRespostas.calcular_chave(payload("Quanto é 3 + 3?")) != chave
+
+
+def test_limite_de_tamanho_remove_as_menos_usadas(tmp_path, relogio):
+    # Cada entrada ocupa ~300 bytes; o limite comporta três
+    with CacheRespostas(tmp_path / "cache.sqlite", max_mb=1000 / (1024 * 1024)) as cache:
+        for chave in ("a", "b", "c"):
+            relogio.agora += 1
+            cache.salvar(chave, resposta(chave * 250))
+        
+        relogio.agora += 1
+        assert cache.obter("a") is not None  # "b" passa a ser a menos usada
+        
+        relogio.agora += 1
+        cache.salvar("d", resposta("d" * 250))
+        
+        assert [chave for chave in "abcd" if cache.obter(chave) is not None] == ["a", "c", "d"]
+        assert cache.estatisticas()["entradas"] == 3
+
+
+def test_entradas_expiradas_sao_ignoradas_e_removidas(tmp_path, relogio):
+    caminho = tmp_path / "cache.sqlite"
+    with CacheRespostas(caminho, max_idade_dias=1) as cache:
+        cache.salvar("antiga", resposta("A"))
+        relogio.agora += 86400 / 2
+        cache.salvar("recente", resposta("B"))
+        
+        relogio.agora += 86400 * 0.75
+        assert cache.obter("antiga") is None
+        assert cache.obter("recente") == resposta("B")
+        assert (cache.hits, cache.misses) == (1, 1)
+    
+    with CacheRespostas(caminho, max_idade_dias=1) as cache:
+        assert cache.estatisticas()["entradas"] == 1
+
+
+def test_replay_nao_grava_e_falha_sem_chamar_a_api(tmp_path):
+    caminho = tmp_path / "cache.sqlite"
+    with pytest.raises(FileNotFoundError):
+        CacheRespostas(caminho, replay=True)
+    
+    with CacheRespostas(caminho) as cache:
+        cache.salvar("a", resposta("A"))
+    
+    with CacheRespostas(caminho, replay=True) as cache:
+        cache.salvar("b", resposta("B"))
+        assert cache.obter("a") == resposta("A")
+        assert cache.obter("b") is None
+        assert cache.estatisticas()["entradas"] == 1
+        
+        with ServidorMockMaritaca(latencia=0.0, dispersao=0.0, seed=1) as servidor, \
+                MaritacaAPI(base_url=servidor.base_url, cache=cache) as client:
+            with pytest.raises(MaritacaAPIError, match="replay"):
+                client.chat_completion([{"role": "user", "content": "Quanto é 2 + 2?"}])
+            assert servidor.estatisticas()["requisicoes"] == 0
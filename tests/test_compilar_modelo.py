@@ -0,0 +1,72 @@
+"""
+Testes da compilação do modelo local (LoRA mesclado, int8 e carga do safetensors)
+
+Usa um Llama minúsculo com pesos aleatórios; só roda com torch,
+transformers, peft e accelerate instalados.
+"""
+
+import pytest
+
+from compilar_modelo import ARQUIVO_PESOS, carregar_modelo_compilado, compilar_modelo
+
+
+@pytest.fixture(scope="module", params=[True, False], ids=["pesos_ligados", "pesos_separados"])
+def modelo_com_adapter(request, tmp_path_factory):
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    tokenizers = pytest.importorskip("tokenizers")
+    peft = pytest.importorskip("peft")
+    pytest.importorskip("accelerate")
+    
+    pasta = tmp_path_factory.mktemp("modelo")
+    vocab = {"<pad>": 0, "<s>": 1, "</s>": 2}
+    for caractere in "abcde ":
+        vocab[caractere] = len(vocab)
+    tokenizer = transformers.PreTrainedTokenizerFast(
+        tokenizer_object=tokenizers.Tokenizer(tokenizers.models.BPE(vocab=vocab, merges=[])),
+        bos_token="<s>", eos_token="</s>", pad_token="<pad>"
+    )
+    
+    torch.manual_seed(0)
+    config = transformers.LlamaConfig(
+        vocab_size=len(vocab), hidden_size=32, intermediate_size=64, num_hidden_layers=2,
+        num_attention_heads=4, num_key_value_heads=2, tie_word_embeddings=request.param
+    )
+    base = transformers.LlamaForCausalLM(config)
+    base.save_pretrained(pasta / "base")
+    tokenizer.save_pretrained(pasta / "base")
+    
+    lora = peft.get_peft_model(base, peft.LoraConfig(r=4, target_modules=["q_proj", "v_proj"], init_lora_weights=False))
+    lora.save_pretrained(pasta / "adapter")
+    
+    entrada = torch.tensor([[1, 3, 4, 5, 6, 7, 8]])
+    with torch.no_grad():
+        esperado = lora.merge_and_unload().eval()(entrada).logits
+    return pasta, entrada, esperado
+
+
+@pytest.mark.parametrize("int8, tolerancia", [(False, 1e-6), (True, 5e-2)])
+def test_modelo_compilado_reproduz_o_lora_mesclado(modelo_com_adapter, int8, tolerancia):
+    import torch
+    
+    pasta, entrada, esperado = modelo_com_adapter
+    destino = compilar_modelo(str(pasta / "base"), str(pasta / "adapter"), str(pasta / f"compilado_{int8}"), int8=int8)
+    model, _ = carregar_modelo_compilado(destino)
+    
+    with torch.no_grad():
+        obtido = model(entrada).logits
+    assert (obtido - esperado).abs().max().item() < tolerancia
+    assert (model.lm_head.weight is model.model.embed_tokens.weight) == model.config.tie_word_embeddings
+
+
+def test_artefato_sem_um_peso_e_rejeitado(modelo_com_adapter):
+    from safetensors.torch import load_file, save_file
+    
+    pasta, _, _ = modelo_com_adapter
+    destino = compilar_modelo(str(pasta / "base"), str(pasta / "adapter"), str(pasta / "incompleto"))
+    pesos = load_file(str(destino / ARQUIVO_PESOS))
+    del pesos["model.norm.weight"]
+    save_file(pesos, str(destino / ARQUIVO_PESOS))
+    
+    with pytest.raises(RuntimeError, match="model.norm.weight"):
+        carregar_modelo_compilado(destino)
@@ -0,0 +1,110 @@
+"""
+Testes da exportação dos journals para dados de fine-tuning
+"""
+
+import json
+
+import pytest
+
+from exportar_treinamento import exportar_treinamento, selecionar_exemplos
+from journal_resultados import gravar_journal
+from questao_enem import normalizar_questoes
+
+
+def questao_bruta(arquivo: str, numero: int, enunciado: str, **campos):
+    questao = {
+        "id": numero,
+        "number": numero,
+        "area": "mathematics",
+        "context": "Texto de apoio.",
+        "question": enunciado,
+        "alternatives": ["um", "dois", "três", "quatro", "cinco"],
+        "answer": "B",
+        "arquivo_origem": arquivo,
+    }
+    questao.update(campos)
+    return questao
+
+
+@pytest.fixture
+def questoes():
+    return normalizar_questoes([
+        questao_bruta("enem_2020.jsonl", 1, "Quanto é 1 + 1?"),
+        questao_bruta("enem_2021.jsonl", 5, "Quanto é 1 + 1?"),   # mesmo conteúdo
+        questao_bruta("enem_2020.jsonl", 2, "Quanto é 2 + 2?"),
+    ])
+
+
+def resultado(questao, letra: str, **campos):
+    registro = {
+        "chave": questao.chave,
+        "questao_id": questao.id,
+        "arquivo_origem": questao.arquivo_origem,
+        "area": "MATEMATICA",
+        "modo": "raciocinio",
+        "resposta_modelo": f"Raciocínio.\nRESPOSTA: {letra}",
+        "letra_resposta": letra,
+        "acertou": letra == questao.gabarito,
+    }
+    registro.update(campos)
+    return registro
+
+
+def test_exemplos_filtram_corrigem_e_deduplicam(questoes, tmp_path):
+    journal = tmp_path / "progresso.jsonl"
+    repetida, copia, outra = questoes
+    legado = resultado(outra, "B")
+    del legado["chave"]  # registro anterior à chave canônica
+    gravar_journal(journal, [resultado(repetida, "B"), resultado(copia, "B"), legado, resultado(outra, "C")])
+    
+    estatisticas = {}
+    exemplos = list(selecionar_exemplos([journal], questoes, estatisticas=estatisticas))
+    
+    assert [exemplo["chave"] for exemplo in exemplos] == [repetida.chave, outra.chave]
+    assert estatisticas == {
+        "lidos": 4, "sem_questao": 0, "filtrados": 1, "duplicados": 1, "sem_resposta": 0, "exportados": 2
+    }
+    
+    mensagens = exemplos[0]["messages"]
+    assert [mensagem["role"] for mensagem in mensagens] == ["system", "user", "assistant"]
+    assert "Quanto é 1 + 1?" in mensagens[1]["content"]
+    assert "RESPOSTA: X" in mensagens[1]["content"]
+    assert mensagens[2]["content"].endswith("RESPOSTA: B")
+
+
+def test_gabarito_e_prompt_completion(questoes, tmp_path):
+    journal = tmp_path / "progresso.jsonl"
+    gravar_journal(journal, [resultado(questao, "E") for questao in questoes])
+    
+    exemplos = list(selecionar_exemplos(
+        [journal], questoes, correcao="todos", por_questao=2, formato="prompt_completion", resposta="gabarito"
+    ))
+    
+    assert len(exemplos) == 3
+    assert all(exemplo["completion"] == [{"role": "assistant", "content": "RESPOSTA: B"}] for exemplo in exemplos)
+    assert all(exemplo["prompt"][-1]["role"] == "user" for exemplo in exemplos)
+
+
+def test_shards_de_tamanho_fixo(tmp_path):
+    exemplos = [{"messages": [], "chave": str(i)} for i in range(5)]
+    (tmp_path / "treino-00009.jsonl").write_text("antigo\n")
+    
+    shards = exportar_treinamento(iter(exemplos), str(tmp_path), por_arquivo=2)
+    
+    assert shards == ["treino-00000.jsonl", "treino-00001.jsonl", "treino-00002.jsonl"]
+    assert not (tmp_path / "treino-00009.jsonl").exists()
+    linhas = [json.loads(linha) for shard in shards for linha in (tmp_path / shard).read_text().splitlines()]
+    assert [linha["chave"] for linha in linhas] == ["0", "1", "2", "3", "4"]
+
+
+def test_shards_parquet(questoes, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    journal = tmp_path / "progresso.jsonl"
+    gravar_journal(journal, [resultado(questao, "B") for questao in questoes])
+    exemplos = list(selecionar_exemplos([journal], questoes, por_questao=2))
+    
+    shards = exportar_treinamento(iter(exemplos), str(tmp_path / "sft"), por_arquivo=2, parquet=True)
+    
+    assert shards == ["treino-00000.parquet", "treino-00001.parquet"]
+    linhas = [linha for shard in shards for linha in pq.read_table(tmp_path / "sft" / shard).to_pylist()]
+    assert linhas == exemplos
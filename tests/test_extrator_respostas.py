@@ -0,0 +1,76 @@
+"""
+Testes da extração da alternativa escolhida e da recorreção de journals
+"""
+
+import pytest
+
+from extrator_respostas import CONFIANCA, FATOR_CONFLITO, extrair_letra, recorrigir_journal
+from journal_resultados import gravar_journal, ler_journal
+
+
+@pytest.mark.parametrize("resposta, letra, tipo", [
+    ("Calculando a área...\nRESPOSTA: C", "C", "sentinela"),
+    ("resposta: (d)", "D", "conclusao"),
+    ("Portanto, a alternativa correta é a letra B.", "B", "conclusao"),
+    ("Portanto, a resposta correta é a letra e.", "E", "conclusao"),
+    ("Logo, o gabarito é (a)", "A", "conclusao"),
+    ("A alternativa d é a correta, pois...", "D", "afirmacao"),
+    ("Analisando a alternativa E, vemos que...", "E", "mencao"),
+    ("C)", "C", "curta"),
+    ("b.", None, None),
+])
+def test_letra_e_confianca(resposta, letra, tipo):
+    obtida, confianca, posicao = extrair_letra(resposta)
+    assert obtida == letra
+    if tipo is None:
+        assert (confianca, posicao) == (0.0, None)
+    else:
+        assert confianca == CONFIANCA[tipo]
+        assert resposta[posicao[0]:posicao[1]].upper() == letra
+
+
+@pytest.mark.parametrize("resposta", [
+    "A resposta é a soma dos ângulos internos.",
+    "A resposta correta é a Terra, que gira em torno do Sol.",
+    "A resposta é e também será discutida adiante.",
+    "Texto sem alternativa alguma.",
+    "",
+    None,
+])
+def test_artigos_e_conjuncoes_nao_sao_letras(resposta):
+    assert extrair_letra(resposta) == (None, 0.0, None)
+
+
+def test_maior_confianca_e_a_ultima_vencem():
+    texto = "A alternativa A parece boa, mas a alternativa B é a correta.\nRESPOSTA: B"
+    assert extrair_letra(texto)[:2] == ("B", CONFIANCA["sentinela"])
+    
+    texto = "A resposta é C. Revisando, a resposta correta é D."
+    assert extrair_letra(texto)[0] == "D"
+
+
+def test_letras_em_conflito_reduzem_a_confianca():
+    letra, confianca, _ = extrair_letra("A resposta correta é A. Pensando melhor, a resposta correta é b.")
+    assert letra == "B"
+    assert confianca == CONFIANCA["conclusao"] * FATOR_CONFLITO
+
+
+def test_recorrigir_journal(tmp_path):
+    journal = tmp_path / "progresso.jsonl"
+    gravar_journal(journal, [
+        # O critério antigo (letra em qualquer ponto do texto) marcava acerto
+        {"chave": "a:1", "gabarito": "A", "acertou": True, "resposta_modelo": "A resposta correta é a letra c."},
+        {"chave": "a:2", "gabarito": "B", "acertou": False, "resposta_modelo": "RESPOSTA: B"},
+        {"chave": "a:3", "gabarito": "C", "erro": "timeout"},
+    ])
+    
+    estatisticas = recorrigir_journal(journal)
+    
+    assert estatisticas == {
+        "registros": 3, "respostas": 2, "sem_letra": 0,
+        "acertos_antes": 1, "acertos_depois": 1, "alterados": 2,
+    }
+    registros = list(ler_journal(journal))
+    assert [registro.get('letra_resposta') for registro in registros] == ["C", "B", None]
+    assert [registro.get('acertou') for registro in registros] == [False, True, None]
+    assert registros[2] == {"chave": "a:3", "gabarito": "C", "erro": "timeout"}
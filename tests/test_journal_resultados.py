@@ -0,0 +1,74 @@
+"""
+Testes do journal append-only de resultados
+"""
+
+import json
+
+import pytest
+
+from journal_resultados import JournalResultados, chave_resultado, ler_journal
+
+
+def linhas(caminho):
+    return caminho.read_text(encoding='utf-8').splitlines()
+
+
+@pytest.mark.parametrize("parcial", [
+    '{"chave": "a:2", "letra',
+    '{"chave": "a:2", "resposta_modelo": "' + "x" * 10000,  # maior que o bloco de busca
+])
+def test_linha_incompleta_e_descartada_ao_reabrir(tmp_path, parcial):
+    caminho = tmp_path / "progresso.jsonl"
+    caminho.write_text('{"chave": "a:1"}\n' + parcial, encoding='utf-8')
+    
+    with JournalResultados(caminho) as journal:
+        assert linhas(caminho) == ['{"chave": "a:1"}']
+        journal.registrar({"chave": "a:2", "letra_resposta": "B"})
+    
+    assert [registro["chave"] for registro in ler_journal(caminho)] == ["a:1", "a:2"]
+
+
+def test_arquivo_so_com_linha_incompleta_fica_vazio(tmp_path):
+    caminho = tmp_path / "progresso.jsonl"
+    caminho.write_text('{"chave": "a:1", "le', encoding='utf-8')
+    
+    JournalResultados(caminho).close()
+    
+    assert caminho.read_bytes() == b""
+
+
+def test_ler_journal_ignora_linhas_corrompidas(tmp_path):
+    caminho = tmp_path / "progresso.jsonl"
+    caminho.write_text('{"chave": "a:1"}\n\nnão é json\n{"chave": "a:2"}\n', encoding='utf-8')
+    
+    assert [registro["chave"] for registro in ler_journal(caminho)] == ["a:1", "a:2"]
+    assert list(ler_journal(tmp_path / "inexistente.jsonl")) == []
+
+
+def test_registrar_omite_campos_volumosos(tmp_path):
+    caminho = tmp_path / "progresso.jsonl"
+    with JournalResultados(caminho) as journal:
+        journal.registrar({"chave": "a:1", "prompt_usado": "...", "questao_original": {}, "acertou": True})
+        assert list(journal.ler()) == [{"chave": "a:1", "acertou": True}]
+
+
+def test_compactar_mantem_o_ultimo_registro_de_cada_questao(tmp_path):
+    caminho = tmp_path / "progresso.jsonl"
+    with JournalResultados(caminho, fsync_a_cada=100) as journal:
+        journal.registrar({"chave": "a:1", "letra_resposta": "A"})
+        journal.registrar({"chave": "a:2", "letra_resposta": "B"})
+        journal.registrar({"chave": "a:1", "letra_resposta": "C"})
+        journal.registrar({"arquivo_origem": "antigo.json", "questao_id": 3, "letra_resposta": "D"})
+        
+        copia = tmp_path / "copia.jsonl"
+        assert journal.compactar(copia) == 3
+        assert len(linhas(caminho)) == 4
+        
+        assert journal.compactar() == 3
+        journal.registrar({"chave": "a:3", "letra_resposta": "E"})
+    
+    registros = [json.loads(linha) for linha in linhas(caminho)]
+    assert [(chave_resultado(registro), registro["letra_resposta"]) for registro in registros] == [
+        ("a:1", "C"), ("a:2", "B"), ("antigo.json:3", "D"), ("a:3", "E"),
+    ]
+    assert linhas(copia) == linhas(caminho)[:3]
@@ -0,0 +1,134 @@
+"""
+Testes do limitador de taxa e do Retry-After do cliente da API
+"""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+import maritaca_api
+from maritaca_api import TETO_RELATIVO_PADRAO, MaritacaAPI, TokenBucket, _ler_retry_after
+
+
+class RelogioFalso:
+    """Substitui `time.monotonic` por um relógio controlado pelo teste."""
+    
+    def __init__(self):
+        self.agora = 1000.0
+    
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = RelogioFalso()
+    monkeypatch.setattr(maritaca_api.time, "monotonic", relogio)
+    return relogio
+
+
+def test_sem_taxa_nao_limita(relogio):
+    limitador = TokenBucket()
+    assert limitador.taxa is None
+    assert all(limitador.reservar() == 0.0 for _ in range(100))
+
+
+def test_reservar_respeita_a_taxa(relogio):
+    limitador = TokenBucket(taxa=2.0)
+    
+    # Capacidade de 2 tokens: duas requisições imediatas, depois 0,5 s cada
+    assert limitador.reservar() == 0.0
+    assert limitador.reservar() == 0.0
+    assert limitador.reservar() == pytest.approx(0.5)
+    assert limitador.reservar() == pytest.approx(1.0)
+    
+    relogio.agora += 1.0
+    assert limitador.reservar() == pytest.approx(0.5)
+
+
+def test_teto_padrao_acima_da_taxa_inicial():
+    limitador = TokenBucket(taxa=2.0)
+    assert limitador.taxa_maxima == 2.0 * TETO_RELATIVO_PADRAO
+    
+    assert TokenBucket(taxa=2.0, taxa_maxima=1.0).taxa_maxima == 2.0
+
+
+def test_aumento_aditivo_ate_o_teto(relogio):
+    limitador = TokenBucket(taxa=1.0, taxa_maxima=3.0, incremento=1.0)
+    
+    limitador.registrar_sucesso()
+    assert limitador.taxa == pytest.approx(2.0)
+    limitador.registrar_sucesso()
+    assert limitador.taxa == pytest.approx(2.5)
+    
+    for _ in range(100):
+        limitador.registrar_sucesso()
+    assert limitador.taxa == 3.0
+
+
+def test_reducao_multiplicativa_uma_vez_por_intervalo(relogio):
+    limitador = TokenBucket(taxa=4.0, taxa_minima=1.0, fator_reducao=0.5)
+    
+    limitador.registrar_limite()
+    assert limitador.taxa == 2.0
+    
+    # 429 simultâneos contam como um único sinal
+    limitador.registrar_limite()
+    assert limitador.taxa == 2.0
+    assert limitador.total_limitadas == 2
+    
+    relogio.agora += 1.0
+    limitador.registrar_limite()
+    assert limitador.taxa == 1.0
+    
+    relogio.agora += 10.0
+    limitador.registrar_limite()
+    assert limitador.taxa == 1.0  # piso
+
+
+def test_retry_after_bloqueia_mesmo_sem_taxa(relogio):
+    limitador = TokenBucket()
+    limitador.registrar_limite(retry_after=3.0)
+    assert limitador.reservar() == pytest.approx(3.0)
+    
+    relogio.agora += 2.0
+    assert limitador.reservar() == pytest.approx(1.0)
+    
+    relogio.agora += 5.0
+    assert limitador.reservar() == 0.0
+
+
+def test_cliente_usa_o_limitador_recebido():
+    limitador = TokenBucket(taxa=5.0)
+    client = MaritacaAPI(api_key="chave-de-teste-local", limitador=limitador)
+    try:
+        assert client.limitador is limitador
+    finally:
+        client.close()
+    
+    client = MaritacaAPI(api_key="chave-de-teste-local")
+    try:
+        assert client.limitador.taxa is None
+    finally:
+        client.close()
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    (None, None),
+    ("", None),
+    ("5", 5.0),
+    ("1.5", 1.5),
+    ("-3", 0.0),
+    ("depois", None),
+])
+def test_ler_retry_after_segundos(valor, esperado):
+    assert _ler_retry_after(valor) == esperado
+
+
+def test_ler_retry_after_data_http():
+    futuro = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert _ler_retry_after(format_datetime(futuro, usegmt=True)) == pytest.approx(30, abs=2)
+    
+    passado = datetime.now(timezone.utc) - timedelta(seconds=30)
+    assert _ler_retry_after(format_datetime(passado, usegmt=True)) == 0.0
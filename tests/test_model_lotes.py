@@ -0,0 +1,125 @@
+"""
+Testes da montagem de lotes da inferência local (test_model.py)
+
+A equivalência numérica do cache de prefixos usa um Llama minúsculo com
+pesos aleatórios e só roda com torch e transformers instalados.
+"""
+
+import pytest
+
+from test_model import _left_pad, _make_batches, _prefix_batches, _shared_prefixes
+
+
+def test_lotes_do_maior_para_o_menor_prompt():
+    lotes = _make_batches([3, 9, 5, 9, 1], max_new_tokens=0, token_budget=10 ** 6, max_batch_size=2)
+    assert lotes == [[1, 3], [2, 0], [4]]
+
+
+def test_lotes_respeitam_o_orcamento_de_tokens():
+    # O lote custa tamanho x (maior prompt + tokens gerados)
+    lotes = _make_batches([10, 8, 8, 3], max_new_tokens=2, token_budget=30, max_batch_size=16)
+    assert lotes == [[0, 1], [2, 3]]
+
+
+def test_prompt_maior_que_o_orcamento_vai_sozinho():
+    assert _make_batches([100, 5], max_new_tokens=4, token_budget=50, max_batch_size=16) == [[0], [1]]
+    assert _make_batches([], max_new_tokens=4, token_budget=50, max_batch_size=16) == []
+
+
+def test_left_pad():
+    ids, mascara = _left_pad([[7, 8, 9], [5]], pad_id=0)
+    assert ids == [[7, 8, 9], [0, 0, 5]]
+    assert mascara == [[1, 1, 1], [0, 0, 1]]
+
+
+def test_prefixos_usados_uma_vez_voltam_ao_sufixo():
+    ids = [[1, 2, 3, 10], [1, 2, 3, 11, 12], [1, 4, 13]]
+    prefixos, sufixos = _shared_prefixes(ids, [(1, 2, 3), (1, 2, 3), (1, 4)])
+    assert prefixos == [(1, 2, 3), (1, 2, 3), ()]
+    assert sufixos == [[10], [11, 12], [1, 4, 13]]
+
+
+def test_lotes_reunem_o_mesmo_prefixo():
+    prefixos = [(1, 2), (), (1, 2), (1, 3), (1, 2), (1, 3)]
+    lotes = _prefix_batches(prefixos, [5, 9, 3, 4, 6, 2], max_new_tokens=0, token_budget=10 ** 6, max_batch_size=16)
+    assert [(prefixo, sorted(lote)) for prefixo, lote in lotes] == [
+        ((1, 2), [0, 2, 4]),
+        ((), [1]),
+        ((1, 3), [3, 5]),
+    ]
+
+
+def test_lotes_contam_o_prefixo_no_orcamento():
+    prefixos = [(1,) * 10] * 4
+    # Cada linha ocupa 10 (prefixo) + 2 (sufixo) + 3 (gerados) = 15 tokens
+    lotes = _prefix_batches(prefixos, [2, 2, 2, 2], max_new_tokens=3, token_budget=30, max_batch_size=16)
+    assert [len(lote) for _, lote in lotes] == [2, 2]
+
+
+@pytest.fixture(scope="module")
+def modelo_minusculo():
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    tokenizers = pytest.importorskip("tokenizers")
+    
+    caracteres = sorted(set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 .,:?-\n"))
+    vocab = {"<pad>": 0, "<s>": 1, "</s>": 2}
+    for caractere in caracteres:
+        vocab[caractere] = len(vocab)
+    base = tokenizers.Tokenizer(tokenizers.models.BPE(vocab=vocab, merges=[]))
+    base.post_processor = tokenizers.processors.TemplateProcessing(single="<s> $A", special_tokens=[("<s>", 1)])
+    tokenizer = transformers.PreTrainedTokenizerFast(
+        tokenizer_object=base, bos_token="<s>", eos_token="</s>", pad_token="<pad>", model_max_length=4096
+    )
+    tokenizer.model_input_names = ["input_ids", "attention_mask"]
+    
+    torch.manual_seed(0)
+    config = transformers.LlamaConfig(
+        vocab_size=len(vocab), hidden_size=64, intermediate_size=128, num_hidden_layers=2,
+        num_attention_heads=4, num_key_value_heads=2, max_position_embeddings=4096
+    )
+    return transformers.LlamaForCausalLM(config).eval(), tokenizer
+
+
+def prompts_com_texto_base():
+    prefixes = []
+    prompts = []
+    for k in range(10):
+        prefix = f"Questao do ENEM - area\nTexto base {k % 3}. conteudo do texto base. "
+        if k == 9:
+            prefix += "texto exclusivo. "
+        prefixes.append(prefix)
+        prompts.append(prefix + f"pergunta {k} sobre o texto? " + "x" * k + "\nRESPOSTA:")
+    return prompts, prefixes
+
+
+def test_cache_de_prefixos_nao_muda_as_pontuacoes(modelo_minusculo):
+    from cache_prefixos import CachePrefixos
+    from test_model import _kv_bytes_per_token, score_letters
+    
+    model, tokenizer = modelo_minusculo
+    prompts, prefixes = prompts_com_texto_base()
+    
+    sem_cache = score_letters(model, tokenizer, prompts, max_batch_size=4)
+    cache = CachePrefixos(_kv_bytes_per_token(model), max_mb=16)
+    com_cache = score_letters(model, tokenizer, prompts, max_batch_size=4, prefix_cache=cache, prefixes=prefixes)
+    
+    for esperado, obtido in zip(sem_cache, com_cache):
+        assert obtido == pytest.approx(esperado, abs=1e-4)
+    assert cache.estatisticas()["prefixos"] == 3
+    assert cache.misses == 3
+    assert cache.hits == 6
+
+
+def test_cache_de_prefixos_nao_muda_a_geracao(modelo_minusculo):
+    from cache_prefixos import CachePrefixos
+    from test_model import _kv_bytes_per_token, generate_batch
+    
+    model, tokenizer = modelo_minusculo
+    prompts, prefixes = prompts_com_texto_base()
+    
+    sem_cache = generate_batch(model, tokenizer, prompts, max_new_tokens=6, temperature=0, max_batch_size=4)
+    cache = CachePrefixos(_kv_bytes_per_token(model), max_mb=16)
+    com_cache = generate_batch(model, tokenizer, prompts, max_new_tokens=6, temperature=0, max_batch_size=4,
+                               prefix_cache=cache, prefixes=prefixes)
+    assert com_cache == sem_cache
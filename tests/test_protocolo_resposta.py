@@ -0,0 +1,57 @@
+"""
+Testes da linha sentinela `RESPOSTA: X` e da parada antecipada do streaming
+"""
+
+import pytest
+
+from cache_respostas import CacheRespostas
+from maritaca_api import MaritacaAPI
+from protocolo_resposta import extrair_sentinela, gerar_resposta
+from servidor_mock_maritaca import CHAVE_TESTE, ServidorMockMaritaca
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("Logo, a alternativa correta é B.\nRESPOSTA: B", "B"),
+    ("RESPOSTA: (C)", "C"),
+    ("resposta: d", None),  # a letra precisa ser maiúscula
+    ("Resposta: a alternativa correta é B", None),
+    ("RESPOSTA: A alternativa correta é E", None),
+    ("Sem conclusão", None),
+])
+def test_sentinela_no_texto_final(texto, esperado):
+    assert extrair_sentinela(texto) == esperado
+
+
+@pytest.mark.parametrize("parcial, esperado", [
+    ("RESPOSTA: A", None),          # pode continuar como "Alternativa"
+    ("RESPOSTA: A ", None),         # pode continuar como " alternativa"
+    ("RESPOSTA: A\n", "A"),
+    ("RESPOSTA: A.", "A"),
+    ("RESPOSTA: Alt", None),
+])
+def test_sentinela_no_texto_parcial(parcial, esperado):
+    assert extrair_sentinela(parcial, final=False) == esperado
+
+
+@pytest.fixture
+def servidor():
+    with ServidorMockMaritaca(latencia=0.0, dispersao=0.0, seed=1) as servidor:
+        yield servidor
+
+
+def test_texto_salvo_termina_na_letra_e_replay_e_identico(servidor, tmp_path):
+    caminho = tmp_path / "cache.sqlite"
+    prompt = "Questão do ENEM - MATEMATICA\n\nQuanto é 2 + 2?\n\nA) 3\nB) 4\nC) 5\nD) 6\nE) 7"
+    
+    with CacheRespostas(caminho) as cache, \
+            MaritacaAPI(api_key=CHAVE_TESTE, base_url=servidor.base_url, cache=cache) as client:
+        texto, letra = gerar_resposta(client, prompt, temperature=0.0)
+    
+    assert letra is not None
+    assert texto.endswith(f"RESPOSTA: {letra}")
+    
+    with CacheRespostas(caminho, replay=True) as cache, \
+            MaritacaAPI(base_url=servidor.base_url, cache=cache) as client:
+        texto_replay, letra_replay = gerar_resposta(client, prompt, temperature=0.0)
+    
+    assert (texto_replay, letra_replay) == (texto, letra)
@@ -0,0 +1,71 @@
+"""
+Testes da normalização, do hash do conteúdo e das chaves das questões
+"""
+
+from questao_enem import Questao, area_questao, calcular_hash_conteudo
+
+
+def questao_bruta(**campos):
+    questao = {
+        "number": 10,
+        "context": "Texto de apoio da questão.",
+        "question": "Qual é a alternativa correta?",
+        "alternatives": ["um", "dois", "três", "quatro", "cinco"],
+        "answer": "b",
+        "arquivo_origem": "enem_2020.jsonl",
+    }
+    questao.update(campos)
+    return questao
+
+
+def test_hash_ignora_diferencas_de_espacos():
+    alternativas = (("A", "um"), ("B", "dois"))
+    assert calcular_hash_conteudo("Texto  de\napoio", " Pergunta?", alternativas) == \
+        calcular_hash_conteudo("Texto de apoio", "Pergunta?\n", alternativas)
+
+
+def test_hash_distingue_conteudo():
+    alternativas = (("A", "um"), ("B", "dois"))
+    base = calcular_hash_conteudo("Texto", "Pergunta?", alternativas)
+    assert len(base) == 16
+    assert calcular_hash_conteudo("Texto", "Outra pergunta?", alternativas) != base
+    assert calcular_hash_conteudo("Texto", "Pergunta?", (("A", "dois"), ("B", "um"))) != base
+    # Os campos são separados: mover texto entre eles muda o hash
+    assert calcular_hash_conteudo("Texto Pergunta?", "", alternativas) != \
+        calcular_hash_conteudo("Texto", "Pergunta?", alternativas)
+
+
+def test_de_dict_normaliza_campos():
+    questao = Questao.de_dict(questao_bruta(alternatives={"a": "um", "B": "dois"}, disciplina="MATEMATICA"))
+    assert questao.alternativas == (("A", "um"), ("B", "dois"))
+    assert questao.gabarito == "B"
+    assert questao.area == "MATEMATICA"
+    assert questao.chave == f"enem_2020.jsonl:10:{questao.hash_conteudo}"
+
+
+def test_area_questao_usa_os_mesmos_campos_do_registro():
+    assert area_questao({"subject": "humanas"}) == "humanas"
+    assert area_questao({"disciplina": "natureza"}) == "natureza"
+    assert area_questao({"area": "", "subject": "linguagens"}) == "linguagens"
+    assert area_questao({}) is None
+
+
+def test_mesmo_texto_em_arquivos_diferentes_e_deduplicado():
+    a = Questao.de_dict(questao_bruta())
+    b = Questao.de_dict(questao_bruta(arquivo_origem="enem_2021.jsonl", number=12))
+    assert a.chave != b.chave
+    assert a.chave_deduplicacao == b.chave_deduplicacao == a.hash_conteudo
+
+
+def test_questoes_com_imagem_nao_sao_deduplicadas():
+    a = Questao.de_dict(questao_bruta(has_images=True))
+    b = Questao.de_dict(questao_bruta(has_images=True, arquivo_origem="enem_2021.jsonl"))
+    assert a.hash_conteudo == b.hash_conteudo
+    assert a.chave_deduplicacao == a.chave
+    assert a.chave_deduplicacao != b.chave_deduplicacao
+
+
+def test_questoes_com_texto_incompleto_nao_sao_deduplicadas():
+    for campos in ({"context": ""}, {"question": "  "}, {"alternatives": []}):
+        questao = Questao.de_dict(questao_bruta(**campos))
+        assert questao.chave_deduplicacao == questao.chave
@@ -0,0 +1,82 @@
+"""
+Testes da resolução completa contra o servidor mock (sem rede externa)
+"""
+
+import pytest
+
+from resolver_todas_questoes import processar_todas_questoes
+from servidor_mock_maritaca import CHAVE_TESTE, ServidorMockMaritaca
+
+
+def questao_bruta(arquivo: str, **campos):
+    questao = {
+        "number": 1,
+        "context": "Observe a figura abaixo.",
+        "question": "O que a figura representa?",
+        "alternatives": ["um", "dois", "três", "quatro", "cinco"],
+        "answer": "A",
+        "arquivo_origem": arquivo,
+    }
+    questao.update(campos)
+    return questao
+
+
+@pytest.fixture
+def servidor(monkeypatch):
+    with ServidorMockMaritaca(latencia=0.0, dispersao=0.0, seed=1) as servidor:
+        monkeypatch.setenv("MARITACA_BASE_URL", servidor.base_url)
+        monkeypatch.setenv("MARITACA_API_KEY", CHAVE_TESTE)
+        yield servidor
+
+
+def resolver(questoes):
+    return processar_todas_questoes(questoes, salvar_progresso=False, intervalo_entre_requisicoes=0)
+
+
+def test_questoes_com_imagem_e_mesmo_texto_sao_resolvidas_separadamente(servidor):
+    questoes = [
+        questao_bruta("enem_2020.jsonl", has_images=True, answer="A"),
+        questao_bruta("enem_2021.jsonl", has_images=True, answer="C"),
+    ]
+    resultados = resolver(questoes)
+    
+    assert servidor.estatisticas()["requisicoes"] == 2
+    assert len(resultados) == 2
+    assert all('duplicata_de' not in resultado for resultado in resultados)
+    assert [resultado['gabarito'] for resultado in resultados] == ["A", "C"]
+
+
+def test_questoes_de_texto_repetidas_sao_resolvidas_uma_vez(servidor):
+    questoes = [
+        questao_bruta("enem_2020.jsonl"),
+        questao_bruta("enem_2021.jsonl", number=7, answer="B"),
+    ]
+    resultados = resolver(questoes)
+    
+    assert servidor.estatisticas()["requisicoes"] == 1
+    assert resultados[1]['duplicata_de'] == resultados[0]['chave']
+    assert resultados[1]['letra_resposta'] == resultados[0]['letra_resposta']
+    assert resultados[1]['gabarito'] == "B"
+
+
+def test_copias_antigas_de_questoes_com_imagem_sao_descartadas(tmp_path):
+    from journal_resultados import gravar_journal, ler_journal
+    from questao_enem import normalizar_questoes
+    from resolver_todas_questoes import carregar_resultados_journal
+    
+    com_imagem, copia_indevida, texto = normalizar_questoes([
+        questao_bruta("enem_2020.jsonl", has_images=True),
+        questao_bruta("enem_2021.jsonl", has_images=True),
+        questao_bruta("enem_2022.jsonl"),
+    ])
+    journal = tmp_path / "progresso.jsonl"
+    gravar_journal(journal, [
+        {"chave": com_imagem.chave, "letra_resposta": "A"},
+        {"chave": copia_indevida.chave, "letra_resposta": "A", "duplicata_de": com_imagem.chave},
+        {"chave": texto.chave, "letra_resposta": "A", "duplicata_de": "outro.jsonl:1:0"},
+    ])
+    
+    resultados = carregar_resultados_journal(journal, [com_imagem, copia_indevida, texto], migrar=True)
+    
+    assert [resultado['chave'] for resultado in resultados] == [com_imagem.chave, texto.chave]
+    assert [registro['chave'] for registro in ler_journal(journal)] == [com_imagem.chave, texto.chave]
@@ -0,0 +1,62 @@
+"""
+Testes da divisão da resolução em shards e da mesclagem dos journals
+"""
+
+import pytest
+
+from journal_resultados import gravar_journal, ler_journal
+from shards_resolucao import (
+    caminho_journal_shard, encontrar_journals_shard, interpretar_shard, mesclar_journals, shard_da_chave
+)
+
+
+@pytest.mark.parametrize("chave, shards", [
+    # Valores fixos: mudar a função de partição embaralha os shards de execuções em andamento
+    ("enem_2020.jsonl:1:0", [0, 1, 3, 6]),
+    ("enem_2023_dia2.jsonl:136:5", [0, 0, 0, 2]),
+    ("questão-ç:9:1", [0, 1, 1, 4]),
+])
+def test_shard_da_chave_e_estavel(chave, shards):
+    assert [shard_da_chave(chave, total) for total in (1, 2, 4, 7)] == shards
+
+
+def test_shards_particionam_as_chaves():
+    chaves = [f"enem_{ano}.jsonl:{numero}:0" for ano in range(2009, 2024) for numero in range(1, 181)]
+    contagem = [0] * 4
+    for chave in chaves:
+        contagem[shard_da_chave(chave, 4)] += 1
+    
+    assert sum(contagem) == len(chaves)
+    assert min(contagem) > len(chaves) / 4 * 0.9
+
+
+@pytest.mark.parametrize("texto, esperado", [("0/4", (0, 4)), (" 3 / 4 ", (3, 4)), ("0/1", (0, 1))])
+def test_interpretar_shard(texto, esperado):
+    assert interpretar_shard(texto) == esperado
+
+
+@pytest.mark.parametrize("texto", ["4/4", "1/0", "-1/4", "2", "a/b"])
+def test_shard_invalido(texto):
+    with pytest.raises(ValueError):
+        interpretar_shard(texto)
+
+
+def test_mesclar_journals_dos_shards(tmp_path):
+    journal = tmp_path / "progresso.jsonl"
+    assert caminho_journal_shard(journal, 1, 2).name == "progresso.shard-1-de-2.jsonl"
+    
+    gravar_journal(caminho_journal_shard(journal, 0, 2), [{"chave": "a:1", "letra_resposta": "A"}])
+    gravar_journal(caminho_journal_shard(journal, 1, 2), [
+        {"chave": "a:2", "letra_resposta": "B"},
+        {"chave": "a:1", "letra_resposta": "C"},  # questão repetida: vale a última
+    ])
+    (tmp_path / "progresso.shard-x-de-2.jsonl").write_text("")
+    
+    encontrados = encontrar_journals_shard(journal)
+    assert list(encontrados) == [2]
+    assert list(encontrados[2]) == [0, 1]
+    
+    estatisticas = mesclar_journals(encontrados[2].values(), journal)
+    
+    assert estatisticas == {"journals": 2, "registros": 3, "questoes": 2}
+    assert {registro["chave"]: registro["letra_resposta"] for registro in ler_journal(journal)} == {"a:1": "C", "a:2": "B"}